@@ -0,0 +1,106 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+def _cache():
+    return caches[settings.AUTH_CACHE_ALIAS]
+
+
+# What authentication needs from a user. The cache never holds the user
+# itself, so no password hash or profile data is copied into it.
+CACHED_FIELDS = ('id', 'is_active', 'is_staff')
+
+
+def _key(user_id):
+    return f'accounts:auth-user:{user_id}'
+
+
+def _entry(user):
+    entry = {name: getattr(user, name) for name in CACHED_FIELDS}
+    # Enough for the revoked-token check, which compares digests anyway.
+    entry['password_digest'] = get_md5_hash_password(user.password)
+    return entry
+
+
+def forget(user_id):
+    """Drop ``user_id``'s cached user so the next request reads it again."""
+    _cache().delete(_key(user_id))
+
+
+def _user_id(validated_token):
+    try:
+        return validated_token[api_settings.USER_ID_CLAIM]
+    except KeyError as exc:
+        msg = 'Token contained no recognizable user identification'
+        raise InvalidToken(msg) from exc
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` that keeps ``CACHED_FIELDS`` of users for a while.
+
+    Entries live for ``AUTH_USER_CACHE_TIMEOUT`` seconds and are dropped
+    when the user is saved or deleted (see ``accounts.signals``). That drop
+    reaches every worker only with a shared cache; under locmem the other
+    workers keep their entry until it times out. The active and
+    revoked-token checks still run on every request, against the entry.
+
+    On a cache hit the user carries only ``CACHED_FIELDS``. Other fields
+    load on access, one query each, so views that read the profile should
+    load the user themselves.
+    """
+
+    def get_user(self, validated_token):
+        user_id = _user_id(validated_token)
+        cache = _cache()
+        entry = cache.get(_key(user_id))
+        if entry is None:
+            try:
+                user = self.user_model.objects.get(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+            except self.user_model.DoesNotExist as exc:
+                msg = 'User not found'
+                raise AuthenticationFailed(msg, code='user_not_found') from exc
+            entry = _entry(user)
+            cache.set(_key(user_id), entry, settings.AUTH_USER_CACHE_TIMEOUT)
+        else:
+            user = self.user_model.from_db(
+                router.db_for_read(self.user_model),
+                CACHED_FIELDS,
+                [entry[name] for name in CACHED_FIELDS],
+            )
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not entry['is_active']:
+            msg = 'User is inactive'
+            raise AuthenticationFailed(msg, code='user_inactive')
+        if (
+            api_settings.CHECK_REVOKE_TOKEN
+            and validated_token.get(api_settings.REVOKE_TOKEN_CLAIM)
+            != entry['password_digest']
+        ):
+            msg = "The user's password has been changed."
+            raise AuthenticationFailed(msg, code='password_changed')
+        return user
+
+
+class ClaimsJWTAuthentication(CachedJWTAuthentication):
+    """
+    For read endpoints that only need to know the caller is authenticated.
+
+    With ``AUTH_CLAIMS_ONLY_READS`` the user is built from the token's claims
+    without any lookup, so a deactivated user keeps reading until their
+    access token expires. Views using it must not rely on user fields beyond
+    the id.
+    """
+
+    def get_user(self, validated_token):
+        if not settings.AUTH_CLAIMS_ONLY_READS:
+            return super().get_user(validated_token)
+        _user_id(validated_token)
+        return api_settings.TOKEN_USER_CLASS(validated_token)
@@ -0,0 +1,15 @@
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import forget
+
+
+@receiver([post_save, post_delete], sender=settings.AUTH_USER_MODEL)
+def forget_cached_user_on_change(sender, instance, **kwargs):
+    # After commit, so a concurrent request cannot cache the old row again.
+    # Only this worker's entry goes unless AUTH_CACHE_ALIAS is shared.
+    transaction.on_commit(partial(forget, instance.pk))
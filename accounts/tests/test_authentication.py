@@ -0,0 +1,43 @@
+import pytest
+from django.core.cache import caches
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.authentication import _key
+
+PROFILE = '/api/v1/accounts/profile/'
+
+
+@pytest.fixture
+def token_client(user, settings):
+    caches[settings.AUTH_CACHE_ALIAS].clear()
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    return client
+
+
+def test_cache_holds_only_what_authentication_needs(
+    user, token_client, settings, django_assert_num_queries
+):
+    assert token_client.get(PROFILE).status_code == 200
+
+    entry = caches[settings.AUTH_CACHE_ALIAS].get(_key(user.id))
+    assert set(entry) == {'id', 'is_active', 'is_staff', 'password_digest'}
+    assert user.password not in entry.values()
+
+    # A cache hit skips the user query; the profile is still read in full.
+    with django_assert_num_queries(1):
+        response = token_client.get(PROFILE)
+    assert response.json()['email'] == 'donor@example.com'
+
+
+def test_deactivation_applies_on_the_next_request(
+    user, token_client, django_capture_on_commit_callbacks
+):
+    assert token_client.get(PROFILE).status_code == 200
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user.is_active = False
+        user.save()
+
+    assert token_client.get(PROFILE).status_code == 401
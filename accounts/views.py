@@ -1,3 +1,4 @@
+from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
@@ -7,6 +8,8 @@ from rest_framework_simplejwt.tokens import RefreshToken
 
 from .serializers import RegisterSerializer, UserSerializer
 
+User = get_user_model()
+
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -40,5 +43,6 @@ def logout(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def me(request):
-    serializer = UserSerializer(request.user)
+    # The authenticated user may carry only the cached auth fields.
+    serializer = UserSerializer(User.objects.get(pk=request.user.pk))
     return Response(serializer.data, status=status.HTTP_200_OK)
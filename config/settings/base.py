@@ -17,6 +17,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'import_export',
     'rest_framework',
     'rest_framework_simplejwt',
@@ -92,13 +93,62 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'default',
+    },
+}
+
+# A cache shared by all workers; requires the `redis` extra. The catalog and
+# checkout caches are only invalidated everywhere through it: with the
+# per-process default, a change made in one worker or a management command
+# reaches the others when their entries expire. Set it whenever more than one
+# process serves requests.
+if os.environ.get('REDIS_URL'):
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    }
+
+CATALOG_CACHE_ALIAS = os.environ.get(
+    'CATALOG_CACHE_ALIAS', 'shared' if 'shared' in CACHES else 'default'
+)
+CATALOG_CACHE_TIMEOUT = int(os.environ.get('CATALOG_CACHE_TIMEOUT', '300'))
+
+# Fundraising totals reach cached catalogs at most this often, so a stream of
+# payments does not keep invalidating them.
+CATALOG_TOTALS_INTERVAL = int(os.environ.get('CATALOG_TOTALS_INTERVAL', '30'))
+
+# Render the catalog from values() rows instead of ModelSerializer instances.
+# The `bench_catalog` command checks both paths produce identical bytes.
+CATALOG_FAST_PATH = os.environ.get('CATALOG_FAST_PATH', 'true') == 'true'
+
+# Image name -> URL entries kept per process by donations.media.
+IMAGE_URL_CACHE_SIZE = int(os.environ.get('IMAGE_URL_CACHE_SIZE', '4096'))
+
+# Threads per process resizing uploaded donation images.
+IMAGE_DERIVATIVE_WORKERS = int(os.environ.get('IMAGE_DERIVATIVE_WORKERS', '2'))
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.IsAuthenticated'],
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ),
 }
 
+# Users resolved from access tokens are cached this many seconds. A per-process
+# cache only hears about saves made in its own worker, so in other workers a
+# deactivation takes up to this long to apply.
+AUTH_CACHE_ALIAS = os.environ.get(
+    'AUTH_CACHE_ALIAS', 'shared' if 'shared' in CACHES else 'default'
+)
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get('AUTH_USER_CACHE_TIMEOUT', '60'))
+
+# Let catalog reads trust the access token's claims without loading the user;
+# a deactivated user then keeps reading until their token expires.
+AUTH_CLAIMS_ONLY_READS = os.environ.get('AUTH_CLAIMS_ONLY_READS', 'false') == 'true'
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=2),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
@@ -111,6 +161,37 @@ STRIPE_SECRET_KEY = os.environ['STRIPE_SECRET_KEY']
 STRIPE_PUBLISHABLE_KEY = os.environ['STRIPE_PUBLISHABLE_KEY']
 STRIPE_WEBHOOK_SECRET = os.environ['STRIPE_WEBHOOK_SECRET']
 
+# Outbound Stripe API calls; STRIPE_API_BASE points them at a stand-in.
+STRIPE_API_BASE = os.environ.get('STRIPE_API_BASE', '')
+STRIPE_CONNECT_TIMEOUT = float(os.environ.get('STRIPE_CONNECT_TIMEOUT', '3'))
+STRIPE_READ_TIMEOUT = float(os.environ.get('STRIPE_READ_TIMEOUT', '10'))
+STRIPE_MAX_NETWORK_RETRIES = int(os.environ.get('STRIPE_MAX_NETWORK_RETRIES', '1'))
+STRIPE_HTTP_POOL_SIZE = int(os.environ.get('STRIPE_HTTP_POOL_SIZE', '10'))
+
+# 'inline' applies webhook events during the request; 'inbox' only records
+# them for the process_stripe_events worker.
+STRIPE_WEBHOOK_MODE = os.environ.get('STRIPE_WEBHOOK_MODE', 'inline')
+
+# Repeated checkouts of a donation within CHECKOUT_REUSE_WINDOW seconds reuse
+# the user's open PaymentIntent. The open intent is cached for
+# CHECKOUT_CACHE_TIMEOUT seconds in a cache all workers should share.
+CHECKOUT_REUSE_WINDOW = int(os.environ.get('CHECKOUT_REUSE_WINDOW', '1800'))
+CHECKOUT_CACHE_ALIAS = os.environ.get(
+    'CHECKOUT_CACHE_ALIAS', 'shared' if 'shared' in CACHES else 'default'
+)
+CHECKOUT_CACHE_TIMEOUT = int(os.environ.get('CHECKOUT_CACHE_TIMEOUT', '60'))
+
+# Processed Stripe events are kept this long for webhook idempotency, then
+# archive_stripe_events moves them to gzipped JSONL files in the archive dir.
+STRIPE_EVENT_RETENTION_DAYS = int(os.environ.get('STRIPE_EVENT_RETENTION_DAYS', '30'))
+STRIPE_EVENT_ARCHIVE_DIR = os.environ.get(
+    'STRIPE_EVENT_ARCHIVE_DIR', str(BASE_DIR / 'archive' / 'stripe_events')
+)
+
+# Admin refund selections up to this size are sent to Stripe during the
+# request; larger ones are left to the process_refunds worker.
+REFUND_INLINE_LIMIT = int(os.environ.get('REFUND_INLINE_LIMIT', '50'))
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -0,0 +1,105 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+GENERATION_KEY = 'donations:catalog:generation'
+TOTALS_PENDING_KEY = 'donations:catalog:totals-pending'
+TOTALS_THROTTLE_KEY = 'donations:catalog:totals-throttle'
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def _cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def _record(outcome):
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+def stats():
+    """Return the hit/miss counters of this worker process."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def get_generation():
+    """Return the current catalog generation, seeding it on first use."""
+    publish_totals()
+    cache = _cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Seed from the clock so that a restarted worker (or an evicted key)
+        # never reuses a generation number that maps to older contents.
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def bump_generation():
+    """Invalidate every cached catalog body by moving to a new generation."""
+    cache = _cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def note_totals_changed():
+    """Mark fundraising totals as changed, for ``publish_totals`` to pick up."""
+    _cache().set(TOTALS_PENDING_KEY, True, timeout=None)
+
+
+def publish_totals():
+    """
+    Bump the generation for pending totals changes, at most once per interval.
+
+    Every payment moves some totals, so bumping on each one would keep the
+    catalog cache permanently cold. Instead, the first read after a change
+    bumps the generation unless that already happened in the last
+    ``CATALOG_TOTALS_INTERVAL`` seconds, which bounds how stale totals get.
+    """
+    cache = _cache()
+    if not cache.get(TOTALS_PENDING_KEY):
+        return
+    if not cache.add(
+        TOTALS_THROTTLE_KEY, True, timeout=settings.CATALOG_TOTALS_INTERVAL
+    ):
+        return
+    # Cleared before bumping: a change landing in between stays pending.
+    cache.delete(TOTALS_PENDING_KEY)
+    bump_generation()
+
+
+def variant_key(*parts):
+    digest = hashlib.sha1(
+        '|'.join(str(part) for part in parts).encode(), usedforsecurity=False
+    )
+    return digest.hexdigest()
+
+
+def get_catalog(variant, render):
+    """
+    Return ``(body, hit)`` where ``body`` is the rendered catalog JSON.
+
+    ``render`` is only called on a miss and must return JSON bytes. The
+    generation is read before rendering, so a catalog that changes mid-render
+    is stored under the outdated generation and never served.
+    """
+    cache = _cache()
+    key = f'donations:catalog:{get_generation()}:{variant}'
+
+    body = cache.get(key)
+    if body is not None:
+        _record('hits')
+        return body, True
+
+    _record('misses')
+    body = render()
+    cache.set(key, body, settings.CATALOG_CACHE_TIMEOUT)
+    return body, False
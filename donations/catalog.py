@@ -0,0 +1,162 @@
+import json
+from collections import defaultdict
+
+from django.db.models import Prefetch
+from rest_framework import ISO_8601
+from rest_framework.fields import DateTimeField, SerializerMethodField
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+from .media import ImageURLResolver
+from .models import Category, Donation
+from .serializers import (
+    CategorySerializer,
+    CategoryWithDonationSerializer,
+    DonationWithoutCategorySerializer,
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+
+def render_categories(request):
+    categories = Category.objects.order_by('id')
+    return JSONRenderer().render(CategorySerializer(categories, many=True).data)
+
+
+def render_with_serializers(request, fields=None, omit=frozenset()):
+    """Render the catalog through ``CategoryWithDonationSerializer``."""
+    active_donations = Donation.objects.filter(is_active=True).only(
+        *DonationWithoutCategorySerializer.model_columns(fields, omit)
+    )
+
+    categories = Category.objects.prefetch_related(
+        Prefetch('donations', queryset=active_donations)
+    ).order_by('id')
+
+    serializer = CategoryWithDonationSerializer(
+        categories,
+        many=True,
+        context={'request': request, 'fields': fields, 'omit': omit},
+    )
+    return JSONRenderer().render(serializer.data)
+
+
+def _datetime_converter(field):
+    """
+    Specialise ``DateTimeField.to_representation`` for ISO 8601 output.
+
+    DRF looks up the current timezone for every value; resolving it once per
+    response removes most of the cost while producing the same string.
+    """
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = (
+        field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    )
+    if (
+        output_format is None
+        or output_format.lower() != ISO_8601
+        or field_timezone is None
+    ):
+        return field.to_representation
+
+    def convert(value):
+        if isinstance(value, str) or value.tzinfo is None:
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+
+    return convert
+
+
+def _compile(serializer):
+    """
+    Turn a serializer's fields into ``(name, convert)`` pairs.
+
+    ``convert`` is the field's own ``to_representation`` (or an equivalent
+    specialisation), so values come out exactly as DRF would render them,
+    minus the per-object field lookup. Method fields get ``None`` and are
+    filled in by the caller.
+    """
+    plan = []
+    for name, field in serializer.fields.items():
+        if isinstance(field, SerializerMethodField):
+            plan.append((name, None))
+        elif isinstance(field, DateTimeField):
+            plan.append((name, _datetime_converter(field)))
+        else:
+            plan.append((name, field.to_representation))
+    return plan
+
+
+def _convert(plan, values):
+    return {
+        name: value if value is None or convert is None else convert(value)
+        for (name, convert), value in zip(plan, values, strict=True)
+    }
+
+
+def dumps(data):
+    """Encode ``data`` to the same bytes as DRF's ``JSONRenderer``."""
+    if orjson is not None:
+        body = orjson.dumps(data)
+    else:
+        body = json.dumps(
+            data, ensure_ascii=False, allow_nan=False, separators=(',', ':')
+        ).encode()
+    # JSONRenderer always escapes these to stay a strict JavaScript subset.
+    return body.replace('\u2028'.encode(), b'\\u2028').replace(
+        '\u2029'.encode(), b'\\u2029'
+    )
+
+
+def render_fast(request, fields=None, omit=frozenset()):
+    """
+    Render the same bytes as ``render_with_serializers`` from ``values()`` rows.
+
+    Categories and active donations are read with one query each. Donations
+    come straight from the through table, in the same per-category order the
+    ``Prefetch`` produces.
+    """
+    context = {'request': request, 'fields': fields, 'omit': omit}
+    image_url = ImageURLResolver(request)
+    category_plan = _compile(CategorySerializer(context=context))
+    donation_plan = _compile(DonationWithoutCategorySerializer(context=context))
+    donation_names = [name for name, _ in donation_plan]
+
+    # Method fields are read from the column of the same name and resolved
+    # the way the serializer's get_<field> methods do.
+    columns = [f'donation__{name}' for name in donation_names]
+    method_fields = {
+        name: resolve
+        for name, resolve in [
+            ('image', image_url),
+            ('image_variants', image_url.variants),
+        ]
+        if name in donation_names
+    }
+
+    donations = defaultdict(list)
+    rows = (
+        Donation.categories.through.objects.filter(donation__is_active=True)
+        .order_by('category_id', '-donation_id')
+        .values_list('category_id', *columns)
+    )
+    for category_id, *values in rows:
+        rendered = _convert(donation_plan, values)
+        for name, resolve in method_fields.items():
+            rendered[name] = resolve(rendered[name])
+        donations[category_id].append(rendered)
+
+    category_names = [name for name, _ in category_plan]
+    catalog = []
+    for values in Category.objects.order_by('id').values_list(*category_names):
+        rendered = _convert(category_plan, values)
+        rendered['donations'] = donations.get(rendered['id'], [])
+        catalog.append(rendered)
+
+    return dumps(catalog)
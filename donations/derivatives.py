@@ -0,0 +1,125 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps, features
+
+from . import cache as catalog_cache
+from .models import Donation
+
+logger = logging.getLogger(__name__)
+
+# Longest edge, in pixels, of each derivative.
+SIZES = {
+    'thumbnail': 320,
+    'medium': 960,
+}
+
+# Modern formats are written only when this Pillow build can encode them.
+EXTRA_FORMATS = [
+    (fmt, ext, {'quality': 80})
+    for fmt, ext in [('WEBP', 'webp'), ('AVIF', 'avif')]
+    if features.check(ext)
+]
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_DERIVATIVE_WORKERS,
+                thread_name_prefix='image-derivatives',
+            )
+        return _executor
+
+
+def _encode(image, fmt, **options):
+    buffer = BytesIO()
+    image.save(buffer, format=fmt, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def _render(source):
+    """Yield ``(variant, extension, ContentFile)`` for every derivative."""
+    has_alpha = source.mode in ('RGBA', 'LA') or 'transparency' in source.info
+    base_format, base_ext, base_options = (
+        ('PNG', 'png', {'optimize': True})
+        if has_alpha
+        else ('JPEG', 'jpg', {'quality': 85, 'optimize': True, 'progressive': True})
+    )
+    source = source.convert('RGBA' if has_alpha else 'RGB')
+
+    for size_name, edge in SIZES.items():
+        resized = source.copy()
+        resized.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        yield size_name, base_ext, _encode(resized, base_format, **base_options)
+        for fmt, ext, options in EXTRA_FORMATS:
+            yield f'{size_name}_{ext}', ext, _encode(resized, fmt, **options)
+
+
+def delete_derivatives(variants):
+    storage = Donation.image.field.storage
+    for name in variants.values():
+        storage.delete(name)
+
+
+def generate_derivatives(donation_id, image_name):
+    """
+    Write every derivative of ``image_name`` and record them on the donation.
+
+    The donation row is only updated while it still points at the same
+    image; derivatives of an image replaced in the meantime are discarded.
+    """
+    storage = Donation.image.field.storage
+    with storage.open(image_name, 'rb') as fh, Image.open(fh) as source:
+        source = ImageOps.exif_transpose(source)
+        stem = PurePosixPath(image_name).stem
+        variants = {
+            variant: storage.save(
+                f'donations/derivatives/{stem}/{variant}.{ext}', content
+            )
+            for variant, ext, content in _render(source)
+        }
+
+    updated = Donation.objects.filter(id=donation_id, image=image_name).update(
+        image_variants=variants, updated_at=timezone.now()
+    )
+    if not updated:
+        delete_derivatives(variants)
+        return {}
+
+    catalog_cache.bump_generation()
+    return variants
+
+
+def _generate_in_background(donation_id, image_name):
+    # Pool threads outlive requests, so nothing else would close or recycle
+    # their database connections.
+    close_old_connections()
+    try:
+        generate_derivatives(donation_id, image_name)
+    except Exception:
+        logger.exception(
+            'Image derivative generation failed',
+            extra={'donation_id': donation_id, 'image': image_name},
+        )
+    finally:
+        close_old_connections()
+
+
+def schedule_derivatives(donation):
+    """Generate derivatives in the worker pool once the save has committed."""
+    donation_id, image_name = donation.pk, donation.image.name
+    transaction.on_commit(
+        lambda: _get_executor().submit(_generate_in_background, donation_id, image_name)
+    )
@@ -0,0 +1,96 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+
+from donations import catalog
+from donations.models import Category, Donation
+
+
+class Rollback(Exception):  # noqa: N818
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the serializer and fast-path catalog renderers on synthetic '
+        'catalogs, failing if their output differs by a single byte. '
+        'All synthetic rows are rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', nargs='+', type=int, default=[100, 1_000, 10_000]
+        )
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument(
+            '--host',
+            default=next(
+                (h.lstrip('.') for h in settings.ALLOWED_HOSTS if h != '*'),
+                'localhost',
+            ),
+        )
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get('/', HTTP_HOST=options['host'])
+        for size in options['sizes']:
+            try:
+                with transaction.atomic():
+                    self._seed(size, options['categories'])
+                    self._compare(request, size, options['repeat'])
+                    raise Rollback
+            except Rollback:
+                pass
+
+    def _seed(self, size, category_count):
+        categories = Category.objects.bulk_create(
+            Category(name=f'bench-{size}-{i}') for i in range(category_count)
+        )
+        donations = Donation.objects.bulk_create(
+            Donation(
+                title=f'bench-{size}-{i}',
+                description='Lorem ipsum dolor sit amet. ' * 8,
+                amount=i % 5000,
+                image=f'donations/bench-{i}.jpg' if i % 3 else None,
+                image_variants=(
+                    {'thumbnail': f'donations/derivatives/bench-{i}/thumbnail.jpg'}
+                    if i % 3
+                    else {}
+                ),
+                is_active=bool(i % 10),
+            )
+            for i in range(size)
+        )
+        through = Donation.categories.through
+        through.objects.bulk_create(
+            through(
+                donation_id=donation.id,
+                category_id=categories[(i + offset) % category_count].id,
+            )
+            for i, donation in enumerate(donations)
+            for offset in range(1 + i % 2)
+        )
+
+    def _time(self, render, request, repeat):
+        body = render(request)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            render(request)
+        return body, (time.perf_counter() - started) / repeat
+
+    def _compare(self, request, size, repeat):
+        slow, slow_time = self._time(catalog.render_with_serializers, request, repeat)
+        fast, fast_time = self._time(catalog.render_fast, request, repeat)
+        if slow != fast:
+            msg = f'Fast-path catalog differs from serializer output at {size} rows.'
+            raise CommandError(msg)
+
+        self.stdout.write(
+            f'{size:>7} donations  {len(fast):>10} bytes  '
+            f'serializer {slow_time * 1000:8.1f} ms  '
+            f'fast path {fast_time * 1000:8.1f} ms  '
+            f'speedup {slow_time / fast_time:5.1f}x'
+        )
@@ -0,0 +1,88 @@
+import time
+
+import tablib
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from import_export.resources import modelresource_factory
+
+from donations.models import Category, Donation
+from donations.resources import DonationResource
+
+
+class Rollback(Exception):  # noqa: N818
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the row-by-row admin import with the bulk DonationResource '
+        'import. All imported rows are rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2_000)
+        parser.add_argument('--categories', type=int, default=20)
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        legacy = self._run(
+            modelresource_factory(Donation)(),
+            rows,
+            options['categories'],
+            by_name=False,
+        )
+        bulk = self._run(DonationResource(), rows, options['categories'], by_name=True)
+
+        self.stdout.write(f'row-by-row import  {rows / legacy:10,.0f} rows/s')
+        self.stdout.write(f'bulk import        {rows / bulk:10,.0f} rows/s')
+        self.stdout.write(f'speedup            {legacy / bulk:10.1f}x')
+
+    def _run(self, resource, rows, category_count, by_name):
+        try:
+            with transaction.atomic():
+                categories = Category.objects.bulk_create(
+                    Category(name=f'bench-import-{i}') for i in range(category_count)
+                )
+                dataset = tablib.Dataset(
+                    headers=[
+                        'id',
+                        'title',
+                        'description',
+                        'categories',
+                        'amount',
+                        'is_active',
+                    ]
+                )
+                for i in range(rows):
+                    linked = [
+                        categories[i % category_count],
+                        categories[(i + 7) % category_count],
+                    ]
+                    dataset.append(
+                        [
+                            '',
+                            f'bench-import-{i}',
+                            'Lorem ipsum dolor sit amet.',
+                            ','.join(c.name if by_name else str(c.id) for c in linked),
+                            i % 5000,
+                            True,
+                        ]
+                    )
+
+                started = time.perf_counter()
+                result = resource.import_data(dataset, raise_errors=True)
+                elapsed = time.perf_counter() - started
+                if result.has_errors() or result.has_validation_errors():
+                    msg = f'{type(resource).__name__} import failed.'
+                    raise CommandError(msg)
+                if (
+                    Donation.categories.through.objects.filter(
+                        donation__title__startswith='bench-import-'
+                    ).count()
+                    != rows * 2
+                ):
+                    msg = f'{type(resource).__name__} did not import categories.'
+                    raise CommandError(msg)
+                raise Rollback
+        except Rollback:
+            return elapsed
@@ -0,0 +1,133 @@
+import time
+
+from django.contrib import admin
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+
+from donations.models import Donation
+from donations.search import SearchPagination, search_donations
+
+WORDS = [
+    'water',
+    'school',
+    'books',
+    'medical',
+    'camp',
+    'flood',
+    'relief',
+    'shelter',
+    'food',
+    'children',
+    'village',
+    'clinic',
+    'library',
+    'orphanage',
+    'wells',
+    'solar',
+    'teachers',
+    'vaccines',
+    'meals',
+    'blankets',
+]
+
+SEED_SQL = """
+    INSERT INTO donations_donation (
+        title, description, amount, image_variants, is_active,
+        created_at, updated_at
+    )
+    SELECT
+        'bench ' || w[1 + i %% 20] || ' ' || w[1 + (i / 20) %% 20] || ' ' || i,
+        'Help fund ' || w[1 + (i / 7) %% 20] || ' and ' || w[1 + (i / 13) %% 20]
+            || ' for ' || w[1 + (i / 400) %% 20] || ' projects.',
+        i %% 5000,
+        '{}'::jsonb,
+        i %% 10 <> 0,
+        now() - make_interval(secs => i),
+        now()
+    FROM generate_series(1, %s) AS i, (SELECT %s::text[] AS w) AS words
+"""
+
+
+class Rollback(Exception):  # noqa: N818
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the donation search API and admin search against a synthetic '
+        'catalog seeded with generate_series. All synthetic rows are rolled '
+        'back. Requires PostgreSQL with pg_trgm.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument(
+            '--terms', nargs='+', default=['water', 'medicl camp', 'orphanage']
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            msg = 'bench_search requires PostgreSQL.'
+            raise CommandError(msg)
+        try:
+            with transaction.atomic():
+                self._seed(options['rows'])
+                for term in options['terms']:
+                    self._bench(term, options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def _seed(self, rows):
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute(SEED_SQL, [rows, WORDS])
+            cursor.execute('ANALYZE donations_donation')
+        self.stdout.write(
+            f'Seeded {rows:,} donations in {time.perf_counter() - started:.1f} s'
+        )
+
+    def _time(self, fetch, repeat):
+        result = fetch()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            fetch()
+        return result, (time.perf_counter() - started) / repeat
+
+    def _bench(self, term, repeat):
+        factory = RequestFactory()
+        base = search_donations(Donation.objects.filter(is_active=True), term)
+
+        def page(cursor=None):
+            params = {'q': term}
+            if cursor:
+                params['cursor'] = cursor
+            request = factory.get('/', params)
+            request.query_params = request.GET
+            paginator = SearchPagination()
+            rows = paginator.paginate_queryset(base.only('id', 'title'), request)
+            return paginator, rows
+
+        (paginator, rows), first_time = self._time(page, repeat)
+        deep_time = 0.0
+        if paginator.next_position is not None:
+            cursor = paginator.encode_cursor(paginator.next_position)
+            _, deep_time = self._time(lambda: page(cursor), repeat)
+
+        model_admin = admin.site._registry[Donation]  # noqa: SLF001
+        queryset = Donation.objects.all()
+
+        def admin_page():
+            results, _ = model_admin.get_search_results(None, queryset, term)
+            return list(results.values_list('id', flat=True)[:100])
+
+        _, admin_time = self._time(admin_page, repeat)
+
+        self.stdout.write(
+            f'{term!r:>16}  {len(rows):>3} rows  '
+            f'first page {first_time * 1000:8.1f} ms  '
+            f'next page {deep_time * 1000:8.1f} ms  '
+            f'admin {admin_time * 1000:8.1f} ms'
+        )
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from donations.derivatives import delete_derivatives, generate_derivatives
+from donations.models import Donation
+
+
+class Command(BaseCommand):
+    help = 'Generate resized/WebP/AVIF derivatives for donation images.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Regenerate every image, not only those without derivatives.',
+        )
+
+    def handle(self, *args, **options):
+        donations = Donation.objects.exclude(image='').exclude(image__isnull=True)
+        if not options['all']:
+            donations = donations.filter(image_variants={})
+
+        generated = 0
+        for donation in donations.only('id', 'image', 'image_variants').iterator():
+            old_variants = donation.image_variants
+            variants = generate_derivatives(donation.id, donation.image.name)
+            if variants:
+                generated += 1
+                delete_derivatives(
+                    {
+                        k: v
+                        for k, v in old_variants.items()
+                        if v not in variants.values()
+                    }
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Generated derivatives for {generated} image(s).')
+        )
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from donations.media import process_media_deletions
+
+
+class Command(BaseCommand):
+    help = 'Delete queued media files from storage in batches, retrying failures.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for new work instead of exiting when idle.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Seconds to sleep between polls when idle (with --loop).',
+        )
+
+    def handle(self, *args, **options):
+        total_deleted = total_failed = 0
+        while True:
+            deleted, failed = process_media_deletions(
+                batch_size=options['batch_size'],
+                concurrency=options['concurrency'],
+            )
+            total_deleted += deleted
+            total_failed += failed
+
+            if deleted or failed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Deleted {total_deleted} file(s); {total_failed} failure(s) '
+                'scheduled for retry.'
+            )
+        )
@@ -0,0 +1,167 @@
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Donation, PendingMediaDeletion
+
+logger = logging.getLogger(__name__)
+
+
+class ImageURLCache:
+    """
+    Bounded, thread-safe LRU of image name -> {request base: URL}.
+
+    Storage backends such as Cloudinary build URLs in Python on every call,
+    so the mapping is shared by all requests served by this process.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, name, base):
+        with self._lock:
+            urls = self._entries.get(name)
+            if urls is None:
+                return None
+            self._entries.move_to_end(name)
+            return urls.get(base)
+
+    def set(self, name, base, url):
+        with self._lock:
+            self._entries.setdefault(name, {})[base] = url
+            self._entries.move_to_end(name)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, name):
+        with self._lock:
+            self._entries.pop(name, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+image_urls = ImageURLCache(settings.IMAGE_URL_CACHE_SIZE)
+
+
+def forget_image_url(name):
+    """Drop cached URLs for an image that was replaced or deleted."""
+    if name:
+        image_urls.discard(name)
+
+
+class ImageURLResolver:
+    """Resolve image names to URLs, absolute when built for a request."""
+
+    def __init__(self, request=None):
+        self.request = request
+        # Computed once per request instead of once per image.
+        self.base = request.build_absolute_uri('/') if request else ''
+
+    def __call__(self, name):
+        if not name:
+            return None
+
+        url = image_urls.get(name, self.base)
+        if url is not None:
+            return url
+
+        url = image_urls.get(name, '')
+        if url is None:
+            url = Donation.image.field.storage.url(name)
+            image_urls.set(name, '', url)
+        if self.request:
+            url = self.request.build_absolute_uri(url)
+            image_urls.set(name, self.base, url)
+        return url
+
+    def variants(self, names):
+        """Resolve a ``{variant: name}`` map, e.g. ``Donation.image_variants``."""
+        return {variant: self(name) for variant, name in (names or {}).items()}
+
+
+def queue_media_deletion(names):
+    """
+    Queue stored files for deletion by ``process_media_deletions``.
+
+    Rows are written in the caller's transaction, so a rolled-back save never
+    loses a file that is still referenced.
+    """
+    names = {name for name in names if name}
+    for name in names:
+        forget_image_url(name)
+    PendingMediaDeletion.objects.bulk_create(
+        PendingMediaDeletion(name=name) for name in names
+    )
+
+
+def _retry_delay(attempts):
+    return timedelta(seconds=min(30 * 2 ** (attempts - 1), 6 * 60 * 60))
+
+
+def _claim(batch_size, lease):
+    """Lease a batch of due rows; concurrent workers skip each other's rows."""
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            PendingMediaDeletion.objects.select_for_update(skip_locked=True)
+            .filter(next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        PendingMediaDeletion.objects.filter(id__in=[row.id for row in batch]).update(
+            next_attempt_at=now + lease
+        )
+    return batch
+
+
+def _delete(name):
+    try:
+        Donation.image.field.storage.delete(name)
+    except Exception as exc:
+        return exc
+    return None
+
+
+def process_media_deletions(batch_size=100, concurrency=4, lease=None):
+    """
+    Delete one batch of queued files; return ``(deleted, failed)``.
+
+    Storage calls run on ``concurrency`` threads outside any transaction.
+    Failures are retried with exponential backoff.
+    """
+    batch = _claim(batch_size, lease or timedelta(minutes=5))
+    if not batch:
+        return 0, 0
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        errors = list(pool.map(_delete, (row.name for row in batch)))
+
+    now = timezone.now()
+    done, failed = [], []
+    for row, error in zip(batch, errors, strict=True):
+        if error is None:
+            done.append(row.id)
+            continue
+        row.attempts += 1
+        row.last_error = f'{type(error).__name__}: {error}'
+        row.next_attempt_at = now + _retry_delay(row.attempts)
+        failed.append(row)
+        logger.warning(
+            'Media deletion failed',
+            extra={'file_name': row.name, 'attempts': row.attempts},
+        )
+
+    PendingMediaDeletion.objects.filter(id__in=done).delete()
+    PendingMediaDeletion.objects.bulk_update(
+        failed, ['attempts', 'last_error', 'next_attempt_at']
+    )
+    return len(done), len(failed)
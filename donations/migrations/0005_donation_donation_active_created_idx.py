@@ -0,0 +1,27 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0004_donation_description'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='donation',
+            index=models.Index(fields=['is_active', '-created_at', '-id'], name='donation_active_created_idx'),
+        ),
+        # Donation.categories uses an auto-created through table, which
+        # cannot declare indexes of its own. This one serves category ->
+        # donations joins from the index alone.
+        migrations.RunSQL(
+            sql=(
+                'CREATE INDEX IF NOT EXISTS donation_category_lookup_idx '
+                'ON donations_donation_categories (category_id, donation_id);'
+            ),
+            reverse_sql='DROP INDEX IF EXISTS donation_category_lookup_idx;',
+        ),
+    ]
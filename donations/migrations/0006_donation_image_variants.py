@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0005_donation_donation_active_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donation',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.1 on 2026-10-18 13:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0006_donation_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingMediaDeletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('next_attempt_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Pending media deletion',
+                'verbose_name_plural': 'Pending media deletions',
+                'ordering': ['id'],
+            },
+        ),
+    ]
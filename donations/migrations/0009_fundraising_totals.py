@@ -0,0 +1,44 @@
+# Generated by Django 6.0.1 on 2026-10-18 17:20
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0008_donation_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='raised_amount',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='refunded_amount',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='succeeded_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='donation',
+            name='raised_amount',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='donation',
+            name='refunded_amount',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='donation',
+            name='succeeded_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
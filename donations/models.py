@@ -1,7 +1,11 @@
 from decimal import Decimal
 
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 from django.db.models import Q
+from django.db.models.functions import Upper
+from django.utils import timezone
 
 
 class TimeStampedModel(models.Model):
@@ -12,7 +16,45 @@ class TimeStampedModel(models.Model):
         abstract = True
 
 
-class Category(TimeStampedModel):
+class FundraisingTotals(models.Model):
+    """
+    Payment totals maintained incrementally by ``donations.totals``.
+
+    The counters are only ever written with ``F()`` updates, so saving an
+    instance loaded earlier leaves them alone instead of writing back stale
+    values.
+    """
+
+    raised_amount = models.DecimalField(
+        max_digits=14, decimal_places=2, default=Decimal('0.00'), editable=False
+    )
+    succeeded_count = models.PositiveIntegerField(default=0, editable=False)
+    refunded_amount = models.DecimalField(
+        max_digits=14, decimal_places=2, default=Decimal('0.00'), editable=False
+    )
+
+    total_fields = ('raised_amount', 'succeeded_count', 'refunded_amount')
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # Deferred fields are left alone, as a plain save would, except
+            # auto_now stamps, which are set on every save.
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and not field.generated
+                and field.name not in self.total_fields
+                and (field.attname not in deferred or getattr(field, 'auto_now', False))
+            ]
+        super().save(*args, **kwargs)
+
+
+class Category(TimeStampedModel, FundraisingTotals):
     name = models.CharField(max_length=48, unique=True)
 
     class Meta:
@@ -24,7 +66,7 @@ class Category(TimeStampedModel):
         return self.name
 
 
-class Donation(TimeStampedModel):
+class Donation(TimeStampedModel, FundraisingTotals):
     title = models.CharField(max_length=150, unique=True)
     description = models.TextField(blank=True)
     categories = models.ManyToManyField(Category, related_name='donations')
@@ -32,7 +74,17 @@ class Donation(TimeStampedModel):
         max_digits=10, decimal_places=2, default=Decimal('0.00')
     )
     image = models.ImageField(upload_to='donations', blank=True, null=True)
+    # Variant name -> storage name, written by donations.derivatives.
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     is_active = models.BooleanField(default=False)
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('title', weight='A', config='english')
+            + SearchVector('description', weight='B', config='english')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         verbose_name = 'Donation'
@@ -44,6 +96,36 @@ class Donation(TimeStampedModel):
                 name='amount_non_negative',
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['is_active', '-created_at', '-id'],
+                name='donation_active_created_idx',
+            ),
+            GinIndex(fields=['search_vector'], name='donation_search_vector_idx'),
+            # Serves both icontains (UPPER(title) LIKE ...) and fuzzy matching.
+            GinIndex(
+                OpClass(Upper('title'), name='gin_trgm_ops'),
+                name='donation_title_trgm_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title
+
+
+class PendingMediaDeletion(models.Model):
+    """A stored file to delete once nothing references it any more."""
+
+    name = models.CharField(max_length=255)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Pending media deletion'
+        verbose_name_plural = 'Pending media deletions'
+        ordering = ['id']
+
+    def __str__(self):
+        return self.name
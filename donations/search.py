@@ -0,0 +1,49 @@
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast, Upper
+
+from config.pagination import KeysetPagination
+
+SEARCH_CONFIG = 'english'
+
+
+def _query(term):
+    return SearchQuery(term, config=SEARCH_CONFIG, search_type='websearch')
+
+
+def _fuzzy(term):
+    # Served by donation_title_trgm_idx, which is built on UPPER(title).
+    return TrigramWordSimilar(Upper('title'), term.upper())
+
+
+def search_filter(term):
+    """Match ``term`` against the stored tsvector or the title trigrams."""
+    return Q(search_vector=_query(term)) | Q(_fuzzy(term))
+
+
+def search_donations(queryset, term):
+    """
+    Rank full-text matches, falling back to title trigrams for typos.
+
+    Evaluating both predicates together forces a trigram comparison on every
+    row that misses the tsvector, so fuzzy matching only runs when the
+    full-text query finds nothing. Ranks are cast from real to double so they
+    survive the JSON round trip through the pagination cursor unchanged.
+    """
+    query = _query(term)
+    matches = queryset.filter(search_vector=query)
+    if matches.exists():
+        rank = SearchRank(F('search_vector'), query)
+    else:
+        matches = queryset.filter(_fuzzy(term))
+        rank = TrigramWordSimilarity(term.upper(), Upper('title'))
+    return matches.annotate(rank=Cast(rank, FloatField()))
+
+
+class SearchPagination(KeysetPagination):
+    ordering = ('-rank', '-id')
@@ -1,17 +1,76 @@
 from rest_framework import serializers
 from rest_framework.serializers import ModelSerializer
 
+from .media import ImageURLResolver
 from .models import Category, Donation
 
 
 class CategorySerializer(ModelSerializer):
     class Meta:
         model = Category
-        fields = ['id', 'name', 'created_at', 'updated_at']
+        fields = [
+            'id',
+            'name',
+            'raised_amount',
+            'succeeded_count',
+            'refunded_amount',
+            'created_at',
+            'updated_at',
+        ]
+
+
+class SparseFieldsMixin:
+    """
+    Render only ``context['fields']`` minus ``context['omit']``.
+
+    The context is shared with nested serializers, so the selection applies
+    to every serializer using this mixin within one response. ``id`` is
+    always rendered.
+    """
+
+    always_included = ('id',)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selected = self.context.get('fields')
+        omitted = self.context.get('omit') or set()
+        for name in list(fields):
+            if name in self.always_included:
+                continue
+            if (selected is not None and name not in selected) or name in omitted:
+                del fields[name]
+        return fields
 
+    @classmethod
+    def parse_fieldset(cls, query_params):
+        """Validate ``?fields=`` and ``?omit=`` against ``Meta.fields``."""
+        allowed = set(cls.Meta.fields)
 
-class DonationWithoutCategorySerializer(ModelSerializer):
+        def parse(param):
+            raw = query_params.get(param)
+            if raw is None:
+                return None
+            names = {name.strip() for name in raw.split(',') if name.strip()}
+            unknown = names - allowed
+            if unknown:
+                msg = f'Unknown field(s): {", ".join(sorted(unknown))}.'
+                raise serializers.ValidationError({param: msg})
+            return names
+
+        return parse('fields'), parse('omit') or set()
+
+    @classmethod
+    def model_columns(cls, fields, omit):
+        """Concrete model columns needed to render the selected fields."""
+        names = set(cls.Meta.fields if fields is None else fields) - omit
+        model_fields = cls.Meta.model._meta.concrete_fields  # noqa: SLF001
+        concrete = {field.name for field in model_fields}
+        return sorted((names & concrete) | set(cls.always_included))
+
+
+class DonationWithoutCategorySerializer(SparseFieldsMixin, ModelSerializer):
     image = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Donation
@@ -21,18 +80,30 @@ class DonationWithoutCategorySerializer(ModelSerializer):
             'description',
             'amount',
             'image',
+            'image_variants',
+            'raised_amount',
+            'succeeded_count',
+            'refunded_amount',
             'is_active',
             'created_at',
             'updated_at',
         ]
 
+    @property
+    def image_urls(self):
+        # The context dict is shared by nested and list serializers, so a
+        # single resolver serves the whole response.
+        resolver = self.context.get('image_urls')
+        if resolver is None:
+            resolver = ImageURLResolver(self.context.get('request'))
+            self.context['image_urls'] = resolver
+        return resolver
+
     def get_image(self, obj):
-        request = self.context.get('request')
-        if not obj.image:
-            return None
-        if request:
-            return request.build_absolute_uri(obj.image.url)
-        return obj.image.url
+        return self.image_urls(obj.image.name)
+
+    def get_image_variants(self, obj):
+        return self.image_urls.variants(obj.image_variants)
 
 
 class CategoryWithDonationSerializer(CategorySerializer):
@@ -47,3 +118,26 @@ class DonationSerializer(DonationWithoutCategorySerializer):
 
     class Meta(DonationWithoutCategorySerializer.Meta):
         fields = DonationWithoutCategorySerializer.Meta.fields + ['categories']
+
+
+class DonationFilterSerializer(serializers.Serializer):
+    category = serializers.IntegerField(required=False, min_value=1)
+    min_amount = serializers.DecimalField(
+        max_digits=10, decimal_places=2, required=False, min_value=0
+    )
+    max_amount = serializers.DecimalField(
+        max_digits=10, decimal_places=2, required=False, min_value=0
+    )
+    is_active = serializers.BooleanField(required=False, allow_null=True, default=True)
+
+    def validate(self, attrs):
+        min_amount = attrs.get('min_amount')
+        max_amount = attrs.get('max_amount')
+        if (
+            min_amount is not None
+            and max_amount is not None
+            and min_amount > max_amount
+        ):
+            msg = 'min_amount cannot be greater than max_amount.'
+            raise serializers.ValidationError(msg)
+        return attrs
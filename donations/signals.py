@@ -1,20 +1,130 @@
-from django.db.models.signals import post_delete, pre_save
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_init,
+    post_save,
+    pre_delete,
+    pre_save,
+)
 from django.dispatch import receiver
+from django.utils import timezone
 
-from .models import Donation
+from . import cache as catalog_cache
+from .derivatives import schedule_derivatives
+from .media import queue_media_deletion
+from .models import Category, Donation
+from .totals import shift_memberships
+
+
+@receiver(post_init, sender=Donation)
+def remember_loaded_image(sender, instance, **kwargs):
+    # Reading a deferred column would refresh it, once per instance.
+    if 'image' not in instance.__dict__ or 'image_variants' not in instance.__dict__:
+        return
+    instance.loaded_image = (instance.image.name or '', instance.image_variants)
 
 
 @receiver(pre_save, sender=Donation)
-def delete_old_image_on_image_update(sender, instance, **kwargs):
-    if not instance.pk:
+def delete_old_image_on_image_update(sender, instance, update_fields, **kwargs):
+    if not instance.pk or (update_fields is not None and 'image' not in update_fields):
+        return
+
+    loaded = getattr(instance, 'loaded_image', None)
+    if loaded is None:
+        # Loaded without the image column (e.g. through .only()).
+        loaded = (
+            sender.objects.filter(id=instance.pk)
+            .values_list('image', 'image_variants')
+            .first()
+        ) or ('', {})
+    old_name, old_variants = loaded[0] or '', loaded[1] or {}
+    if old_name == (instance.image.name or ''):
         return
 
-    old = sender.objects.get(id=instance.pk)
-    if old.image and old.image != instance.image:
-        old.image.delete(save=False)
+    # Queued in post_save, once the new image is actually stored.
+    instance.replaced_media = [old_name, *old_variants.values()]
+    instance.image_variants = {}
+    if update_fields is not None and 'image_variants' not in update_fields:
+        # Deferred when loaded, so the save itself will not write it.
+        sender.objects.filter(id=instance.pk).update(image_variants={})
+
+
+@receiver(post_save, sender=Donation)
+def generate_image_derivatives(sender, instance, created, **kwargs):
+    replaced = getattr(instance, 'replaced_media', None)
+    instance.replaced_media = None
+    instance.loaded_image = (instance.image.name or '', instance.image_variants)
+
+    if replaced:
+        queue_media_deletion(replaced)
+    if instance.image and (created or replaced):
+        schedule_derivatives(instance)
+
+
+@receiver(pre_delete, sender=Donation)
+def remember_image_on_donation_delete(sender, instance, **kwargs):
+    if getattr(instance, 'loaded_image', None) is not None:
+        return
+    # Deferred columns cannot be read back once the row is gone.
+    instance.loaded_image = (
+        sender.objects.filter(id=instance.pk)
+        .values_list('image', 'image_variants')
+        .first()
+    ) or ('', {})
 
 
 @receiver(post_delete, sender=Donation)
 def delete_image_on_donation_delete(sender, instance, **kwargs):
-    if instance.image:
-        instance.image.delete(save=False)
+    name, variants = instance.loaded_image
+    queue_media_deletion([name, *(variants or {}).values()])
+
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Donation)
+def invalidate_catalog_on_change(sender, **kwargs):
+    transaction.on_commit(catalog_cache.bump_generation)
+
+
+@receiver(m2m_changed, sender=Donation.categories.through)
+def invalidate_catalog_on_categories_change(sender, action, **kwargs):
+    if action.startswith('post_'):
+        transaction.on_commit(catalog_cache.bump_generation)
+
+
+@receiver(m2m_changed, sender=Donation.categories.through)
+def touch_donations_on_categories_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    # Donation ETags are versioned by updated_at, which membership changes
+    # would otherwise leave alone. A reverse clear is stamped before the rows
+    # go, while they still say which donations are affected.
+    now = timezone.now()
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            Donation.objects.filter(id=instance.pk).update(updated_at=now)
+            instance.updated_at = now
+    elif action in ('post_add', 'post_remove'):
+        Donation.objects.filter(id__in=pk_set).update(updated_at=now)
+    elif action == 'pre_clear':
+        Donation.objects.filter(categories=instance).update(updated_at=now)
+
+
+@receiver(m2m_changed, sender=Donation.categories.through)
+def shift_category_totals_on_categories_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    # Removals are read before the rows go; additions once they exist. Both
+    # run inside the transaction Django opens for the membership change.
+    if action not in ('post_add', 'pre_remove', 'pre_clear'):
+        return
+    own, other = (
+        ('category_id', 'donation_id') if reverse else ('donation_id', 'category_id')
+    )
+    memberships = sender.objects.filter(**{own: instance.pk})
+    if action != 'pre_clear':
+        memberships = memberships.filter(**{f'{other}__in': pk_set})
+    shift_memberships(
+        memberships.values_list('donation_id', 'category_id'),
+        -1 if action.startswith('pre_') else 1,
+    )
@@ -0,0 +1,60 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.test import RequestFactory
+from django.utils import timezone
+
+from donations import catalog
+from donations.models import Category, Donation
+
+
+@pytest.fixture
+def catalog_rows(db):
+    health, water, _empty = (
+        Category.objects.create(name=name) for name in ('Health', 'Water', 'Empty')
+    )
+    clinic = Donation.objects.create(
+        title='Clinic \u2028 "beds" éè \U0001f3e5',
+        description='Line one\nLine two \u2029 <b>&</b>',
+        amount=Decimal('1234.50'),
+        image='donations/clinic.jpg',
+        image_variants={
+            'thumb': 'donations/clinic_thumb.webp',
+            'medium': 'donations/clinic_medium.webp',
+        },
+        is_active=True,
+    )
+    well = Donation.objects.create(title='Well', amount=Decimal('0.00'), is_active=True)
+    hidden = Donation.objects.create(title='Hidden', amount=Decimal('5.00'))
+    clinic.categories.add(health, water)
+    well.categories.add(water)
+    hidden.categories.add(health)
+    # A timestamp with microseconds and one exactly on the second.
+    Donation.objects.filter(id=well.id).update(
+        created_at=timezone.now().replace(microsecond=0) - timedelta(days=3)
+    )
+
+
+@pytest.mark.parametrize(
+    'query',
+    [
+        {},
+        {'fields': 'id,title,image'},
+        {'omit': 'image_variants,description'},
+        {'fields': 'created_at,amount', 'omit': 'amount'},
+    ],
+)
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_fast_path_matches_serializers(catalog_rows, monkeypatch, query, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(catalog, 'orjson', None)
+    elif catalog.orjson is None:
+        pytest.skip('orjson is not installed')
+
+    request = RequestFactory().get('/api/v1/categories/', query)
+    fields, omit = catalog.DonationWithoutCategorySerializer.parse_fieldset(request.GET)
+
+    expected = catalog.render_with_serializers(request, fields, omit)
+    assert expected.count(b'{') > 3
+    assert catalog.render_fast(request, fields, omit) == expected
@@ -0,0 +1,39 @@
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from PIL import Image
+
+from donations import derivatives
+from donations.models import Donation
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(derivatives, '_executor', executor)
+    return executor
+
+
+def _jpeg():
+    buffer = BytesIO()
+    Image.new('RGB', (1200, 800), 'teal').save(buffer, format='JPEG')
+    return SimpleUploadedFile('well.jpg', buffer.getvalue())
+
+
+# The pool thread has its own connection, which only sees committed rows.
+@pytest.mark.django_db(transaction=True)
+def test_scheduled_job_records_the_variants(executor, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    donation = Donation.objects.create(title='Clean water', image=_jpeg())
+
+    # Runs after the job, on the same thread: its connection was closed.
+    assert executor.submit(lambda: connection.connection is None).result()
+    executor.shutdown()
+
+    donation.refresh_from_db()
+    assert set(donation.image_variants) >= set(derivatives.SIZES)
+    with Image.open(tmp_path / donation.image_variants['thumbnail']) as thumbnail:
+        assert max(thumbnail.size) == derivatives.SIZES['thumbnail']
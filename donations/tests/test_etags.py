@@ -0,0 +1,63 @@
+import pytest
+from django.core.cache import caches
+
+from donations.models import Category, Donation
+
+
+@pytest.fixture
+def donation(db):
+    return Donation.objects.create(title='Clean water', amount=100, is_active=True)
+
+
+def _etag(api_client, donation):
+    response = api_client.get(f'/api/v1/donations/{donation.pk}/')
+    assert response.status_code == 200
+    return response['ETag']
+
+
+@pytest.mark.parametrize('reverse', [False, True])
+def test_category_membership_changes_the_etag(api_client, donation, reverse):
+    category = Category.objects.create(name='Health')
+    before = _etag(api_client, donation)
+
+    if reverse:
+        category.donations.add(donation)
+    else:
+        donation.categories.add(category)
+    added = _etag(api_client, donation)
+
+    if reverse:
+        category.donations.clear()
+    else:
+        donation.categories.remove(category)
+    removed = _etag(api_client, donation)
+
+    assert len({before, added, removed}) == 3
+
+
+def test_unchanged_donation_answers_not_modified(api_client, donation):
+    etag = _etag(api_client, donation)
+    response = api_client.get(
+        f'/api/v1/donations/{donation.pk}/', HTTP_IF_NONE_MATCH=etag
+    )
+    assert response.status_code == 304
+
+
+def test_catalog_etag_follows_the_body_served(api_client, donation, settings):
+    caches[settings.CATALOG_CACHE_ALIAS].clear()
+    # Nothing cached: each request renders, as after the entry expires in a
+    # process whose generation never saw the write below.
+    settings.CATALOG_CACHE_TIMEOUT = 0
+    Category.objects.create(name='Health').donations.add(donation)
+    etag = api_client.get('/api/v1/categories/')['ETag']
+
+    # A write that bypasses the signals, like one from another process.
+    Donation.objects.filter(pk=donation.pk).update(title='Clean wells')
+    response = api_client.get('/api/v1/categories/', HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 200
+    assert b'Clean wells' in response.content
+    response = api_client.get(
+        '/api/v1/categories/', HTTP_IF_NONE_MATCH=response['ETag']
+    )
+    assert response.status_code == 304
@@ -0,0 +1,52 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from donations.models import Category, Donation
+
+
+@pytest.fixture
+def donation(db):
+    donation = Donation.objects.create(
+        title='Clean water',
+        description='Wells for three villages',
+        amount=Decimal('100.00'),
+        is_active=True,
+    )
+    donation.categories.add(Category.objects.create(name='Water'))
+    return donation
+
+
+def test_fields_limits_the_payload_and_the_columns(api_client, donation):
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(
+            f'/api/v1/donations/{donation.pk}/', {'fields': 'title,amount'}
+        )
+
+    assert response.status_code == 200
+    assert set(response.data) == {'id', 'title', 'amount'}
+    # The ETag lookup and the row; categories are not selected, so they are
+    # not prefetched.
+    _version, select = (query['sql'] for query in queries)
+    assert '"title"' in select
+    assert '"description"' not in select
+    assert 'donations_category' not in select
+
+
+def test_omit_drops_fields_from_nested_listings(api_client, donation):
+    response = api_client.get('/api/v1/donations/', {'omit': 'description,image'})
+
+    [row] = response.data['results']
+    assert row['title'] == 'Clean water'
+    assert not {'description', 'image'} & set(row)
+
+
+@pytest.mark.parametrize('param', ['fields', 'omit'])
+def test_unknown_fields_are_rejected(api_client, donation, param):
+    response = api_client.get(
+        f'/api/v1/donations/{donation.pk}/', {param: 'title,password'}
+    )
+    assert response.status_code == 400
+    assert 'password' in str(response.data[param])
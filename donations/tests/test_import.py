@@ -0,0 +1,39 @@
+import pytest
+import tablib
+
+from donations.models import Donation, PendingMediaDeletion
+from donations.resources import DonationResource
+
+
+@pytest.fixture
+def donations(db):
+    return [
+        Donation.objects.create(
+            title=f'Donation {i}',
+            image=f'donations/{i}.jpg',
+            image_variants={'thumbnail': f'donations/{i}_thumbnail.jpg'},
+        )
+        for i in range(2)
+    ]
+
+
+def test_replaced_images_lose_their_variants(donations):
+    kept, replaced = donations
+    dataset = tablib.Dataset(headers=['id', 'title', 'image'])
+    dataset.append([kept.id, 'Kept', kept.image.name])
+    dataset.append([replaced.id, 'Replaced', 'donations/new.jpg'])
+
+    result = DonationResource().import_data(dataset, raise_errors=True)
+
+    assert not result.has_errors()
+    kept.refresh_from_db()
+    replaced.refresh_from_db()
+    assert (kept.title, kept.image_variants) == (
+        'Kept',
+        {'thumbnail': 'donations/0_thumbnail.jpg'},
+    )
+    assert (replaced.image.name, replaced.image_variants) == ('donations/new.jpg', {})
+    assert set(PendingMediaDeletion.objects.values_list('name', flat=True)) == {
+        'donations/1.jpg',
+        'donations/1_thumbnail.jpg',
+    }
@@ -0,0 +1,55 @@
+import pytest
+from django.test import RequestFactory
+
+from donations import media
+from donations.media import ImageURLCache, ImageURLResolver
+from donations.models import Donation
+
+
+@pytest.fixture
+def storage_calls(monkeypatch):
+    """Names the storage was asked to build URLs for."""
+    calls = []
+    storage = Donation.image.field.storage
+
+    def url(name):
+        calls.append(name)
+        return f'/media/{name}'
+
+    monkeypatch.setattr(storage, 'url', url)
+    media.image_urls.clear()
+    yield calls
+    media.image_urls.clear()
+
+
+def test_lru_evicts_the_least_recently_used_name():
+    cache = ImageURLCache(maxsize=2)
+    cache.set('a.jpg', '', '/a')
+    cache.set('b.jpg', '', '/b')
+    assert cache.get('a.jpg', '') == '/a'
+    cache.set('c.jpg', '', '/c')
+
+    assert cache.get('b.jpg', '') is None
+    assert (cache.get('a.jpg', ''), cache.get('c.jpg', '')) == ('/a', '/c')
+
+
+def test_storage_builds_each_url_once_across_requests(storage_calls, settings):
+    settings.ALLOWED_HOSTS = ['api.example.org', 'cdn.example.org']
+    for host in ('api.example.org', 'api.example.org', 'cdn.example.org'):
+        resolve = ImageURLResolver(RequestFactory().get('/', HTTP_HOST=host))
+        assert resolve('donations/a.jpg') == f'http://{host}/media/donations/a.jpg'
+        assert resolve.variants({'thumb': 'donations/a_thumb.webp'}) == {
+            'thumb': f'http://{host}/media/donations/a_thumb.webp'
+        }
+
+    assert storage_calls == ['donations/a.jpg', 'donations/a_thumb.webp']
+    assert ImageURLResolver()(None) is None
+
+
+def test_queued_deletions_forget_cached_urls(db, storage_calls):
+    resolve = ImageURLResolver()
+    resolve('donations/a.jpg')
+    media.queue_media_deletion(['donations/a.jpg', ''])
+    resolve('donations/a.jpg')
+
+    assert storage_calls == ['donations/a.jpg', 'donations/a.jpg']
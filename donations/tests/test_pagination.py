@@ -0,0 +1,59 @@
+import base64
+import json
+
+import pytest
+from django.utils import timezone
+
+from donations.models import Donation
+
+URL = '/api/v1/donations/'
+
+
+@pytest.fixture
+def tied_donations(db):
+    donations = [
+        Donation.objects.create(title=f'Cause {i}', is_active=True) for i in range(7)
+    ]
+    Donation.objects.create(title='Hidden')
+    # Every row shares created_at, so only the id breaks ties.
+    Donation.objects.update(created_at=timezone.now())
+    return donations
+
+
+def _cursor(values):
+    raw = json.dumps(values).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def test_pages_walk_ties_on_created_at_without_gaps(api_client, tied_donations):
+    seen = []
+    url = f'{URL}?page_size=3'
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == 200
+        seen += [row['id'] for row in response.data['results']]
+        url = response.data['next']
+
+    assert seen == sorted((donation.id for donation in tied_donations), reverse=True)
+
+
+def test_page_size_is_capped(api_client, tied_donations, monkeypatch):
+    monkeypatch.setattr('config.pagination.KeysetPagination.max_page_size', 2)
+    response = api_client.get(URL, {'page_size': 50})
+    assert len(response.data['results']) == 2
+    assert response.data['next']
+
+
+@pytest.mark.parametrize(
+    'cursor',
+    [
+        'not base64!',
+        _cursor({'created_at': 'x'}),
+        _cursor(['2026-01-01T00:00:00+00:00']),
+        _cursor(['yesterday', 1]),
+        _cursor(['2026-01-01T00:00:00+00:00', 'one']),
+    ],
+)
+def test_invalid_cursor_is_not_found(api_client, tied_donations, cursor):
+    response = api_client.get(URL, {'cursor': cursor})
+    assert response.status_code == 404
@@ -0,0 +1,53 @@
+import pytest
+
+from donations.models import Donation
+
+URL = '/api/v1/donations/search/'
+
+
+@pytest.fixture
+def causes(db):
+    titles = {
+        'Clean water wells': 'Drilling in dry villages',
+        'School books': 'Textbooks and water bottles for pupils',
+        'Water filters': 'Filters for clean drinking water',
+        'Ambulance fuel': 'Keeps the night shift running',
+    }
+    for title, description in titles.items():
+        Donation.objects.create(title=title, description=description, is_active=True)
+    Donation.objects.create(title='Hidden water tank', description='Inactive')
+
+
+def _titles(response):
+    assert response.status_code == 200
+    return [row['title'] for row in response.data['results']]
+
+
+def test_title_matches_rank_above_description_matches(api_client, causes):
+    titles = _titles(api_client.get(URL, {'q': 'water'}))
+
+    assert set(titles) == {'Clean water wells', 'School books', 'Water filters'}
+    assert titles[-1] == 'School books'
+
+
+def test_typos_fall_back_to_title_trigrams(api_client, causes):
+    assert _titles(api_client.get(URL, {'q': 'ambulanse'})) == ['Ambulance fuel']
+
+
+def test_pages_follow_rank_order(api_client, causes):
+    everything = _titles(api_client.get(URL, {'q': 'water'}))
+
+    seen = []
+    response = api_client.get(URL, {'q': 'water', 'page_size': 1})
+    while True:
+        seen += _titles(response)
+        if not response.data['next']:
+            break
+        response = api_client.get(response.data['next'])
+    assert seen == everything
+
+
+def test_query_is_required(api_client, causes):
+    response = api_client.get(URL, {'q': '  '})
+    assert response.status_code == 400
+    assert 'error' in response.data
@@ -0,0 +1,45 @@
+import pytest
+
+from donations.models import Donation, PendingMediaDeletion
+
+
+@pytest.fixture
+def donations(db):
+    Donation.objects.bulk_create(
+        Donation(
+            title=f'Donation {i}',
+            image=f'donations/{i}.jpg',
+            image_variants={'thumb': f'donations/{i}_thumb.webp'},
+        )
+        for i in range(5)
+    )
+
+
+@pytest.mark.parametrize('columns', [('id', 'image'), ('id', 'image_variants')])
+def test_partial_image_columns_load_in_one_query(
+    donations, django_assert_num_queries, columns
+):
+    with django_assert_num_queries(1):
+        loaded = list(Donation.objects.only(*columns))
+    assert len(loaded) == 5
+
+
+def test_image_replacement_still_queues_the_old_files(donations):
+    donation = Donation.objects.only('id', 'image').get(title='Donation 0')
+    donation.image = 'donations/new.jpg'
+    donation.save()
+
+    queued = PendingMediaDeletion.objects.values_list('name', flat=True)
+    assert set(queued) == {'donations/0.jpg', 'donations/0_thumb.webp'}
+    donation.refresh_from_db()
+    assert donation.image_variants == {}
+
+
+@pytest.mark.parametrize(
+    'columns', [('id',), ('id', 'image'), ('id', 'image_variants')]
+)
+def test_deleting_deferred_donations_queues_their_files(donations, columns):
+    Donation.objects.only(*columns).filter(title='Donation 1').delete()
+
+    queued = PendingMediaDeletion.objects.values_list('name', flat=True)
+    assert set(queued) == {'donations/1.jpg', 'donations/1_thumb.webp'}
@@ -0,0 +1,112 @@
+from decimal import Decimal
+
+import pytest
+from django.core.cache import caches
+
+from donations import cache as catalog_cache
+from donations.models import Category, Donation
+from payments.models import DonationPayment
+from payments.transitions import transition
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(settings):
+    caches[settings.CATALOG_CACHE_ALIAS].clear()
+
+
+@pytest.fixture
+def donation(db):
+    donation = Donation.objects.create(title='Clean water', is_active=True)
+    donation.categories.add(Category.objects.create(name='Water'))
+    return donation
+
+
+def _pay(donation, user, intent_id, status='created'):
+    return DonationPayment.objects.create(
+        donation=donation,
+        user=user,
+        amount=Decimal('25.00'),
+        currency='inr',
+        stripe_payment_intent_id=intent_id,
+        status=status,
+    )
+
+
+def test_payments_leave_updated_at_and_generation_alone(
+    donation, user, django_capture_on_commit_callbacks
+):
+    generation = catalog_cache.get_generation()
+    donation.refresh_from_db()
+    stamped = (donation.updated_at, donation.categories.get().updated_at)
+
+    for i in range(3):
+        _pay(donation, user, f'pi_{i}')
+        with django_capture_on_commit_callbacks(execute=True):
+            transition(f'pi_{i}', 'succeeded')
+
+    donation.refresh_from_db()
+    assert donation.raised_amount == Decimal('75.00')
+    assert (donation.updated_at, donation.categories.get().updated_at) == stamped
+    # Published once, on the next read, however many payments there were.
+    assert catalog_cache.get_generation() == generation + 1
+    assert catalog_cache.get_generation() == generation + 1
+
+
+def test_totals_are_published_at_most_once_per_interval(
+    donation, user, settings, django_capture_on_commit_callbacks
+):
+    generation = catalog_cache.get_generation()
+    for i, expected in ((0, generation + 1), (1, generation + 1)):
+        _pay(donation, user, f'pi_{i}')
+        with django_capture_on_commit_callbacks(execute=True):
+            transition(f'pi_{i}', 'succeeded')
+        assert catalog_cache.get_generation() == expected
+
+    # Once the interval has passed, the pending change goes out.
+    caches[settings.CATALOG_CACHE_ALIAS].delete(catalog_cache.TOTALS_THROTTLE_KEY)
+    assert catalog_cache.get_generation() == generation + 2
+
+
+def test_donation_etag_follows_totals(
+    api_client, donation, user, django_capture_on_commit_callbacks
+):
+    url = f'/api/v1/donations/{donation.pk}/'
+    etag = api_client.get(url)['ETag']
+    _pay(donation, user, 'pi_0')
+    with django_capture_on_commit_callbacks(execute=True):
+        transition('pi_0', 'succeeded')
+
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.data['raised_amount'] == '25.00'
+
+
+def test_mark_as_refunded_only_refunds_succeeded_payments(admin_client, donation):
+    paid = _pay(donation, None, 'pi_paid')
+    failed = _pay(donation, None, 'pi_failed', status='failed')
+    transition('pi_paid', 'succeeded')
+
+    admin_client.post(
+        '/admin/payments/donationpayment/',
+        {'action': 'mark_as_refunded', '_selected_action': [paid.pk, failed.pk]},
+    )
+
+    donation.refresh_from_db()
+    assert donation.refunded_amount == Decimal('25.00')
+    assert DonationPayment.objects.get(pk=failed.pk).status == 'failed'
+
+
+def test_saving_a_deferred_instance_writes_only_loaded_fields(
+    donation, django_assert_num_queries
+):
+    Category.objects.update(raised_amount=Decimal('25.00'))
+    category = Category.objects.only('id', 'name').get()
+    stamped = Category.objects.get().updated_at
+
+    category.name = 'Clean water'
+    with django_assert_num_queries(1):
+        category.save()
+
+    category = Category.objects.get()
+    assert (category.name, category.raised_amount) == ('Clean water', Decimal('25.00'))
+    assert category.updated_at > stamped
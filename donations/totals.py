@@ -0,0 +1,69 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+
+from . import cache as catalog_cache
+from .models import Category, Donation
+
+TOTAL_FIELDS = Donation.total_fields
+
+
+def _increments(deltas):
+    return {name: F(name) + value for name, value in deltas.items() if value}
+
+
+def apply_delta(donation_id, deltas):
+    """
+    Add ``deltas`` to a donation's totals and to each of its categories.
+
+    Runs in the caller's transaction. Categories are locked in id order so
+    concurrent payments for donations sharing categories cannot deadlock.
+    """
+    increments = _increments(deltas)
+    if not increments:
+        return
+
+    # Left out of updated_at and the catalog generation, which follow edits;
+    # catalog_cache.publish_totals makes totals visible on a schedule.
+    Donation.objects.filter(id=donation_id).update(**increments)
+    category_ids = list(
+        Category.objects.filter(donations=donation_id)
+        .order_by('id')
+        .select_for_update()
+        .values_list('id', flat=True)
+    )
+    if category_ids:
+        Category.objects.filter(id__in=category_ids).update(**increments)
+    transaction.on_commit(catalog_cache.note_totals_changed)
+
+
+def shift_memberships(pairs, sign):
+    """
+    Add (``sign=1``) or remove (``sign=-1``) donations' totals to categories.
+
+    ``pairs`` are ``(donation_id, category_id)`` memberships being created or
+    deleted, so category totals keep matching their member donations.
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return
+    totals = {
+        donation_id: values
+        for donation_id, *values in Donation.objects.filter(
+            id__in={donation_id for donation_id, _ in pairs}
+        ).values_list('id', *TOTAL_FIELDS)
+        if any(values)
+    }
+    deltas = defaultdict(lambda: dict.fromkeys(TOTAL_FIELDS, 0))
+    for donation_id, category_id in pairs:
+        if donation_id not in totals:
+            continue
+        for name, value in zip(TOTAL_FIELDS, totals[donation_id], strict=True):
+            deltas[category_id][name] += sign * value
+
+    for category_id in sorted(deltas):
+        increments = _increments(deltas[category_id])
+        if increments:
+            Category.objects.filter(id=category_id).update(**increments)
+    transaction.on_commit(catalog_cache.note_totals_changed)
@@ -1,9 +1,12 @@
 from django.urls import path
 
-from .views import categories, donation
+from .views import categories, category_donations, donation, donations, search
 
 app_name = 'donations'
 urlpatterns = [
     path('categories/', categories),
+    path('categories/<int:pk>/donations/', category_donations),
+    path('donations/', donations),
+    path('donations/search/', search),
     path('donations/<int:pk>/', donation),
 ]
@@ -1,38 +1,218 @@
-from django.db.models import Prefetch
+import hashlib
+
+from django.conf import settings
+from django.db.models import Max, Sum
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
+from django.views.decorators.http import condition
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import (
+    api_view,
+    authentication_classes,
+    permission_classes,
+)
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from accounts.authentication import ClaimsJWTAuthentication
+from config.pagination import KeysetPagination
+
+from . import cache as catalog_cache
+from . import catalog
 from .models import Category, Donation
-from .serializers import CategoryWithDonationSerializer, DonationSerializer
+from .search import SearchPagination, search_donations
+from .serializers import (
+    DonationFilterSerializer,
+    DonationSerializer,
+    DonationWithoutCategorySerializer,
+)
+
+
+def _include_donations(request):
+    return request.query_params.get('include_donations', 'true').lower() not in (
+        '0',
+        'false',
+    )
+
+
+def _fieldset_key(fields, omit):
+    return (None if fields is None else sorted(fields), sorted(omit))
+
+
+def _catalog_variant(request):
+    fields, omit = DonationWithoutCategorySerializer.parse_fieldset(
+        request.query_params
+    )
+    # Image URLs are absolute, so the rendered body depends on the host.
+    return catalog_cache.variant_key(
+        request.build_absolute_uri('/'),
+        _include_donations(request),
+        _fieldset_key(fields, omit),
+    )
+
+
+def _catalog(request):
+    """Fetch the catalog body once, for both the ETag and the response."""
+    if not hasattr(request, 'catalog'):
+
+        def render():
+            if not _include_donations(request):
+                return catalog.render_categories(request)
+
+            fields, omit = DonationWithoutCategorySerializer.parse_fieldset(
+                request.query_params
+            )
+            if settings.CATALOG_FAST_PATH:
+                return catalog.render_fast(request, fields, omit)
+            return catalog.render_with_serializers(request, fields, omit)
+
+        request.catalog = catalog_cache.get_catalog(_catalog_variant(request), render)
+    return request.catalog
+
+
+def _catalog_etag(request):
+    # Hashed from the body itself: the generation is per process without a
+    # shared cache, so it cannot tell bodies rendered elsewhere apart.
+    body, _ = _catalog(request)
+    return hashlib.sha1(body, usedforsecurity=False).hexdigest()
+
+
+def _donation_version(request, pk):
+    """Fetch the database state a donation's representation depends on, once."""
+    if not hasattr(request, 'donation_version'):
+        version = Donation.objects.filter(id=pk, is_active=True).aggregate(
+            updated_at=Max('updated_at'),
+            categories_updated_at=Max('categories__updated_at'),
+            # Totals move without touching updated_at, the donation's and its
+            # categories' alike.
+            **{name: Max(name) for name in Donation.total_fields},
+            **{
+                f'categories_{name}': Sum(f'categories__{name}')
+                for name in Category.total_fields
+            },
+        )
+        request.donation_version = version if version['updated_at'] else None
+    return request.donation_version
+
+
+def _donation_etag(request, pk):
+    version = _donation_version(request, pk)
+    if version is None:
+        return None
+    return catalog_cache.variant_key(
+        pk,
+        *version.values(),
+        request.build_absolute_uri('/'),
+        _fieldset_key(*DonationSerializer.parse_fieldset(request.query_params)),
+    )
 
 
 @api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
 @permission_classes([IsAuthenticated])
+@condition(etag_func=_catalog_etag)
 def categories(request):
-    active_donations = Donation.objects.filter(is_active=True)
+    body, hit = _catalog(request)
+
+    response = HttpResponse(
+        body, content_type='application/json', status=status.HTTP_200_OK
+    )
+    response['X-Catalog-Cache'] = 'hit' if hit else 'miss'
+    return response
 
-    categories = Category.objects.prefetch_related(
-        Prefetch('donations', queryset=active_donations)
-    ).order_by('id')
 
-    serializer = CategoryWithDonationSerializer(
-        categories, many=True, context={'request': request}
+def _paginated_donations(request, category_id=None):
+    filters = DonationFilterSerializer(data=request.query_params.dict())
+    filters.is_valid(raise_exception=True)
+    params = filters.validated_data
+
+    fields, omit = DonationWithoutCategorySerializer.parse_fieldset(
+        request.query_params
     )
+    columns = DonationWithoutCategorySerializer.model_columns(fields, omit)
+    # The cursor needs created_at even when it is not rendered.
+    queryset = Donation.objects.only('created_at', *columns)
+    if not request.user.is_staff:
+        queryset = queryset.filter(is_active=True)
+    elif params['is_active'] is not None:
+        queryset = queryset.filter(is_active=params['is_active'])
 
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    category_id = category_id or params.get('category')
+    if category_id:
+        queryset = queryset.filter(categories=category_id)
+    if 'min_amount' in params:
+        queryset = queryset.filter(amount__gte=params['min_amount'])
+    if 'max_amount' in params:
+        queryset = queryset.filter(amount__lte=params['max_amount'])
+
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(queryset, request)
+    serializer = DonationWithoutCategorySerializer(
+        page,
+        many=True,
+        context={'request': request, 'fields': fields, 'omit': omit},
+    )
+    return paginator.get_paginated_response(serializer.data)
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def donation(request, pk):
-    donation = get_object_or_404(
-        Donation.objects.prefetch_related('categories').order_by('id'),
-        id=pk,
-        is_active=True,
+def donations(request):
+    return _paginated_donations(request)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def category_donations(request, pk):
+    category = get_object_or_404(Category, id=pk)
+    return _paginated_donations(request, category_id=category.id)
+
+
+@api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def search(request):
+    term = request.query_params.get('q', '').strip()
+    if not term:
+        return Response(
+            {'error': 'Query parameter q is required'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    fields, omit = DonationWithoutCategorySerializer.parse_fieldset(
+        request.query_params
+    )
+    columns = DonationWithoutCategorySerializer.model_columns(fields, omit)
+    queryset = search_donations(
+        Donation.objects.only(*columns).filter(is_active=True), term
+    )
+
+    paginator = SearchPagination()
+    page = paginator.paginate_queryset(queryset, request)
+    serializer = DonationWithoutCategorySerializer(
+        page,
+        many=True,
+        context={'request': request, 'fields': fields, 'omit': omit},
     )
+    return paginator.get_paginated_response(serializer.data)
+
+
+@api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
+@permission_classes([IsAuthenticated])
+@condition(etag_func=_donation_etag)
+def donation(request, pk):
+    fields, omit = DonationSerializer.parse_fieldset(request.query_params)
 
-    serializer = DonationSerializer(donation, many=False, context={'request': request})
+    queryset = Donation.objects.only(*DonationSerializer.model_columns(fields, omit))
+    if (fields is None or 'categories' in fields) and 'categories' not in omit:
+        queryset = queryset.prefetch_related('categories')
+
+    donation = get_object_or_404(queryset.order_by('id'), id=pk, is_active=True)
+
+    serializer = DonationSerializer(
+        donation,
+        many=False,
+        context={'request': request, 'fields': fields, 'omit': omit},
+    )
     return Response(serializer.data, status=status.HTTP_200_OK)
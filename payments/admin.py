@@ -1,12 +1,83 @@
+from django.conf import settings
 from django.contrib import admin, messages
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
 from import_export.admin import ExportMixin, ImportExportActionModelAdmin
 
-from payments.models import DonationPayment, StripeEvent
+from config.pagination import EstimatedCountPaginator
+from donations.models import Donation
+from payments import exports, refunds
+from payments.models import (
+    DailyRevenue,
+    DonationPayment,
+    GivingSummary,
+    RefundRequest,
+    StripeEvent,
+)
 from payments.resources import StripeEventResource
+from payments.transitions import EVENT_STATUSES, set_status
+
+INTENT_PREFIXES = ('pi_', DonationPayment.PLACEHOLDER_PREFIX)
+
+
+# Matching users or donations beyond this are left to a subquery.
+MAX_SEARCH_IDS = 500
+
+
+def _ids(queryset):
+    """
+    The matching primary keys, as a list when there are only a few.
+
+    A literal list lets the planner see how selective the search is and
+    use the payment's foreign-key indexes. A broad term matches so many
+    payments that scanning newest first finds a page quickly anyway.
+    """
+    ids = list(queryset.values_list('pk', flat=True)[: MAX_SEARCH_IDS + 1])
+    return ids if len(ids) <= MAX_SEARCH_IDS else queryset.values('pk')
+
+
+class EventTypeFilter(admin.SimpleListFilter):
+    """The handled event types, without a DISTINCT scan of the table."""
+
+    title = 'event type'
+    parameter_name = 'event_type'
+
+    def lookups(self, request, model_admin):
+        return [(event_type, event_type) for event_type in EVENT_STATUSES]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(event_type=self.value())
+        return queryset
+
+
+class StreamingExportAdminMixin:
+    """
+    Actions that stream the selection as a download.
+
+    Unlike the import-export exports, nothing is built in memory first, so
+    "select all" over a large filtered changelist is safe.
+    """
+
+    def _export(self, queryset, fmt, compress):
+        name = queryset.model._meta.model_name  # noqa: SLF001
+        return exports.response(
+            queryset, f'{name}-{timezone.now():%Y%m%d-%H%M%S}', fmt, compress
+        )
+
+    @admin.action(description='Stream selected as CSV')
+    def export_csv(self, request, queryset):
+        return self._export(queryset, 'csv', compress=False)
+
+    @admin.action(description='Stream selected as gzipped JSONL')
+    def export_jsonl_gz(self, request, queryset):
+        return self._export(queryset, 'jsonl', compress=True)
 
 
 @admin.register(DonationPayment)
-class DonationPaymentAdmin(ImportExportActionModelAdmin):
+class DonationPaymentAdmin(StreamingExportAdminMixin, ImportExportActionModelAdmin):
     list_display = [
         'id',
         'user',
@@ -17,7 +88,9 @@ class DonationPaymentAdmin(ImportExportActionModelAdmin):
         'created_at',
     ]
 
-    list_filter = ['status']
+    # A date filter rather than date_hierarchy, whose year and month links
+    # scan every row for their distinct dates.
+    list_filter = ['status', 'created_at']
     search_fields = [
         'user__email',
         'user__username',
@@ -26,8 +99,9 @@ class DonationPaymentAdmin(ImportExportActionModelAdmin):
     ]
 
     list_select_related = ['user', 'donation']
-    date_hierarchy = 'created_at'
     ordering = ['-id']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     fields = [
         'id',
@@ -52,44 +126,232 @@ class DonationPaymentAdmin(ImportExportActionModelAdmin):
         'updated_at',
     ]
 
-    actions = ['mark_as_refunded']
+    actions = ['refund_via_stripe', 'mark_as_refunded', 'export_csv', 'export_jsonl_gz']
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        # Each branch is served by a trigram index on UPPER(column).
+        if term.startswith(INTENT_PREFIXES):
+            return queryset.filter(stripe_payment_intent_id__istartswith=term), False
+        users = get_user_model().objects.all()
+        if '@' in term:
+            # 'jane@ex' matches the start of addresses; '@gmail.com' has no
+            # local part and matches a domain anywhere in them.
+            lookup = (
+                'email__icontains' if term.startswith('@') else 'email__istartswith'
+            )
+            users = users.filter(**{lookup: term})
+            return queryset.filter(user_id__in=_ids(users)), False
+        users = users.filter(Q(email__icontains=term) | Q(username__icontains=term))
+        donations = Donation.objects.filter(title__icontains=term)
+        queryset = queryset.filter(
+            Q(user_id__in=_ids(users))
+            | Q(donation_id__in=_ids(donations))
+            | Q(stripe_payment_intent_id__icontains=term)
+        )
+        return queryset, False
+
+    @admin.action(description='Refund selected payments through Stripe')
+    def refund_via_stripe(self, request, queryset):
+        ids = refunds.queue(
+            DonationPayment.objects.filter(pk__in=queryset.values('pk')),
+            requested_by=request.user,
+        )
+        if len(ids) > settings.REFUND_INLINE_LIMIT:
+            self.message_user(
+                request,
+                f'{len(ids)} refund(s) queued; process_refunds will submit them.',
+                level=messages.INFO,
+            )
+            return
+
+        finished, retrying = refunds.submit(ids)
+        counts = dict(
+            RefundRequest.objects.filter(id__in=ids, status__in=['failed', 'submitted'])
+            .order_by()
+            .values_list('status')
+            .annotate(Count('id'))
+        )
+        failed = counts.get('failed', 0)
+        self.message_user(
+            request,
+            f'{finished - failed} refund(s) succeeded, '
+            f'{counts.get("submitted", 0)} pending at Stripe, {failed} failed, '
+            f'{retrying} queued for retry.',
+            level=messages.WARNING if failed or retrying else messages.SUCCESS,
+        )
 
     @admin.action(description='Mark selected payments as refunded (manual)')
     def mark_as_refunded(self, request, queryset):
-        updated = queryset.exclude(status='refunded').update(status='refunded')
+        with transaction.atomic():
+            # Changelist querysets may join nullable relations or be
+            # distinct, neither of which FOR UPDATE accepts.
+            # Only money that was raised can be refunded; anything else would
+            # inflate refunded_amount.
+            payments = (
+                DonationPayment.objects.filter(
+                    pk__in=queryset.values('pk'), status='succeeded'
+                )
+                .order_by('id')
+                .select_for_update()
+            )
+            updated = sum(set_status(payment, 'refunded') for payment in payments)
 
+        skipped = queryset.count() - updated
         self.message_user(
             request,
-            f'{updated} payment(s) marked as refunded.',
+            f'{updated} payment(s) marked as refunded'
+            + (f', {skipped} skipped as not succeeded.' if skipped else '.'),
             level=messages.WARNING,
         )
 
 
+@admin.register(GivingSummary)
+class GivingSummaryAdmin(admin.ModelAdmin):
+    list_display = [
+        'user',
+        'total_given',
+        'donation_count',
+        'causes_supported',
+        'updated_at',
+    ]
+    list_select_related = ['user']
+    search_fields = ['user__email', 'user__username']
+    ordering = ['-total_given']
+
+    # Maintained from payments; rebuild_giving_summaries repairs drift.
+    readonly_fields = list_display
+    fields = readonly_fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailyRevenue)
+class DailyRevenueAdmin(admin.ModelAdmin):
+    list_display = [
+        'day',
+        'donation',
+        'status',
+        'currency',
+        'payment_count',
+        'amount',
+        'updated_at',
+    ]
+    list_filter = ['status', 'currency']
+    list_select_related = ['donation']
+    ordering = ['-day', 'donation']
+
+    # Maintained from payments; rebuild_revenue_rollups repairs drift.
+    readonly_fields = list_display
+    fields = readonly_fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(RefundRequest)
+class RefundRequestAdmin(admin.ModelAdmin):
+    list_display = [
+        'id',
+        'payment',
+        'status',
+        'stripe_refund_id',
+        'attempts',
+        'requested_by',
+        'created_at',
+        'completed_at',
+    ]
+    list_filter = ['status']
+    search_fields = ['stripe_refund_id', 'payment__stripe_payment_intent_id']
+    list_select_related = ['payment', 'requested_by']
+    ordering = ['-id']
+
+    readonly_fields = [*list_display, 'last_error', 'next_attempt_at']
+    fields = readonly_fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(StripeEvent)
-class StripeEventAdmin(ExportMixin, admin.ModelAdmin):
+class StripeEventAdmin(StreamingExportAdminMixin, ExportMixin, admin.ModelAdmin):
     resource_class = StripeEventResource
 
     list_display = [
         'event_id',
         'event_type',
         'payment_intent_id',
+        'status',
+        'attempts',
+        'received_at',
         'processed_at',
     ]
 
-    list_filter = ['event_type']
+    list_filter = ['status', EventTypeFilter, 'received_at']
     search_fields = ['event_id', 'payment_intent_id']
-    ordering = ['-processed_at']
-    date_hierarchy = 'processed_at'
+    ordering = ['-received_at']
+    paginator = EstimatedCountPaginator
+    # Skip the unfiltered COUNT(*) over the whole table on filtered pages.
+    show_full_result_count = False
 
     readonly_fields = [
         'event_id',
         'event_type',
         'payment_intent_id',
+        'status',
+        'attempts',
+        'last_error',
+        'received_at',
+        'next_attempt_at',
         'processed_at',
+        'payload',
     ]
 
     fields = readonly_fields
 
+    actions = ['retry_failed_events', 'export_csv', 'export_jsonl_gz']
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if term.startswith('evt_'):
+            return queryset.filter(event_id=term), False
+        if term.startswith('pi_'):
+            return queryset.filter(payment_intent_id=term), False
+        return super().get_search_results(request, queryset, search_term)
+
+    @admin.action(description='Retry selected failed events')
+    def retry_failed_events(self, request, queryset):
+        updated = queryset.filter(status='failed').update(
+            status='pending', attempts=0, next_attempt_at=timezone.now()
+        )
+
+        self.message_user(
+            request,
+            f'{updated} event(s) queued for processing.',
+            level=messages.INFO,
+        )
+
     # ---- hard locks ----
     def has_add_permission(self, request):
         return False
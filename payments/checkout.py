@@ -0,0 +1,154 @@
+"""
+Reuse of open PaymentIntents across repeated checkout requests.
+
+A double-tapped "Donate" button or a client retry should not create a second
+payment row and PaymentIntent. The user's open intent for a donation is
+cached for a short time. On a miss it is looked up in the database and its
+client secret is read back from Stripe.
+"""
+
+import logging
+from datetime import timedelta
+
+import stripe
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from payments.models import DonationPayment
+from payments.stripe_client import get_client
+
+logger = logging.getLogger(__name__)
+
+# Payment statuses whose intent the donor may still confirm.
+OPEN_STATUSES = ('created', 'requires_action')
+
+# PaymentIntent statuses in which the client can still confirm the intent.
+CONFIRMABLE_INTENT_STATUSES = frozenset(
+    {'requires_payment_method', 'requires_confirmation', 'requires_action'}
+)
+
+
+def _cache():
+    return caches[settings.CHECKOUT_CACHE_ALIAS]
+
+
+def _key(user_id, donation_id):
+    return f'payments:open-intent:{user_id}:{donation_id}'
+
+
+def remember(payment, client_secret):
+    """Cache ``payment``'s intent as the open one for its user and donation."""
+    _cache().set(
+        _key(payment.user_id, payment.donation_id),
+        {
+            'payment_id': payment.id,
+            'amount': str(payment.amount),
+            'client_secret': client_secret,
+        },
+        settings.CHECKOUT_CACHE_TIMEOUT,
+    )
+
+
+def forget(payment):
+    _cache().delete(_key(payment.user_id, payment.donation_id))
+
+
+def client_secret(payment):
+    """
+    Return the client secret of ``payment``'s intent.
+
+    Read from the cache, or else from Stripe. Returns None when the intent
+    can no longer be confirmed. Stripe errors propagate.
+    """
+    if payment.status not in OPEN_STATUSES:
+        return None
+    cached = _cache().get(_key(payment.user_id, payment.donation_id))
+    if cached is not None and cached['payment_id'] == payment.id:
+        return cached['client_secret']
+
+    intent = get_client().v1.payment_intents.retrieve(payment.stripe_payment_intent_id)
+    if intent.status not in CONFIRMABLE_INTENT_STATUSES:
+        return None
+    remember(payment, intent.client_secret)
+    return intent.client_secret
+
+
+def stripe_idempotency_key(payment):
+    """The idempotency key ``payment``'s PaymentIntent is created with."""
+    if payment.idempotency_key:
+        return f'checkout-{payment.user_id}-{payment.idempotency_key}'
+    return f'donation-payment-{payment.id}'
+
+
+def create_intent(payment):
+    """
+    Create the PaymentIntent for ``payment``'s row.
+
+    The parameters and idempotency key are derived from the row alone, so a
+    second call for the same payment within Stripe's 24-hour key window
+    returns the intent the first call created, if it reached Stripe.
+    Stripe errors propagate.
+    """
+    return get_client().v1.payment_intents.create(
+        params={
+            'amount': int(payment.amount * 100),
+            'currency': payment.currency,
+            'metadata': {
+                'payment_id': payment.id,
+                'donation_id': payment.donation_id,
+                'user_id': payment.user_id,
+            },
+            'automatic_payment_methods': {'enabled': True},
+        },
+        options={'idempotency_key': stripe_idempotency_key(payment)},
+    )
+
+
+def was_replayed(intent):
+    """Whether Stripe answered with the intent an earlier call created."""
+    response = intent.last_response
+    return (
+        response is not None and response.headers.get('Idempotent-Replayed') == 'true'
+    )
+
+
+def _open_payment(user, donation):
+    cutoff = timezone.now() - timedelta(seconds=settings.CHECKOUT_REUSE_WINDOW)
+    return (
+        DonationPayment.objects.filter(
+            user=user,
+            donation=donation,
+            status__in=OPEN_STATUSES,
+            amount=donation.amount,
+            created_at__gte=cutoff,
+        )
+        .exclude(
+            stripe_payment_intent_id__startswith=DonationPayment.PLACEHOLDER_PREFIX
+        )
+        .order_by('-created_at')
+        .first()
+    )
+
+
+def open_intent(user, donation):
+    """
+    Return the client secret of an open intent ``user`` can reuse, or None.
+
+    Only intents created within ``CHECKOUT_REUSE_WINDOW`` for the donation's
+    current amount are reused.
+    """
+    cached = _cache().get(_key(user.id, donation.id))
+    if cached is not None and cached['amount'] == str(donation.amount):
+        return cached['client_secret']
+
+    payment = _open_payment(user, donation)
+    if payment is None:
+        return None
+    try:
+        return client_secret(payment)
+    except stripe.StripeError:
+        logger.warning(
+            'Could not read back open intent', extra={'payment_id': payment.id}
+        )
+        return None
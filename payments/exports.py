@@ -0,0 +1,115 @@
+import csv
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+from payments.models import DonationPayment, StripeEvent
+
+# Columns per model; related columns are joined in the same query.
+FIELDS = {
+    DonationPayment: (
+        'id',
+        'created_at',
+        'updated_at',
+        'status',
+        'amount',
+        'currency',
+        'stripe_payment_intent_id',
+        'user_id',
+        'user__email',
+        'user__username',
+        'donation_id',
+        'donation__title',
+    ),
+    StripeEvent: (
+        'id',
+        'event_id',
+        'event_type',
+        'payment_intent_id',
+        'status',
+        'attempts',
+        'last_error',
+        'received_at',
+        'next_attempt_at',
+        'processed_at',
+    ),
+}
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+}
+
+CHUNK_SIZE = 2000
+
+# Rows are encoded into buffers of about this many bytes before being sent.
+_BUFFER_SIZE = 64 * 1024
+
+
+class _Line:
+    """A file-like object that hands back what csv.writer writes to it."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_lines(fields, rows):
+    writer = csv.writer(_Line())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _jsonl_lines(fields, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(fields, row, strict=True)), cls=DjangoJSONEncoder)
+        yield '\n'
+
+
+def _buffered(lines):
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= _BUFFER_SIZE:
+            yield ''.join(buffer).encode()
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer).encode()
+
+
+def _gzipped(chunks):
+    compressor = zlib.compressobj(wbits=31)  # gzip header and trailer
+    for chunk in chunks:
+        if data := compressor.compress(chunk):
+            yield data
+    yield compressor.flush()
+
+
+def stream(queryset, fmt='csv', compress=False, chunk_size=CHUNK_SIZE):
+    """
+    Yield ``queryset`` encoded as ``fmt`` in chunks of bytes.
+
+    Rows come off a server-side cursor ``chunk_size`` at a time as tuples,
+    so memory stays flat however many rows there are.
+    """
+    fields = FIELDS[queryset.model]
+    rows = queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+    lines = _csv_lines(fields, rows) if fmt == 'csv' else _jsonl_lines(fields, rows)
+    chunks = _buffered(lines)
+    return _gzipped(chunks) if compress else chunks
+
+
+def response(queryset, filename, fmt='csv', compress=False):
+    """A download of ``queryset`` that is sent while it is being read."""
+    content_type, extension = FORMATS[fmt]
+    filename = f'{filename}.{extension}'
+    if compress:
+        content_type, filename = 'application/gzip', f'{filename}.gz'
+    streaming = StreamingHttpResponse(
+        stream(queryset, fmt, compress), content_type=content_type
+    )
+    streaming['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return streaming
@@ -0,0 +1,459 @@
+"""
+A local stand-in for the parts of the Stripe API this project calls.
+
+Point ``STRIPE_API_BASE`` at it to exercise the payment path without
+network access. ``latency`` delays every response and ``error_rate`` turns
+that share of requests into 500s, so timeouts and retries can be tested.
+Requests beyond ``rate_limit`` per second are answered with a 429.
+
+Confirming an intent or refunding it sends the matching webhook event to
+``webhook_url``, signed with ``webhook_secret`` the way Stripe signs it.
+``duplicate_rate`` delivers that share of events twice, as Stripe may.
+"""
+
+import hashlib
+import hmac
+import json
+import operator
+import random
+import re
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError, URLError
+from urllib.parse import parse_qsl, urlsplit
+from urllib.request import Request, urlopen
+
+_METADATA_KEY = re.compile(r'^metadata\[(.+)\]$')
+_METADATA_QUERY = re.compile(r"^metadata\['(.+)'\]:'(.*)'$")
+_INTENT_PATH = re.compile(r'^/v1/payment_intents/([^/]+)$')
+_CONFIRM_PATH = re.compile(r'^/v1/payment_intents/([^/]+)/confirm$')
+_CANCEL_PATH = re.compile(r'^/v1/payment_intents/([^/]+)/cancel$')
+_CREATED_FILTER = re.compile(r'^created\[(gte|gt|lte|lt)\]$')
+_COMPARE = {
+    'gte': operator.ge,
+    'gt': operator.gt,
+    'lte': operator.le,
+    'lt': operator.lt,
+}
+
+# Stripe's test payment methods that decline.
+DECLINING_PAYMENT_METHODS = frozenset(
+    {'pm_card_chargeDeclined', 'pm_card_visa_chargeDeclined'}
+)
+_CONFIRMABLE = frozenset(
+    {'requires_payment_method', 'requires_confirmation', 'requires_action'}
+)
+
+
+def _fake_id(prefix):
+    return f'{prefix}_fake_{secrets.token_hex(12)}'
+
+
+def sign(payload, secret, timestamp=None):
+    """Return a ``Stripe-Signature`` header value for ``payload``."""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    signature = hmac.new(
+        secret.encode(), f'{timestamp}.{payload}'.encode(), hashlib.sha256
+    ).hexdigest()
+    return f't={timestamp},v1={signature}'
+
+
+class FakeStripe:
+    """In-memory API state shared by the handler threads."""
+
+    def __init__(
+        self,
+        latency=0.0,
+        error_rate=0.0,
+        webhook_url=None,
+        webhook_secret='',
+        duplicate_rate=0.0,
+        rate_limit=0,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.webhook_url = webhook_url
+        self.webhook_secret = webhook_secret
+        self.duplicate_rate = duplicate_rate
+        self.lock = threading.Lock()
+        self.intents = {}
+        self.refunds = {}
+        self.idempotent_responses = {}
+        self.requests = 0
+        self.rate_limited = 0
+        self._window = self._window_requests = 0
+        # (event type, HTTP status or None, seconds) per webhook delivery.
+        self.deliveries = []
+
+    def admit(self):
+        """Count a request; False if it goes over ``rate_limit`` this second."""
+        with self.lock:
+            self.requests += 1
+            if not self.rate_limit:
+                return True
+            second = int(time.monotonic())
+            if second != self._window:
+                self._window, self._window_requests = second, 0
+            self._window_requests += 1
+            if self._window_requests <= self.rate_limit:
+                return True
+            self.rate_limited += 1
+            return False
+
+    def create_payment_intent(self, form):
+        intent_id = _fake_id('pi')
+        intent = {
+            'id': intent_id,
+            'object': 'payment_intent',
+            'amount': int(form.get('amount', 0)),
+            'amount_received': 0,
+            'currency': form.get('currency', 'inr'),
+            'status': 'requires_payment_method',
+            'client_secret': f'{intent_id}_secret_{secrets.token_hex(12)}',
+            'metadata': {
+                match.group(1): value
+                for key, value in form.items()
+                if (match := _METADATA_KEY.match(key))
+            },
+            'latest_charge': None,
+            'last_payment_error': None,
+            'created': int(time.time()),
+            'livemode': False,
+        }
+        with self.lock:
+            self.intents[intent_id] = intent
+        return 200, intent
+
+    def retrieve_payment_intent(self, intent_id):
+        with self.lock:
+            intent = self.intents.get(intent_id)
+        if intent is None:
+            return 404, _missing('payment_intent', intent_id)
+        return 200, intent
+
+    def list_payment_intents(self, query):
+        limit = min(max(int(query.get('limit', 10)), 1), 100)
+        starting_after = query.get('starting_after')
+        created = {
+            match.group(1): int(value)
+            for key, value in query.items()
+            if (match := _CREATED_FILTER.match(key))
+        }
+        with self.lock:
+            # Newest first, like the API.
+            intents = [
+                intent
+                for intent in reversed(self.intents.values())
+                if all(
+                    _COMPARE[op](intent['created'], value)
+                    for op, value in created.items()
+                )
+            ]
+        if starting_after:
+            ids = [intent['id'] for intent in intents]
+            if starting_after not in ids:
+                return 404, _missing('payment_intent', starting_after)
+            intents = intents[ids.index(starting_after) + 1 :]
+        return 200, _list(intents[:limit], len(intents) > limit, '/v1/payment_intents')
+
+    def search_payment_intents(self, query):
+        match = _METADATA_QUERY.match(query.strip())
+        if match is None:
+            return 400, _error('parameter_invalid', 'Unsupported search query.')
+        key, value = match.groups()
+        with self.lock:
+            found = [
+                intent
+                for intent in self.intents.values()
+                if intent['metadata'].get(key) == value
+            ]
+        return 200, {
+            'object': 'search_result',
+            'data': found,
+            'has_more': False,
+            'next_page': None,
+            'url': '/v1/payment_intents/search',
+        }
+
+    def confirm_payment_intent(self, intent_id, form):
+        """Pay the intent; declining test payment methods fail it."""
+        declined = form.get('payment_method') in DECLINING_PAYMENT_METHODS
+        with self.lock:
+            intent = self.intents.get(intent_id)
+            if intent is None:
+                return 404, _missing('payment_intent', intent_id), None
+            if intent['status'] not in _CONFIRMABLE:
+                return (
+                    400,
+                    _error(
+                        'payment_intent_unexpected_state',
+                        f'This PaymentIntent is {intent["status"]}.',
+                    ),
+                    None,
+                )
+            if declined:
+                intent['last_payment_error'] = {
+                    'type': 'card_error',
+                    'code': 'card_declined',
+                    'message': 'Your card was declined.',
+                }
+                event_type = 'payment_intent.payment_failed'
+            else:
+                intent['status'] = 'succeeded'
+                intent['amount_received'] = intent['amount']
+                intent['latest_charge'] = _fake_id('ch')
+                intent['last_payment_error'] = None
+                event_type = 'payment_intent.succeeded'
+            intent = dict(intent)
+        return 200, intent, (event_type, intent)
+
+    def cancel_payment_intent(self, intent_id):
+        with self.lock:
+            intent = self.intents.get(intent_id)
+            if intent is None:
+                return 404, _missing('payment_intent', intent_id), None
+            if intent['status'] not in _CONFIRMABLE:
+                return (
+                    400,
+                    _error(
+                        'payment_intent_unexpected_state',
+                        f'This PaymentIntent is {intent["status"]}.',
+                    ),
+                    None,
+                )
+            intent['status'] = 'canceled'
+            intent = dict(intent)
+        return 200, intent, ('payment_intent.canceled', intent)
+
+    def create_refund(self, form):
+        intent_id = form.get('payment_intent', '')
+        with self.lock:
+            intent = self.intents.get(intent_id)
+            if intent is None:
+                return 404, _missing('payment_intent', intent_id), None
+            if intent['status'] != 'succeeded':
+                return (
+                    400,
+                    _error(
+                        'charge_not_refundable',
+                        f'PaymentIntent {intent_id} has not succeeded.',
+                    ),
+                    None,
+                )
+            already = sum(
+                refund['amount']
+                for refund in self.refunds.values()
+                if refund['payment_intent'] == intent_id
+            )
+            if already == intent['amount']:
+                return (
+                    400,
+                    _error(
+                        'charge_already_refunded',
+                        f'Charge {intent["latest_charge"]} has already been refunded.',
+                    ),
+                    None,
+                )
+            amount = int(form.get('amount', intent['amount'] - already))
+            if amount <= 0 or already + amount > intent['amount']:
+                return (
+                    400,
+                    _error(
+                        'amount_too_large',
+                        f'Refund amount exceeds what is left on {intent_id}.',
+                    ),
+                    None,
+                )
+            refund = {
+                'id': _fake_id('re'),
+                'object': 'refund',
+                'amount': amount,
+                'currency': intent['currency'],
+                'charge': intent['latest_charge'],
+                'payment_intent': intent_id,
+                'metadata': {
+                    match.group(1): value
+                    for key, value in form.items()
+                    if (match := _METADATA_KEY.match(key))
+                },
+                'reason': form.get('reason'),
+                'status': 'succeeded',
+                'created': int(time.time()),
+            }
+            self.refunds[refund['id']] = refund
+            charge = {
+                'id': intent['latest_charge'],
+                'object': 'charge',
+                'amount': intent['amount'],
+                'amount_refunded': already + amount,
+                'currency': intent['currency'],
+                'payment_intent': intent_id,
+                'refunded': already + amount == intent['amount'],
+            }
+        return 200, refund, ('charge.refunded', charge)
+
+    def deliver(self, event_type, obj):
+        """POST a signed event for ``obj`` to the webhook URL, if one is set."""
+        if not self.webhook_url:
+            return
+        event = {
+            'id': _fake_id('evt'),
+            'object': 'event',
+            'type': event_type,
+            'api_version': '2025-01-27.acacia',
+            'created': int(time.time()),
+            'livemode': False,
+            'data': {'object': obj},
+        }
+        payload = json.dumps(event)
+        copies = 2 if random.random() < self.duplicate_rate else 1
+        for _ in range(copies):
+            request = Request(
+                self.webhook_url,
+                data=payload.encode(),
+                headers={
+                    'Content-Type': 'application/json',
+                    'Stripe-Signature': sign(payload, self.webhook_secret),
+                },
+            )
+            started = time.perf_counter()
+            try:
+                with urlopen(request, timeout=30) as response:
+                    status = response.status
+            except HTTPError as exc:
+                status = exc.code
+            except URLError:
+                status = None
+            with self.lock:
+                self.deliveries.append(
+                    (event_type, status, time.perf_counter() - started)
+                )
+
+
+def _error(code, message):
+    return {
+        'error': {'type': 'invalid_request_error', 'code': code, 'message': message}
+    }
+
+
+def _missing(kind, object_id):
+    return _error('resource_missing', f'No such {kind}: {object_id}')
+
+
+def _list(data, has_more, url):
+    return {'object': 'list', 'data': data, 'has_more': has_more, 'url': url}
+
+
+class FakeStripeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def stripe(self):
+        return self.server.stripe
+
+    def _respond(self, status, body, replayed=False):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('Request-Id', f'req_fake_{secrets.token_hex(8)}')
+        if replayed:
+            self.send_header('Idempotent-Replayed', 'true')
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_form(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return dict(parse_qsl(self.rfile.read(length).decode()))
+
+    def _simulate_network(self):
+        if not self.stripe.admit():
+            self._respond(
+                429,
+                _error('rate_limit', 'Too many requests hit the API too quickly.'),
+            )
+            return False
+        if self.stripe.latency:
+            time.sleep(self.stripe.latency)
+        if random.random() < self.stripe.error_rate:
+            self._respond(500, _error('api_error', 'Injected failure.'))
+            return False
+        return True
+
+    def _post(self, path, form):
+        """Return ``(status, body, event)``; ``event`` is sent as a webhook."""
+        if path == '/v1/payment_intents':
+            return (*self.stripe.create_payment_intent(form), None)
+        if match := _CONFIRM_PATH.match(path):
+            return self.stripe.confirm_payment_intent(match.group(1), form)
+        if match := _CANCEL_PATH.match(path):
+            return self.stripe.cancel_payment_intent(match.group(1))
+        if path == '/v1/refunds':
+            return self.stripe.create_refund(form)
+        return 404, _error('resource_missing', f'Unknown path {path}'), None
+
+    def do_POST(self):
+        form = self._read_form()
+        if not self._simulate_network():
+            return
+
+        key = self.headers.get('Idempotency-Key')
+        if key:
+            with self.stripe.lock:
+                replay = self.stripe.idempotent_responses.get((self.path, key))
+            if replay is not None:
+                self._respond(*replay, replayed=True)
+                return
+
+        status, body, event = self._post(self.path, form)
+
+        if key:
+            with self.stripe.lock:
+                self.stripe.idempotent_responses[(self.path, key)] = (status, body)
+        # Deliver before answering, so a caller that sees the response can
+        # rely on the webhook having been handled.
+        if event is not None:
+            self.stripe.deliver(*event)
+        self._respond(status, body)
+
+    def do_GET(self):
+        if not self._simulate_network():
+            return
+
+        url = urlsplit(self.path)
+        query = dict(parse_qsl(url.query))
+        if url.path == '/v1/payment_intents':
+            response = self.stripe.list_payment_intents(query)
+        elif url.path == '/v1/payment_intents/search':
+            response = self.stripe.search_payment_intents(query.get('query', ''))
+        elif match := _INTENT_PATH.match(url.path):
+            response = self.stripe.retrieve_payment_intent(match.group(1))
+        else:
+            response = (404, _error('resource_missing', f'Unknown path {url.path}'))
+        self._respond(*response)
+
+
+class FakeStripeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, **options):
+        super().__init__(address, FakeStripeHandler)
+        self.stripe = FakeStripe(**options)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+
+def start_in_thread(host='127.0.0.1', port=0, **options):
+    """Start a server on a daemon thread; call ``shutdown()`` to stop it."""
+    server = FakeStripeServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,71 @@
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+
+from payments.models import DonationPayment, GivingSummary
+
+# Adds to the user's summary, creating it on their first gift. The upsert
+# also takes the row lock that serializes this user's concurrent updates.
+_UPSERT_SQL = """
+    INSERT INTO {table} (
+        user_id, total_given, donation_count, causes_supported, updated_at
+    )
+    VALUES (%(user_id)s, %(amount)s, %(count)s, 0, %(now)s)
+    ON CONFLICT (user_id) DO UPDATE
+    SET total_given = {table}.total_given + EXCLUDED.total_given,
+        donation_count = {table}.donation_count + EXCLUDED.donation_count,
+        updated_at = EXCLUDED.updated_at
+"""
+
+
+def apply_transitions(moves):
+    """
+    Apply many ``(payment, old_status, new_status)`` moves at once.
+
+    All the payments' new statuses must already be written. A cause is
+    counted per user and donation across the batch, so two payments to the
+    same donation moving together count it once.
+    """
+    amounts = defaultdict(lambda: [0, 0])
+    causes = defaultdict(lambda: {'ids': [], 'before': False, 'after': False})
+    for payment, old_status, new_status in moves:
+        sign = (new_status == 'succeeded') - (old_status == 'succeeded')
+        if not sign or payment.user_id is None:
+            continue
+        amounts[payment.user_id][0] += sign * payment.amount
+        amounts[payment.user_id][1] += sign
+        cause = causes[payment.user_id, payment.donation_id]
+        cause['ids'].append(payment.id)
+        cause['before'] |= old_status == 'succeeded'
+        cause['after'] |= new_status == 'succeeded'
+
+    table = GivingSummary._meta.db_table  # noqa: SLF001
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        for user_id in sorted(amounts):
+            amount, count = amounts[user_id]
+            cursor.execute(
+                _UPSERT_SQL.format(table=table),
+                {'user_id': user_id, 'amount': amount, 'count': count, 'now': now},
+            )
+
+    for (user_id, donation_id), cause in causes.items():
+        sign = cause['after'] - cause['before']
+        if not sign:
+            continue
+        # Checked only once the row lock is held: a concurrent gift to the
+        # same donation has committed by then, so exactly one of them
+        # counts it.
+        other_gifts = (
+            DonationPayment.objects.filter(
+                user_id=user_id, donation_id=donation_id, status='succeeded'
+            )
+            .exclude(id__in=cause['ids'])
+            .exists()
+        )
+        if not other_gifts:
+            GivingSummary.objects.filter(user_id=user_id).update(
+                causes_supported=F('causes_supported') + sign
+            )
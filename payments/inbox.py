@@ -0,0 +1,155 @@
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import (
+    Avg,
+    Count,
+    DurationField,
+    Exists,
+    ExpressionWrapper,
+    F,
+    Max,
+    Min,
+    OuterRef,
+)
+from django.utils import timezone
+
+from payments.models import StripeEvent
+from payments.webhooks import apply_event
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 8
+
+# A claimed event is left alone this long; if its worker died, another one
+# applies it once the lease ends.
+LEASE = timedelta(minutes=5)
+
+
+def _retry_delay(attempts):
+    return timedelta(seconds=min(30 * 2 ** (attempts - 1), 6 * 60 * 60))
+
+
+def _claimable(now):
+    # An event waits while an earlier event for the same payment intent is
+    # still pending, so each intent's events apply in the order received.
+    earlier = StripeEvent.objects.filter(
+        status='pending',
+        payment_intent_id=OuterRef('payment_intent_id'),
+        id__lt=OuterRef('id'),
+    ).exclude(payment_intent_id='')
+    return (
+        StripeEvent.objects.select_for_update(skip_locked=True)
+        .filter(status='pending', next_attempt_at__lte=now)
+        .exclude(Exists(earlier))
+        .order_by('next_attempt_at', 'id')
+    )
+
+
+def _claim(batch_size, lease):
+    """Lease a batch of due events; other workers skip them until it ends."""
+    now = timezone.now()
+    leased_until = now + lease
+    with transaction.atomic():
+        batch = list(_claimable(now)[:batch_size])
+        StripeEvent.objects.filter(id__in=[event.id for event in batch]).update(
+            next_attempt_at=leased_until
+        )
+    for event in batch:
+        event.next_attempt_at = leased_until
+    return batch
+
+
+def _process(event):
+    """
+    Apply one leased event in its own transaction; return whether it applied.
+
+    Returns None when the lease ran out and another worker took the event.
+    """
+    with transaction.atomic():
+        held = (
+            StripeEvent.objects.select_for_update(skip_locked=True)
+            .filter(
+                id=event.id, status='pending', next_attempt_at=event.next_attempt_at
+            )
+            .exists()
+        )
+        if not held:
+            return None
+        try:
+            with transaction.atomic():
+                apply_event(event.event_id, event.event_type, event.payment_intent_id)
+        except Exception as exc:
+            event.attempts += 1
+            event.last_error = f'{type(exc).__name__}: {exc}'
+            if event.attempts >= MAX_ATTEMPTS:
+                event.status = 'failed'
+            else:
+                event.next_attempt_at = timezone.now() + _retry_delay(event.attempts)
+            logger.warning(
+                'Stripe event failed',
+                extra={'event_id': event.event_id, 'attempts': event.attempts},
+            )
+        else:
+            event.status = 'processed'
+            event.processed_at = timezone.now()
+        event.save(
+            update_fields=[
+                'status',
+                'attempts',
+                'last_error',
+                'next_attempt_at',
+                'processed_at',
+            ]
+        )
+    return event.status == 'processed'
+
+
+def process_stripe_events(batch_size=100, lease=None):
+    """
+    Apply one batch of pending inbox events; return ``(processed, failed)``.
+
+    The batch is leased, so workers in other processes skip it, and then
+    each event commits on its own: payment, totals and summary row locks
+    are held for one event, not for the whole batch. An event whose worker
+    died is picked up again once its lease ends. Failures are retried with
+    exponential backoff and marked ``failed`` after ``MAX_ATTEMPTS``.
+    """
+    processed = failed = 0
+    for event in _claim(batch_size, lease or LEASE):
+        applied = _process(event)
+        if applied:
+            processed += 1
+        elif applied is not None:
+            failed += 1
+    return processed, failed
+
+
+def stats(window=timedelta(minutes=5)):
+    """Queue depth and processing lag of the inbox, for monitoring."""
+    now = timezone.now()
+    pending = StripeEvent.objects.filter(status='pending').aggregate(
+        depth=Count('id'), oldest=Min('received_at')
+    )
+    lag = ExpressionWrapper(
+        F('processed_at') - F('received_at'), output_field=DurationField()
+    )
+    recent = StripeEvent.objects.filter(processed_at__gte=now - window).aggregate(
+        processed=Count('id'), avg_lag=Avg(lag), max_lag=Max(lag)
+    )
+
+    def seconds(delta):
+        return round(delta.total_seconds(), 3) if delta is not None else None
+
+    return {
+        'pending': pending['depth'],
+        'failed': StripeEvent.objects.filter(status='failed').count(),
+        'oldest_pending_age_seconds': seconds(
+            now - pending['oldest'] if pending['oldest'] else None
+        ),
+        'window_seconds': int(window.total_seconds()),
+        'processed_in_window': recent['processed'],
+        'avg_lag_seconds': seconds(recent['avg_lag']),
+        'max_lag_seconds': seconds(recent['max_lag']),
+    }
@@ -0,0 +1,212 @@
+import hashlib
+import statistics
+import time
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from donations.models import Donation
+from payments.models import DonationPayment, StripeEvent
+
+STATUSES = ['succeeded', 'succeeded', 'succeeded', 'failed', 'created', 'refunded']
+
+USERS_SQL = """
+    INSERT INTO {table} (
+        password, is_superuser, username, first_name, last_name, email,
+        is_staff, is_active, date_joined
+    )
+    SELECT
+        '!', false, name, '', '', name || '@example.com', false, true, now()
+    FROM generate_series(1, %(rows)s) AS i,
+        LATERAL (SELECT 'bench' || left(md5(i::text), 12) AS name) AS names
+"""
+
+DONATIONS_SQL = """
+    INSERT INTO donations_donation (
+        title, description, amount, image_variants, is_active,
+        raised_amount, succeeded_count, refunded_amount, created_at, updated_at
+    )
+    SELECT
+        'bench admin ' || (%(words)s::text[])[1 + i %% 4] || ' ' || i, '', 100,
+        '{}'::jsonb, true, 0, 0, 0, now() - make_interval(mins => i), now()
+    FROM generate_series(1, %(rows)s) AS i
+"""
+
+PAYMENTS_SQL = """
+    INSERT INTO payments_donationpayment (
+        donation_id, user_id, amount, currency, stripe_payment_intent_id,
+        status, idempotency_key, created_at, updated_at
+    )
+    SELECT
+        (%(donations)s::bigint[])[1 + i %% cardinality(%(donations)s::bigint[])],
+        (%(users)s::bigint[])[1 + i %% cardinality(%(users)s::bigint[])],
+        100 + i %% 900,
+        'inr',
+        'pi_' || left(md5(i::text), 24),
+        (%(statuses)s::text[])[1 + i %% cardinality(%(statuses)s::text[])],
+        '',
+        now() - make_interval(secs => i * 10),
+        now()
+    FROM generate_series(1, %(rows)s) AS i
+"""
+
+EVENTS_SQL = """
+    INSERT INTO payments_stripeevent (
+        event_id, event_type, payment_intent_id, payload, status, attempts,
+        last_error, received_at, next_attempt_at, processed_at
+    )
+    SELECT
+        'evt_bench_admin_' || i, 'payment_intent.succeeded',
+        'pi_' || left(md5(i::text), 24), '{}'::jsonb, 'processed', 0, '',
+        now() - make_interval(secs => i * 10), now(),
+        now() - make_interval(secs => i * 10)
+    FROM generate_series(1, %(rows)s) AS i
+"""
+
+
+class Rollback(Exception):  # noqa: N818
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Load the payment, donation and Stripe event changelists, plain, '
+        'filtered and searched, over synthetic tables, and check each against '
+        'a query-count and latency budget. Synthetic rows are rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--payments', type=int, default=1_000_000)
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--donations', type=int, default=10_000)
+        parser.add_argument('--events', type=int, default=500_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument(
+            '--max-queries',
+            type=int,
+            default=8,
+            help='Queries allowed per changelist load.',
+        )
+        parser.add_argument(
+            '--max-ms',
+            type=float,
+            default=300,
+            help='Median milliseconds allowed per changelist load.',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            msg = 'bench_admin requires PostgreSQL.'
+            raise CommandError(msg)
+        try:
+            with transaction.atomic():
+                self._seed(options)
+                over = self._bench(options)
+                raise Rollback
+        except Rollback:
+            pass
+        if over:
+            msg = f'{len(over)} changelist(s) over budget: {", ".join(over)}.'
+            raise CommandError(msg)
+
+    def _seed(self, options):
+        started = time.perf_counter()
+        User = get_user_model()  # noqa: N806
+        with connection.cursor() as cursor:
+            cursor.execute(
+                USERS_SQL.format(table=User._meta.db_table),  # noqa: SLF001
+                {'rows': options['users']},
+            )
+            cursor.execute(
+                DONATIONS_SQL,
+                {
+                    'rows': options['donations'],
+                    'words': ['water', 'school', 'medical', 'shelter'],
+                },
+            )
+            users = list(
+                User.objects.filter(username__startswith='bench').values_list(
+                    'id', flat=True
+                )
+            )
+            donations = list(
+                Donation.objects.filter(title__startswith='bench admin ').values_list(
+                    'id', flat=True
+                )
+            )
+            cursor.execute(
+                PAYMENTS_SQL,
+                {
+                    'rows': options['payments'],
+                    'users': users,
+                    'donations': donations,
+                    'statuses': STATUSES,
+                },
+            )
+            cursor.execute(EVENTS_SQL, {'rows': options['events']})
+            cursor.execute('ANALYZE')
+        self.stdout.write(
+            f'Seeded {options["payments"]:,} payments and {options["events"]:,} '
+            f'events in {time.perf_counter() - started:.1f} s'
+        )
+
+    def _bench(self, options):
+        staff = get_user_model().objects.create_superuser(
+            username='bench-admin-staff', email='', password=None
+        )
+        intent = DonationPayment.objects.values_list(
+            'stripe_payment_intent_id', flat=True
+        ).last()
+        donor = f'bench{hashlib.md5(b"4242").hexdigest()[:12]}'  # noqa: S324
+        cases = [
+            (DonationPayment, 'all', {}),
+            (DonationPayment, 'status', {'status__exact': 'failed'}),
+            (DonationPayment, 'intent id', {'q': intent}),
+            (DonationPayment, 'intent prefix', {'q': intent[:20]}),
+            (DonationPayment, 'email', {'q': f'{donor}@example.com'}),
+            (DonationPayment, 'username', {'q': donor[:10]}),
+            (DonationPayment, 'title', {'q': 'admin water 420'}),
+            (Donation, 'all', {}),
+            (Donation, 'search', {'q': 'water'}),
+            (StripeEvent, 'all', {}),
+            (StripeEvent, 'event id', {'q': 'evt_bench_admin_4242'}),
+            (StripeEvent, 'intent id', {'q': intent}),
+        ]
+
+        factory = RequestFactory()
+        over = []
+        for model, label, params in cases:
+            model_admin = admin.site._registry[model]  # noqa: SLF001
+
+            def load(model_admin=model_admin, params=params):
+                request = factory.get('/', params)
+                request.user = staff
+                response = model_admin.changelist_view(request)
+                response.render()
+                return response
+
+            with CaptureQueriesContext(connection) as queries:
+                response = load()
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                load()
+                timings.append(time.perf_counter() - started)
+            elapsed = statistics.median(timings) * 1000
+
+            name = f'{model._meta.model_name} {label}'  # noqa: SLF001
+            fits = (
+                len(queries) <= options['max_queries'] and elapsed <= options['max_ms']
+            )
+            if not fits:
+                over.append(name)
+            self.stdout.write(
+                f'{name:>28}  {response.context_data["cl"].result_count:>9,} rows  '
+                f'{len(queries):>3} queries  {elapsed:8.1f} ms'
+                f'{"" if fits else "  OVER BUDGET"}'
+            )
+        return over
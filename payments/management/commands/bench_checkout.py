@@ -0,0 +1,193 @@
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from donations.models import Donation
+from payments.fake_stripe import start_in_thread
+from payments.models import DonationPayment
+from payments.stripe_client import get_client
+from payments.views import create_payment_intent
+
+# Connections open to the database, and those of them inside a transaction.
+HELD_SQL = """
+    SELECT count(*), count(*) FILTER (WHERE state = 'idle in transaction')
+    FROM pg_stat_activity
+    WHERE datname = current_database()
+        AND pid <> pg_backend_pid()
+        AND backend_type = 'client backend'
+"""
+
+
+def _single_transaction(user, donation, idempotency_key):
+    """The checkout before the two-phase flow, for comparison."""
+    with transaction.atomic():
+        payment = DonationPayment.objects.create(
+            donation=donation,
+            user=user,
+            amount=donation.amount,
+            currency='inr',
+            status='created',
+            stripe_payment_intent_id=(
+                f'{DonationPayment.PLACEHOLDER_PREFIX}{uuid.uuid4().hex}'
+            ),
+        )
+        intent = get_client().v1.payment_intents.create(
+            params={
+                'amount': int(payment.amount * 100),
+                'currency': payment.currency,
+                'metadata': {'payment_id': payment.id},
+            }
+        )
+        payment.stripe_payment_intent_id = intent.id
+        payment.save(update_fields=['stripe_payment_intent_id'])
+
+
+def _two_phase(user, donation, idempotency_key):
+    request = APIRequestFactory().post(
+        '/',
+        {'donation_id': donation.id},
+        format='json',
+        headers={'Idempotency-Key': idempotency_key},
+    )
+    force_authenticate(request, user=user)
+    response = create_payment_intent(request)
+    if response.status_code not in {200, 201}:
+        msg = f'create_payment_intent returned {response.status_code}'
+        raise CommandError(msg)
+
+
+MODES = {'single-transaction': _single_transaction, 'two-phase': _two_phase}
+
+
+class Sampler(threading.Thread):
+    """Polls pg_stat_activity for open connections and those in a transaction."""
+
+    def __init__(self, interval=0.005):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.open = []
+        self.held = []
+
+    def run(self):
+        with connection.cursor() as cursor:
+            while not self.stopped.is_set():
+                cursor.execute(HELD_SQL)
+                open_count, held = cursor.fetchone()
+                self.open.append(open_count)
+                self.held.append(held)
+                time.sleep(self.interval)
+        connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-test create_payment_intent against a local Stripe stand-in and '
+        'report how many database connections are open, and how many sit '
+        'inside a transaction, while Stripe is called. Compares the old '
+        'single-transaction flow with the two-phase view, and with --taps '
+        'how many Stripe calls and payment rows repeated taps cost. Rows '
+        'created are deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=0.2,
+            help='Seconds the stand-in waits before each response.',
+        )
+        parser.add_argument(
+            '--taps',
+            type=int,
+            default=1,
+            help='Times each checkout is submitted, as by a double tap or retry.',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            msg = 'bench_checkout requires PostgreSQL.'
+            raise CommandError(msg)
+
+        server = start_in_thread(latency=options['latency'])
+        suffix = uuid.uuid4().hex[:12]
+        user = get_user_model().objects.create_user(
+            username=f'bench-checkout-{suffix}',
+            email=f'bench-checkout-{suffix}@example.com',
+        )
+        try:
+            with override_settings(
+                STRIPE_API_BASE=server.base_url, STRIPE_MAX_NETWORK_RETRIES=0
+            ):
+                for name, checkout in MODES.items():
+                    # One donation per checkout, so only the repeated taps of
+                    # a checkout can reuse its intent.
+                    donations = Donation.objects.bulk_create(
+                        Donation(
+                            title=f'bench-checkout-{suffix}-{name}-{i}',
+                            amount=Decimal('100.00'),
+                            is_active=True,
+                        )
+                        for i in range(options['requests'])
+                    )
+                    self._run(name, checkout, user, donations, server, options)
+        finally:
+            server.shutdown()
+            DonationPayment.objects.filter(user=user).delete()
+            Donation.objects.filter(
+                title__startswith=f'bench-checkout-{suffix}-'
+            ).delete()
+            user.delete()
+
+    def _run(self, name, checkout, user, donations, server, options):
+        latencies = []
+        stripe_calls = server.stripe.requests
+
+        def one(donation):
+            idempotency_key = uuid.uuid4().hex
+            for _ in range(options['taps']):
+                started = time.perf_counter()
+                try:
+                    checkout(user, donation, idempotency_key)
+                finally:
+                    latencies.append(time.perf_counter() - started)
+                    # As at the end of a request with the default CONN_MAX_AGE.
+                    connection.close()
+
+        # Only the workers' connections should show up in the samples.
+        connection.close()
+        sampler = Sampler()
+        sampler.start()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            list(pool.map(one, donations))
+        elapsed = time.perf_counter() - started
+        sampler.stop()
+
+        quantiles = statistics.quantiles(latencies, n=100)
+        rows = DonationPayment.objects.filter(donation__in=donations).count()
+        self.stdout.write(
+            f'{name:>18}  {len(latencies) / elapsed:7.1f} req/s  '
+            f'p50 {quantiles[49] * 1000:6.0f} ms  p95 {quantiles[94] * 1000:6.0f} ms  '
+            f'p99 {quantiles[98] * 1000:6.0f} ms  '
+            f'open connections: peak {max(sampler.open)}  '
+            f'mean {statistics.fmean(sampler.open):.1f}  '
+            f'in a transaction: peak {max(sampler.held)}  '
+            f'mean {statistics.fmean(sampler.held):.1f}  '
+            f'Stripe calls {server.stripe.requests - stripe_calls}  rows {rows}'
+        )
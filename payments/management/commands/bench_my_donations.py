@@ -0,0 +1,161 @@
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from config.pagination import KeysetPagination
+from donations.models import Donation
+from payments.models import DonationPayment
+from payments.serializers import MyDonationSerializer
+from payments.views import my_donations
+
+STATUSES = ['succeeded', 'succeeded', 'succeeded', 'failed', 'created', 'refunded']
+
+SEED_SQL = """
+    INSERT INTO payments_donationpayment (
+        donation_id, user_id, amount, currency, stripe_payment_intent_id,
+        status, idempotency_key, created_at, updated_at
+    )
+    SELECT
+        %(donation)s,
+        (%(users)s::bigint[])[1 + i %% cardinality(%(users)s::bigint[])],
+        100 + i %% 900,
+        'inr',
+        'pi_bench_history_' || %(tag)s || '_' || i,
+        (%(statuses)s::text[])[1 + i %% cardinality(%(statuses)s::text[])],
+        '',
+        now() - make_interval(mins => i * %(spacing)s),
+        now()
+    FROM generate_series(1, %(rows)s) AS i
+"""
+
+
+class Rollback(Exception):  # noqa: N818
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Time a long-time donor's my-donations history: the whole list as "
+        'it used to be served, against keyset pages, including a deep and a '
+        'status-filtered one. Synthetic users and payments are rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--history', type=int, default=20_000, help="The donor's payments."
+        )
+        parser.add_argument(
+            '--others',
+            type=int,
+            default=500_000,
+            help='Payments spread over other users.',
+        )
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            msg = 'bench_my_donations requires PostgreSQL.'
+            raise CommandError(msg)
+        try:
+            with transaction.atomic():
+                donor = self._seed(options['history'], options['others'])
+                self._bench(donor, options['history'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def _seed(self, history, others):
+        started = time.perf_counter()
+        User = get_user_model()  # noqa: N806
+        donor, *rest = User.objects.bulk_create(
+            User(username=f'bench-history-{i}') for i in range(201)
+        )
+        donation = Donation.objects.create(
+            title='bench-history', amount=Decimal('100.00')
+        )
+        with connection.cursor() as cursor:
+            # The donor gives about daily for years; most other payments
+            # are recent, so their rows crowd the top of created_at.
+            for tag, users, rows, spacing in (
+                ('donor', [donor.id], history, 60 * 24),
+                ('others', [user.id for user in rest], others, 1),
+            ):
+                cursor.execute(
+                    SEED_SQL,
+                    {
+                        'donation': donation.id,
+                        'users': users,
+                        'tag': tag,
+                        'statuses': STATUSES,
+                        'rows': rows,
+                        'spacing': spacing,
+                    },
+                )
+            cursor.execute('ANALYZE payments_donationpayment')
+        self.stdout.write(
+            f'Seeded {history + others:,} payments in '
+            f'{time.perf_counter() - started:.1f} s'
+        )
+        return donor
+
+    def _time(self, fetch, repeat):
+        result = fetch()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            fetch()
+        return result, (time.perf_counter() - started) / repeat
+
+    def _bench(self, donor, history, repeat):
+        def full_history():
+            # my_donations before keyset pagination.
+            payments = (
+                DonationPayment.objects.filter(user=donor)
+                .select_related('donation')
+                .order_by('-created_at')
+            )
+            return MyDonationSerializer(payments, many=True).data
+
+        def page(**params):
+            request = APIRequestFactory().get('/', params)
+            force_authenticate(request, user=donor)
+            response = my_donations(request)
+            response.render()
+            return response
+
+        rows, elapsed = self._time(full_history, repeat)
+        self.stdout.write(
+            f'{"full history":>22}  {len(rows):>6} rows  {elapsed * 1000:8.1f} ms'
+        )
+
+        middle = (
+            DonationPayment.objects.filter(user=donor)
+            .order_by(*KeysetPagination.ordering)
+            .values('created_at', 'id')[history // 2]
+        )
+        cursor = KeysetPagination().encode_cursor(
+            KeysetPagination().position_for(middle)
+        )
+        for label, params in (
+            ('first page', {}),
+            ('deep page', {'cursor': cursor}),
+            ('failed, first page', {'status': 'failed'}),
+            ('refunded, deep page', {'status': 'refunded', 'cursor': cursor}),
+        ):
+            response, elapsed = self._time(lambda params=params: page(**params), repeat)
+            self.stdout.write(
+                f'{label:>22}  {len(response.data["results"]):>6} rows  '
+                f'{elapsed * 1000:8.1f} ms'
+            )
+
+        plan = (
+            DonationPayment.objects.filter(user=donor)
+            .select_related('donation')
+            .only(*MyDonationSerializer.columns)
+            .order_by(*KeysetPagination.ordering)[: KeysetPagination.page_size]
+            .explain()
+        )
+        self.stdout.write(plan)
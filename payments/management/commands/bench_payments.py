@@ -0,0 +1,269 @@
+import random
+import statistics
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import requests
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import (
+    ThreadedWSGIServer,
+    WSGIRequestHandler,
+    get_internal_wsgi_application,
+)
+from django.test import override_settings
+
+from donations.models import Donation
+from payments.fake_stripe import start_in_thread
+from payments.models import DonationPayment, StripeEvent
+
+STEPS = (
+    'register',
+    'login',
+    'create-payment-intent',
+    'confirm + webhook',
+    'my-donations',
+)
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def _start_app():
+    """Serve this project's WSGI app on a free port from a daemon thread."""
+    server = ThreadedWSGIServer(
+        ('127.0.0.1', 0), QuietRequestHandler, allow_reuse_address=False
+    )
+    server.set_app(get_internal_wsgi_application())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _percentile(quantiles, samples, n):
+    return (quantiles[n - 1] if quantiles else samples[0]) * 1000
+
+
+class Recorder:
+    """Per-step latencies and failures, shared by the client threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = Counter()
+
+    def call(self, step, method, url, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = method(url, timeout=60, **kwargs)
+        except requests.RequestException:
+            response = None
+        elapsed = time.perf_counter() - started
+        ok = response is not None and response.ok
+        with self.lock:
+            self.latencies[step].append(elapsed)
+            if not ok:
+                self.errors[step] += 1
+        return response if ok else None
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive register, login, create-payment-intent, a confirmed payment '
+        'with its webhook, and my-donations, for many concurrent users. '
+        'Reports throughput and latency percentiles per step. The app and '
+        'a Stripe stand-in run in-process unless --base-url and '
+        '--stripe-url name running ones. Those must share this database. '
+        'Users, payments and events created are deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument(
+            '--payments', type=int, default=3, help='Payments made per user.'
+        )
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=0.05,
+            help='Seconds the in-process stand-in waits before each response.',
+        )
+        parser.add_argument(
+            '--error-rate',
+            type=float,
+            default=0.0,
+            help='Share of stand-in API requests answered with a 500.',
+        )
+        parser.add_argument(
+            '--decline-rate',
+            type=float,
+            default=0.1,
+            help='Share of payments confirmed with a declining card.',
+        )
+        parser.add_argument('--base-url', help='URL of a running app.')
+        parser.add_argument(
+            '--stripe-url', help='URL of a running fake_stripe command.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if bool(options['base_url']) != bool(options['stripe_url']):
+            msg = 'Pass both --base-url and --stripe-url, or neither.'
+            raise CommandError(msg)
+
+        prefix = f'bench-payments-{uuid.uuid4().hex[:8]}'
+        donation = Donation.objects.create(
+            title=prefix, amount=Decimal('100.00'), is_active=True
+        )
+        app = stripe = None
+        try:
+            if options['base_url']:
+                base_url, stripe_url = options['base_url'], options['stripe_url']
+                self._run(base_url, stripe_url, None, donation, prefix, options)
+                return
+
+            app = _start_app()
+            base_url = f'http://127.0.0.1:{app.server_address[1]}'
+            stripe = start_in_thread(
+                latency=options['latency'],
+                error_rate=options['error_rate'],
+                webhook_url=f'{base_url}/api/v1/payments/stripe/webhook/',
+                webhook_secret=settings.STRIPE_WEBHOOK_SECRET,
+            )
+            with override_settings(
+                STRIPE_API_BASE=stripe.base_url,
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, '127.0.0.1'],
+            ):
+                self._run(
+                    base_url, stripe.base_url, stripe.stripe, donation, prefix, options
+                )
+        finally:
+            for server in (app, stripe):
+                if server is not None:
+                    server.shutdown()
+                    server.server_close()
+            self._cleanup(donation, prefix)
+
+    def _run(self, base_url, stripe_url, fake, donation, prefix, options):
+        recorder = Recorder()
+        rng = random.Random(options['seed'])
+        declines = [
+            rng.random() < options['decline_rate']
+            for _ in range(options['users'] * options['payments'])
+        ]
+        api = f'{base_url}/api/v1'
+
+        def user_flow(index):
+            session = requests.Session()
+            username = f'{prefix}-{index}'
+            password = f'pw-{uuid.uuid4().hex}'
+            registered = recorder.call(
+                'register',
+                session.post,
+                f'{api}/accounts/auth/register/',
+                json={
+                    'username': username,
+                    'email': f'{username}@example.com',
+                    'password': password,
+                },
+            )
+            if registered is None:
+                return
+            login = recorder.call(
+                'login',
+                session.post,
+                f'{api}/accounts/auth/login/',
+                json={'username': username, 'password': password},
+            )
+            if login is None:
+                return
+            session.headers['Authorization'] = f'Bearer {login.json()["access"]}'
+
+            for n in range(options['payments']):
+                created = recorder.call(
+                    'create-payment-intent',
+                    session.post,
+                    f'{api}/payments/stripe/create-payment-intent/',
+                    json={'donation_id': donation.id},
+                    headers={'Idempotency-Key': uuid.uuid4().hex},
+                )
+                if created is None:
+                    continue
+                intent_id = created.json()['clientSecret'].split('_secret_')[0]
+                declined = declines[index * options['payments'] + n]
+                payment_method = (
+                    'pm_card_chargeDeclined' if declined else 'pm_card_visa'
+                )
+                recorder.call(
+                    'confirm + webhook',
+                    requests.post,
+                    f'{stripe_url}/v1/payment_intents/{intent_id}/confirm',
+                    data={'payment_method': payment_method},
+                )
+                recorder.call(
+                    'my-donations', session.get, f'{api}/payments/my-donations/'
+                )
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            list(pool.map(user_flow, range(options['users'])))
+        elapsed = time.perf_counter() - started
+
+        self._report(recorder, elapsed, fake, prefix, options)
+
+    def _report(self, recorder, elapsed, fake, prefix, options):
+        total = sum(len(samples) for samples in recorder.latencies.values())
+        self.stdout.write(
+            f'{options["users"]} users x {options["payments"]} payments, '
+            f'concurrency {options["concurrency"]}: {elapsed:.1f} s, '
+            f'{total / elapsed:.1f} req/s, '
+            f'{options["users"] * options["payments"] / elapsed:.1f} payments/s'
+        )
+        self.stdout.write(
+            f'{"step":>22}  {"count":>6}  {"errors":>6}  '
+            f'{"p50 ms":>7}  {"p95 ms":>7}  {"p99 ms":>7}'
+        )
+        rows = [(step, recorder.latencies[step]) for step in STEPS]
+        if fake is not None:
+            rows.append(('webhook delivery', [d[2] for d in fake.deliveries]))
+            recorder.errors['webhook delivery'] = sum(
+                1 for d in fake.deliveries if d[1] is None or d[1] >= 300
+            )
+        for step, samples in rows:
+            if not samples:
+                continue
+            quantiles = statistics.quantiles(samples, n=100) if len(samples) > 1 else []
+            self.stdout.write(
+                f'{step:>22}  {len(samples):>6}  {recorder.errors[step]:>6}  '
+                f'{_percentile(quantiles, samples, 50):7.0f}  '
+                f'{_percentile(quantiles, samples, 95):7.0f}  '
+                f'{_percentile(quantiles, samples, 99):7.0f}'
+            )
+
+        statuses = Counter(
+            DonationPayment.objects.filter(
+                user__username__startswith=f'{prefix}-'
+            ).values_list('status', flat=True)
+        )
+        summary = ', '.join(
+            f'{status} {count}' for status, count in sorted(statuses.items())
+        )
+        self.stdout.write(f'Payment statuses: {summary}')
+
+    def _cleanup(self, donation, prefix):
+        users = get_user_model().objects.filter(username__startswith=f'{prefix}-')
+        payments = DonationPayment.objects.filter(user__in=users)
+        StripeEvent.objects.filter(
+            payment_intent_id__in=payments.values('stripe_payment_intent_id')
+        ).delete()
+        payments.delete()
+        DonationPayment.objects.filter(donation=donation).delete()
+        donation.delete()
+        users.delete()
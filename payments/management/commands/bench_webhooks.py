@@ -0,0 +1,192 @@
+import json
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from donations.models import Donation
+from payments.models import DonationPayment, StripeEvent
+from payments.transitions import EVENT_STATUSES, record_and_transition, set_status
+from payments.webhooks import _extract_payment_intent_id
+
+
+def _orm_path(event, payment_intent_id, new_status):
+    """The webhook before single-statement transitions, for comparison."""
+    try:
+        with transaction.atomic():
+            StripeEvent.objects.create(
+                event_id=event['id'],
+                event_type=event['type'],
+                payment_intent_id=payment_intent_id,
+                payload=event,
+                processed_at=timezone.now(),
+            )
+    except IntegrityError:
+        return
+    with transaction.atomic():
+        payment = (
+            DonationPayment.objects.select_for_update()
+            .filter(stripe_payment_intent_id=payment_intent_id)
+            .first()
+        )
+        if payment is not None:
+            set_status(payment, new_status)
+
+
+def _statement_path(event, payment_intent_id, new_status):
+    with transaction.atomic():
+        record_and_transition(
+            event['id'], event['type'], payment_intent_id, event, new_status
+        )
+
+
+PATHS = {'orm': _orm_path, 'statement': _statement_path}
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay Stripe webhook events against the database and report events '
+        'per second for the ORM and single-statement transition paths. '
+        'Events come from a JSONL file of recorded payloads, or are '
+        'synthesised with retries and out-of-order deliveries. All rows the '
+        'benchmark creates are deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--events', help='JSONL file of recorded Stripe event payloads.'
+        )
+        parser.add_argument(
+            '--payments',
+            type=int,
+            default=2_000,
+            help='Payment intents to synthesise events for (without --events).',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            msg = 'bench_webhooks requires PostgreSQL.'
+            raise CommandError(msg)
+
+        if options['events']:
+            with open(options['events']) as lines:
+                events = [json.loads(line) for line in lines if line.strip()]
+        else:
+            events = self._synthesise(options['payments'], options['seed'])
+
+        handled = []
+        for event in events:
+            payment_intent_id = _extract_payment_intent_id(event['data']['object'])
+            new_status = EVENT_STATUSES.get(event['type'])
+            if payment_intent_id and new_status:
+                handled.append((event, payment_intent_id, new_status))
+        if not handled:
+            msg = 'No replayable payment events found.'
+            raise CommandError(msg)
+
+        intents = {payment_intent_id for _, payment_intent_id, _ in handled}
+        # Replayed rows are deleted afterwards; never touch real ones.
+        if (
+            DonationPayment.objects.filter(
+                stripe_payment_intent_id__in=intents
+            ).exists()
+            or StripeEvent.objects.filter(payment_intent_id__in=intents).exists()
+        ):
+            msg = 'The events refer to payment intents already in this database.'
+            raise CommandError(msg)
+
+        donation = Donation.objects.create(
+            title=f'bench-webhooks-{time.time_ns()}', amount=Decimal('10.00')
+        )
+        try:
+            results = {}
+            for name, path in PATHS.items():
+                self._reset(donation, intents)
+                started = time.perf_counter()
+                for event, payment_intent_id, new_status in handled:
+                    path(event, payment_intent_id, new_status)
+                elapsed = time.perf_counter() - started
+                results[name] = self._final_statuses(intents)
+                self.stdout.write(
+                    f'{name:>10}  {len(handled):>7} events  '
+                    f'{elapsed:7.2f} s  {len(handled) / elapsed:9.0f} events/s'
+                )
+            self._compare(results)
+        finally:
+            self._cleanup(donation, intents)
+
+    def _synthesise(self, count, seed):
+        """Typical lifecycles, shuffled per intent, with duplicate deliveries."""
+        rng = random.Random(seed)
+        events = []
+        for i in range(count):
+            payment_intent_id = f'pi_bench_{i}'
+            lifecycle = ['payment_intent.processing', 'payment_intent.succeeded']
+            if i % 10 == 0:
+                lifecycle[1] = 'payment_intent.payment_failed'
+            elif i % 5 == 0:
+                lifecycle.append('charge.refunded')
+            # Stripe retries and does not guarantee ordering.
+            if rng.random() < 0.3:
+                lifecycle.reverse()
+            for n, event_type in enumerate(lifecycle):
+                obj = (
+                    {'object': 'charge', 'payment_intent': payment_intent_id}
+                    if event_type.startswith('charge.')
+                    else {'object': 'payment_intent', 'id': payment_intent_id}
+                )
+                event = {
+                    'id': f'evt_bench_{i}_{n}',
+                    'type': event_type,
+                    'data': {'object': obj},
+                }
+                events.append(event)
+                if rng.random() < 0.2:
+                    events.append(event)
+        return events
+
+    def _reset(self, donation, intents):
+        StripeEvent.objects.filter(payment_intent_id__in=intents).delete()
+        DonationPayment.objects.filter(stripe_payment_intent_id__in=intents).delete()
+        DonationPayment.objects.bulk_create(
+            DonationPayment(
+                donation=donation,
+                amount=donation.amount,
+                status='created',
+                stripe_payment_intent_id=payment_intent_id,
+            )
+            for payment_intent_id in intents
+        )
+        Donation.objects.filter(id=donation.id).update(
+            **dict.fromkeys(Donation.total_fields, 0)
+        )
+
+    def _final_statuses(self, intents):
+        return dict(
+            DonationPayment.objects.filter(
+                stripe_payment_intent_id__in=intents
+            ).values_list('stripe_payment_intent_id', 'status')
+        )
+
+    def _compare(self, results):
+        orm, statement = results['orm'], results['statement']
+        regressed = sum(
+            1
+            for payment_intent_id, status in orm.items()
+            if status == 'processing' and statement[payment_intent_id] != status
+        )
+        differing = sum(1 for key in orm if orm[key] != statement[key])
+        self.stdout.write(
+            f'{differing} payment(s) end in a different status; '
+            f'{regressed} of them were left in processing by late events on '
+            'the ORM path.'
+        )
+
+    def _cleanup(self, donation, intents):
+        StripeEvent.objects.filter(payment_intent_id__in=intents).delete()
+        DonationPayment.objects.filter(stripe_payment_intent_id__in=intents).delete()
+        donation.delete()
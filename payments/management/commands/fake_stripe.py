@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from payments.fake_stripe import FakeStripeServer
+
+
+class Command(BaseCommand):
+    help = (
+        'Serve a local stand-in for the Stripe API. Start the app with '
+        'STRIPE_API_BASE set to the printed URL. Confirmations and refunds '
+        'are sent to --webhook-url as events signed with '
+        'STRIPE_WEBHOOK_SECRET.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=12111)
+        parser.add_argument(
+            '--webhook-url',
+            default='http://127.0.0.1:8000/api/v1/payments/stripe/webhook/',
+        )
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=0.0,
+            help='Seconds to wait before each response.',
+        )
+        parser.add_argument(
+            '--error-rate',
+            type=float,
+            default=0.0,
+            help='Share of API requests answered with a 500.',
+        )
+        parser.add_argument(
+            '--rate-limit',
+            type=int,
+            default=0,
+            help='API requests per second before answering 429 (0: no limit).',
+        )
+        parser.add_argument(
+            '--duplicate-rate',
+            type=float,
+            default=0.0,
+            help='Share of webhook events delivered twice.',
+        )
+
+    def handle(self, *args, **options):
+        server = FakeStripeServer(
+            (options['host'], options['port']),
+            latency=options['latency'],
+            error_rate=options['error_rate'],
+            webhook_url=options['webhook_url'],
+            webhook_secret=settings.STRIPE_WEBHOOK_SECRET,
+            duplicate_rate=options['duplicate_rate'],
+            rate_limit=options['rate_limit'],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Fake Stripe listening on {server.base_url}')
+        )
+        self.stdout.write(f'Set STRIPE_API_BASE={server.base_url} for the app.')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(
+                f'{server.stripe.requests} API request(s), '
+                f'{len(server.stripe.deliveries)} webhook delivery(ies).'
+            )
@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from payments import refunds
+
+
+class Command(BaseCommand):
+    help = (
+        'Submit queued refund requests to Stripe on a thread pool, within a '
+        'request rate, and look up refunds Stripe reported as pending until '
+        'they settle. Several workers can run at once; each leases its own '
+        'batch.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--concurrency', type=int, default=refunds.CONCURRENCY)
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=refunds.RATE,
+            help='Stripe requests per second across all threads (0: no limit).',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for new requests instead of exiting when idle.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Seconds to sleep between polls when idle (with --loop).',
+        )
+
+    def handle(self, *args, **options):
+        total_finished = total_retrying = 0
+        started = time.perf_counter()
+        while True:
+            finished, retrying = refunds.submit(
+                batch_size=options['batch_size'],
+                concurrency=options['concurrency'],
+                rate=options['rate'],
+            )
+            total_finished += finished
+            total_retrying += retrying
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Finished {total_finished} refund request(s) in {elapsed:.1f} s; '
+                f'{total_retrying} scheduled for retry.'
+            )
+        )
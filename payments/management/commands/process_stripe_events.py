@@ -0,0 +1,56 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from payments.inbox import process_stripe_events, stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Apply pending Stripe events from the webhook inbox in batches. '
+        'Several workers can run at once; each skips rows the others hold.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for new events instead of exiting when idle.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Seconds to sleep between polls when idle (with --loop).',
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Print queue depth and processing lag as JSON and exit.',
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.stdout.write(json.dumps(stats()))
+            return
+
+        total_processed = total_failed = 0
+        while True:
+            processed, failed = process_stripe_events(batch_size=options['batch_size'])
+            total_processed += processed
+            total_failed += failed
+
+            if processed or failed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Processed {total_processed} event(s); {total_failed} failure(s) '
+                'scheduled for retry.'
+            )
+        )
@@ -0,0 +1,93 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from donations import cache as catalog_cache
+from donations.models import Category, Donation
+from donations.totals import TOTAL_FIELDS
+from payments.models import DonationPayment
+
+
+def _expected(queryset, payments):
+    """Annotate ``expected_<field>`` for each total, computed from payments."""
+    zero = Value(Decimal('0.00'), output_field=DecimalField())
+    succeeded = Q(**{f'{payments}__status': 'succeeded'})
+    refunded = Q(**{f'{payments}__status': 'refunded'})
+    return queryset.annotate(
+        expected_raised_amount=Coalesce(
+            Sum(f'{payments}__amount', filter=succeeded), zero
+        ),
+        expected_succeeded_count=Count(payments, filter=succeeded),
+        expected_refunded_amount=Coalesce(
+            Sum(f'{payments}__amount', filter=refunded), zero
+        ),
+    )
+
+
+def _drifted(queryset):
+    drift = Q()
+    for name in TOTAL_FIELDS:
+        drift |= ~Q(**{name: F(f'expected_{name}')})
+    return queryset.filter(drift).order_by('id')
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute donation and category fundraising totals from payments, '
+        'writing only the rows that drifted.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Report drift without writing; exit non-zero if any is found.',
+        )
+
+    def handle(self, *args, **options):
+        verify = options['verify']
+        drifted = 0
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                # Hold off status changes so totals and payments agree.
+                table = DonationPayment._meta.db_table  # noqa: SLF001
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LOCK TABLE {table} IN SHARE MODE')
+
+            for queryset in (
+                _expected(Donation.objects.all(), 'payments'),
+                _expected(Category.objects.all(), 'donations__payments'),
+            ):
+                rows = list(_drifted(queryset))
+                drifted += len(rows)
+                self._report(queryset.model, rows)
+                if rows and not verify:
+                    self._rebuild(queryset.model, rows)
+
+        if verify and drifted:
+            msg = f'{drifted} row(s) have drifted from their payments.'
+            raise CommandError(msg)
+        if drifted and not verify:
+            catalog_cache.bump_generation()
+        self.stdout.write(f'{drifted} row(s) {"drifted" if verify else "rebuilt"}.')
+
+    def _report(self, model, rows):
+        for row in rows:
+            changes = ', '.join(
+                f'{name} {getattr(row, name)} -> {getattr(row, f"expected_{name}")}'
+                for name in TOTAL_FIELDS
+                if getattr(row, name) != getattr(row, f'expected_{name}')
+            )
+            self.stdout.write(f'{model.__name__} {row.id}: {changes}')
+
+    def _rebuild(self, model, rows):
+        now = timezone.now()
+        for row in rows:
+            for name in TOTAL_FIELDS:
+                setattr(row, name, getattr(row, f'expected_{name}'))
+            row.updated_at = now
+        model.objects.bulk_update(rows, [*TOTAL_FIELDS, 'updated_at'], batch_size=500)
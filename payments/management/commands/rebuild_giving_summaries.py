@@ -0,0 +1,109 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from payments.models import GivingSummary
+
+FIELDS = GivingSummary.total_fields
+
+BATCH_SIZE = 500
+
+
+# Adds each drifted summary's difference to it, like a transition does,
+# rather than overwriting it: a transition committed after the drift was
+# read keeps its own delta, so no lock is needed.
+REPAIR_SQL = """
+    INSERT INTO {table} (
+        user_id, total_given, donation_count, causes_supported, updated_at
+    )
+    VALUES {rows}
+    ON CONFLICT (user_id) DO UPDATE
+    SET total_given = {table}.total_given + EXCLUDED.total_given,
+        donation_count = {table}.donation_count + EXCLUDED.donation_count,
+        causes_supported = {table}.causes_supported + EXCLUDED.causes_supported,
+        updated_at = EXCLUDED.updated_at
+"""
+
+
+def _drifted():
+    """
+    Users whose summary, missing meaning all zeros, disagrees with payments.
+
+    One query reads payments and summaries from one snapshot, and every
+    transition writes both in one transaction, so in-flight transitions
+    never show up as drift.
+    """
+    zero = Value(Decimal('0.00'), output_field=DecimalField())
+    succeeded = Q(donation_payments__status='succeeded')
+    users = get_user_model().objects.annotate(
+        expected_total_given=Coalesce(
+            Sum('donation_payments__amount', filter=succeeded), zero
+        ),
+        expected_donation_count=Count('donation_payments', filter=succeeded),
+        expected_causes_supported=Count(
+            'donation_payments__donation', filter=succeeded, distinct=True
+        ),
+        current_total_given=Coalesce('giving_summary__total_given', zero),
+        current_donation_count=Coalesce('giving_summary__donation_count', 0),
+        current_causes_supported=Coalesce('giving_summary__causes_supported', 0),
+    )
+    drift = Q()
+    for name in FIELDS:
+        drift |= ~Q(**{f'current_{name}': F(f'expected_{name}')})
+    return users.filter(drift).order_by('id')
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute users' giving summaries from their payments and correct "
+        'the ones that drifted, without locking payments.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Report drift without writing; exit non-zero if any is found.',
+        )
+
+    def handle(self, *args, **options):
+        verify = options['verify']
+        users = list(_drifted())
+        for user in users:
+            changes = ', '.join(
+                f'{name} {getattr(user, f"current_{name}")} -> '
+                f'{getattr(user, f"expected_{name}")}'
+                for name in FIELDS
+                if getattr(user, f'current_{name}') != getattr(user, f'expected_{name}')
+            )
+            self.stdout.write(f'User {user.id}: {changes}')
+        if users and not verify:
+            for start in range(0, len(users), BATCH_SIZE):
+                self._repair(users[start : start + BATCH_SIZE])
+
+        if verify and users:
+            msg = f'{len(users)} giving summary(ies) have drifted from payments.'
+            raise CommandError(msg)
+        self.stdout.write(
+            f'{len(users)} summary(ies) {"drifted" if verify else "rebuilt"}.'
+        )
+
+    def _repair(self, users):
+        now = timezone.now()
+        params = []
+        for user in users:
+            params.append(user.id)
+            params.extend(
+                getattr(user, f'expected_{name}') - getattr(user, f'current_{name}')
+                for name in FIELDS
+            )
+            params.append(now)
+        rows = ', '.join(['(%s, %s, %s, %s, %s)'] * len(users))
+        table = GivingSummary._meta.db_table  # noqa: SLF001
+        with connection.cursor() as cursor:
+            cursor.execute(REPAIR_SQL.format(table=table, rows=rows), params)
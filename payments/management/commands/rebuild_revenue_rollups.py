@@ -0,0 +1,130 @@
+import time as clock
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from payments import rollups
+from payments.models import DailyRevenue, DonationPayment
+
+# Rollup rows that disagree with the payments created in a chunk of days.
+# One statement reads both tables from one snapshot, and every transition
+# writes a payment and its rollups in one transaction, so in-flight
+# transitions never show up as drift.
+DRIFT_SQL = """
+    WITH expected AS ({aggregate}),
+    stored AS (
+        SELECT day, donation_id, status, currency, payment_count, amount
+        FROM {rollups}
+        WHERE day >= %(first_day)s AND day < %(end_day)s
+            AND (payment_count <> 0 OR amount <> 0)
+    )
+    SELECT
+        day, donation_id, status, currency,
+        coalesce(stored.payment_count, 0) AS stored_count,
+        coalesce(stored.amount, 0) AS stored_amount,
+        coalesce(expected.payment_count, 0) AS expected_count,
+        coalesce(expected.amount, 0) AS expected_amount
+    FROM expected
+    FULL JOIN stored USING (day, donation_id, status, currency)
+    WHERE expected.payment_count IS DISTINCT FROM stored.payment_count
+        OR expected.amount IS DISTINCT FROM stored.amount
+    ORDER BY day, donation_id, status, currency
+"""
+
+# Adds each drifted row's difference to it, like a transition does, rather
+# than overwriting it: a transition committed after the snapshot keeps its
+# own delta, so no lock is needed.
+REPAIR_SQL = """
+    INSERT INTO {rollups} (
+        day, donation_id, status, currency, payment_count, amount, updated_at
+    )
+    SELECT
+        day, donation_id, status, currency,
+        expected_count - stored_count, expected_amount - stored_amount, now()
+    FROM ({drift}) AS drift
+    ON CONFLICT (day, donation_id, status, currency) DO UPDATE
+    SET payment_count = {rollups}.payment_count + EXCLUDED.payment_count,
+        amount = {rollups}.amount + EXCLUDED.amount,
+        updated_at = EXCLUDED.updated_at
+"""
+
+
+def _midnight(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class Command(BaseCommand):
+    help = (
+        'Correct daily revenue rollups that drifted from payments, one chunk '
+        'of days per statement. No lock is taken, so checkouts and webhooks '
+        'carry on. With --verify, report the drift instead.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Report drift without writing; exit non-zero if any is found.',
+        )
+        parser.add_argument(
+            '--chunk-days',
+            type=int,
+            default=31,
+            help='Days of payments aggregated per statement.',
+        )
+
+    def handle(self, *args, **options):
+        bounds = DonationPayment.objects.aggregate(
+            first=Min('created_at'), last=Max('created_at')
+        )
+        if bounds['first'] is None:
+            self.stdout.write('No payments.')
+            return
+
+        started = clock.perf_counter()
+        verify = options['verify']
+        step = timedelta(days=options['chunk_days'])
+        day = timezone.localdate(bounds['first'])
+        last_day = timezone.localdate(bounds['last'])
+        table = DailyRevenue._meta.db_table  # noqa: SLF001
+        drifted = 0
+        while day <= last_day:
+            end_day = day + step
+            params = {
+                **rollups.aggregate_params(_midnight(day), _midnight(end_day)),
+                'first_day': day,
+                'end_day': end_day,
+            }
+            drift_sql = DRIFT_SQL.format(
+                aggregate=rollups.aggregate_sql(), rollups=table
+            )
+            with connection.cursor() as cursor:
+                if verify:
+                    cursor.execute(drift_sql, params)
+                    for row in cursor.fetchall():
+                        drifted += 1
+                        self.stdout.write(
+                            '{} donation {} {} {}: {} / {} -> {} / {}'.format(*row)
+                        )
+                else:
+                    cursor.execute(
+                        REPAIR_SQL.format(drift=drift_sql, rollups=table), params
+                    )
+                    drifted += cursor.rowcount
+            day = end_day
+
+        elapsed = clock.perf_counter() - started
+        if verify and drifted:
+            msg = f'{drifted} rollup row(s) have drifted from payments.'
+            raise CommandError(msg)
+        if verify:
+            self.stdout.write(f'Rollups match payments ({elapsed:.1f} s).')
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Corrected {drifted} rollup row(s) in {elapsed:.1f} s.'
+                )
+            )
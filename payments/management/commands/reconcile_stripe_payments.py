@@ -0,0 +1,210 @@
+import json
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import stripe
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from payments.models import DonationPayment
+from payments.stripe_client import RateLimiter, call_with_backoff, get_client
+from payments.transitions import ALLOWED_TRANSITIONS, bulk_set_status, intent_status
+
+# Local statuses a missed webhook can leave a payment stuck in.
+STUCK_STATUSES = ('created', 'requires_action', 'processing')
+
+
+def _parse_since(value):
+    since = parse_datetime(value)
+    if since is None and (day := parse_date(value)) is not None:
+        since = datetime(day.year, day.month, day.day)  # noqa: DTZ001
+    if since is None:
+        msg = f'--since must be an ISO date or datetime, not {value!r}.'
+        raise CommandError(msg)
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+class Command(BaseCommand):
+    help = (
+        'Bring payment statuses in line with Stripe after missed webhooks. '
+        'With --source local, stale rows are fetched in chunks and their '
+        'intents retrieved concurrently. With --source stripe, intents '
+        'created since a watermark are paged through. Fixes are applied with '
+        'batched updates. Progress is saved to --state-file so an '
+        'interrupted run resumes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', choices=['local', 'stripe'], default='local')
+        parser.add_argument(
+            '--stale-minutes',
+            type=int,
+            default=60,
+            help='Minutes a local row must be unchanged (--source local).',
+        )
+        parser.add_argument(
+            '--since',
+            help='Reconcile intents created since this ISO date or datetime '
+            '(--source stripe). Defaults to the saved watermark, else 3 days.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=20,
+            help='Stripe requests per second across all threads (0: no limit).',
+        )
+        parser.add_argument('--state-file', type=Path)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.limiter = RateLimiter(options['rate'])
+        self.stats = Counter()
+        self.state = {}
+        if options['state_file'] and options['state_file'].exists():
+            self.state = json.loads(options['state_file'].read_text())
+
+        started = time.perf_counter()
+        if options['source'] == 'local':
+            self._reconcile_local()
+        else:
+            self._reconcile_stripe()
+        elapsed = time.perf_counter() - started
+
+        for move, count in sorted(self.stats.items()):
+            if '->' in move:
+                self.stdout.write(f'{move}: {count}')
+        looked_up = self.stats['looked_up']
+        verb = 'would fix' if options['dry_run'] else 'fixed'
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Looked up {looked_up} intent(s) in {elapsed:.1f} s '
+                f'({looked_up / elapsed if elapsed else 0:.1f}/s); {verb} '
+                f'{self.stats["fixed"]}; {self.stats["errors"]} error(s).'
+            )
+        )
+
+    def _save_state(self, source, state):
+        if self.options['state_file'] is None or self.options['dry_run']:
+            return
+        self.state[source] = state
+        path = self.options['state_file']
+        partial = path.with_suffix(f'{path.suffix}.tmp')
+        partial.write_text(json.dumps(self.state))
+        partial.replace(path)
+
+    def _retrieve(self, payment_intent_id):
+        client = get_client()
+        try:
+            return payment_intent_id, call_with_backoff(
+                lambda: client.v1.payment_intents.retrieve(payment_intent_id),
+                self.limiter,
+            )
+        except stripe.StripeError as exc:
+            return payment_intent_id, exc
+
+    def _reconcile_local(self):
+        cutoff = timezone.now() - timedelta(minutes=self.options['stale_minutes'])
+        stuck = DonationPayment.objects.filter(
+            status__in=STUCK_STATUSES, updated_at__lt=cutoff
+        ).exclude(
+            stripe_payment_intent_id__startswith=DonationPayment.PLACEHOLDER_PREFIX
+        )
+        last_id = self.state.get('local', {}).get('last_id', 0)
+
+        with ThreadPoolExecutor(max_workers=self.options['concurrency']) as pool:
+            while True:
+                chunk = list(
+                    stuck.filter(id__gt=last_id)
+                    .order_by('id')
+                    .values_list('id', 'stripe_payment_intent_id')[
+                        : self.options['chunk_size']
+                    ]
+                )
+                if not chunk:
+                    break
+                intents = {}
+                for payment_intent_id, result in pool.map(
+                    self._retrieve, [intent_id for _, intent_id in chunk]
+                ):
+                    self.stats['looked_up'] += 1
+                    if isinstance(result, stripe.StripeError):
+                        self.stats['errors'] += 1
+                        self.stderr.write(f'{payment_intent_id}: {result}')
+                    else:
+                        intents[payment_intent_id] = result
+                self._apply(intents)
+                last_id = chunk[-1][0]
+                self._save_state('local', {'last_id': last_id})
+
+        # A finished pass starts over next time.
+        self._save_state('local', {})
+
+    def _reconcile_stripe(self):
+        saved = self.state.get('stripe', {})
+        run_started = saved.get('run_started', timezone.now().timestamp())
+        if self.options['since']:
+            since = _parse_since(self.options['since']).timestamp()
+        elif 'since' in saved:
+            since = saved['since']
+        else:
+            since = (timezone.now() - timedelta(days=3)).timestamp()
+        starting_after = saved.get('starting_after')
+
+        client = get_client()
+        while True:
+            params = {
+                'limit': min(self.options['chunk_size'], 100),
+                'created': {'gte': int(since)},
+            }
+            if starting_after:
+                params['starting_after'] = starting_after
+            page = call_with_backoff(
+                lambda params=params: client.v1.payment_intents.list(params=params),
+                self.limiter,
+            )
+            self.stats['looked_up'] += len(page.data)
+            self._apply({intent.id: intent for intent in page.data})
+            if not page.has_more:
+                break
+            starting_after = page.data[-1].id
+            self._save_state(
+                'stripe',
+                {
+                    'since': since,
+                    'run_started': run_started,
+                    'starting_after': starting_after,
+                },
+            )
+
+        # The next run picks up intents created since this one began.
+        self._save_state('stripe', {'since': run_started})
+
+    def _apply(self, intents):
+        """Move local payments to their intents' statuses where allowed."""
+        if not intents:
+            return
+        with transaction.atomic():
+            payments = (
+                DonationPayment.objects.filter(stripe_payment_intent_id__in=intents)
+                .order_by('id')
+                .select_for_update()
+            )
+            changes = []
+            for payment in payments:
+                new_status = intent_status(intents[payment.stripe_payment_intent_id])
+                if new_status in ALLOWED_TRANSITIONS[payment.status]:
+                    self.stats[f'{payment.status} -> {new_status}'] += 1
+                    changes.append((payment, new_status))
+            if changes and not self.options['dry_run']:
+                bulk_set_status(changes)
+            self.stats['fixed'] += len(changes)
@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+import stripe
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from payments import checkout
+from payments.models import DonationPayment
+from payments.stripe_client import get_client
+from payments.transitions import attach_intent, set_status
+
+
+class Command(BaseCommand):
+    help = (
+        'Reconcile payments whose Stripe call never completed by replaying '
+        'the create with the same idempotency key. An intent Stripe had '
+        'created is attached; otherwise the fresh intent is canceled and '
+        'the payment marked failed. Stripe keeps keys for 24 hours, so run '
+        'this well within that.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than',
+            type=int,
+            default=15,
+            help='Minutes a placeholder must be old before it is swept.',
+        )
+        parser.add_argument('--limit', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(minutes=options['older_than'])
+        payments = DonationPayment.objects.filter(
+            stripe_payment_intent_id__startswith=DonationPayment.PLACEHOLDER_PREFIX,
+            status='created',
+            created_at__lt=cutoff,
+        ).order_by('created_at')[: options['limit']]
+
+        attached = failed = 0
+        for payment in payments:
+            if options['dry_run']:
+                key = checkout.stripe_idempotency_key(payment)
+                self.stdout.write(f'Payment {payment.id}: would replay {key}')
+                continue
+
+            try:
+                intent = checkout.create_intent(payment)
+                if not checkout.was_replayed(intent):
+                    # The first call never reached Stripe; nobody will
+                    # confirm the intent just made.
+                    get_client().v1.payment_intents.cancel(intent.id)
+                    intent = None
+            except stripe.StripeError as exc:
+                self.stderr.write(f'Payment {payment.id}: {exc}')
+                continue
+
+            if intent is None:
+                failed += self._fail(payment)
+            else:
+                attached += self._attach(payment, intent)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Attached {attached} intent(s); marked {failed} payment(s) failed.'
+            )
+        )
+
+    def _attach(self, payment, intent):
+        with transaction.atomic():
+            return int(attach_intent(payment, intent))
+
+    def _fail(self, payment):
+        with transaction.atomic():
+            locked = (
+                DonationPayment.objects.select_for_update()
+                .filter(
+                    id=payment.id,
+                    stripe_payment_intent_id=payment.stripe_payment_intent_id,
+                )
+                .first()
+            )
+            return int(locked is not None and set_status(locked, 'failed'))
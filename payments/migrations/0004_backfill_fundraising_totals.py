@@ -0,0 +1,49 @@
+# Generated by Django 6.0.1 on 2026-10-18 17:25
+
+from django.db import migrations
+
+BACKFILL_DONATIONS = """
+UPDATE donations_donation AS d
+SET raised_amount = t.raised_amount,
+    succeeded_count = t.succeeded_count,
+    refunded_amount = t.refunded_amount
+FROM (
+    SELECT donation_id,
+           COALESCE(SUM(amount) FILTER (WHERE status = 'succeeded'), 0) AS raised_amount,
+           COUNT(*) FILTER (WHERE status = 'succeeded') AS succeeded_count,
+           COALESCE(SUM(amount) FILTER (WHERE status = 'refunded'), 0) AS refunded_amount
+    FROM payments_donationpayment
+    GROUP BY donation_id
+) AS t
+WHERE d.id = t.donation_id
+"""
+
+BACKFILL_CATEGORIES = """
+UPDATE donations_category AS c
+SET raised_amount = t.raised_amount,
+    succeeded_count = t.succeeded_count,
+    refunded_amount = t.refunded_amount
+FROM (
+    SELECT dc.category_id,
+           SUM(d.raised_amount) AS raised_amount,
+           SUM(d.succeeded_count) AS succeeded_count,
+           SUM(d.refunded_amount) AS refunded_amount
+    FROM donations_donation_categories AS dc
+    JOIN donations_donation AS d ON d.id = dc.donation_id
+    GROUP BY dc.category_id
+) AS t
+WHERE c.id = t.category_id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0009_fundraising_totals'),
+        ('payments', '0003_stripeevent'),
+    ]
+
+    operations = [
+        migrations.RunSQL(BACKFILL_DONATIONS, migrations.RunSQL.noop),
+        migrations.RunSQL(BACKFILL_CATEGORIES, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 6.0.1 on 2026-10-18 18:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0004_backfill_fundraising_totals'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='stripeevent',
+            options={'ordering': ['-received_at'], 'verbose_name': 'Stripe Event', 'verbose_name_plural': 'Stripe Events'},
+        ),
+        migrations.AddField(
+            model_name='stripeevent',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='stripeevent',
+            name='last_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='stripeevent',
+            name='next_attempt_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='stripeevent',
+            name='payload',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='stripeevent',
+            name='received_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='stripeevent',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processed', 'Processed'), ('failed', 'Failed')], default='processed', max_length=16),
+        ),
+        migrations.AlterField(
+            model_name='stripeevent',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        # Events recorded before the inbox were processed as they arrived.
+        migrations.RunSQL(
+            'UPDATE payments_stripeevent SET received_at = processed_at',
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='stripeevent',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['next_attempt_at', 'id'], name='stripe_event_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stripeevent',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['payment_intent_id', 'id'], name='stripe_event_pending_pi_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stripeevent',
+            index=models.Index(condition=models.Q(('status', 'failed')), fields=['id'], name='stripe_event_failed_idx'),
+        ),
+    ]
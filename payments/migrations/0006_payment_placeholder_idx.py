@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-18 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0005_stripe_event_inbox'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='donationpayment',
+            index=models.Index(condition=models.Q(('stripe_payment_intent_id__startswith', 'pending_')), fields=['created_at'], name='payment_placeholder_idx'),
+        ),
+    ]
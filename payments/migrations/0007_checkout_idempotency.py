@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-18 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0006_payment_placeholder_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donationpayment',
+            name='idempotency_key',
+            field=models.CharField(blank=True, default='', max_length=200),
+        ),
+        migrations.AddIndex(
+            model_name='donationpayment',
+            index=models.Index(fields=['user', 'donation', 'status', '-created_at'], name='payment_user_donation_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='donationpayment',
+            constraint=models.UniqueConstraint(condition=models.Q(('idempotency_key', ''), _negated=True), fields=('user', 'idempotency_key'), name='payment_user_idempotency_key_uniq'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-18 20:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0007_checkout_idempotency'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='donationpayment',
+            index=models.Index(fields=['user', '-created_at', '-id'], include=('donation', 'amount', 'currency', 'status'), name='payment_user_history_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 6.0.1 on 2026-10-18 20:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+BACKFILL = """
+INSERT INTO payments_givingsummary (
+    user_id, total_given, donation_count, causes_supported, updated_at
+)
+SELECT user_id, SUM(amount), COUNT(*), COUNT(DISTINCT donation_id), now()
+FROM payments_donationpayment
+WHERE status = 'succeeded' AND user_id IS NOT NULL
+GROUP BY user_id
+"""
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0008_donor_history_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GivingSummary',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='giving_summary', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_given', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('donation_count', models.IntegerField(default=0)),
+                ('causes_supported', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Giving summary',
+                'verbose_name_plural': 'Giving summaries',
+            },
+        ),
+        migrations.RunSQL(BACKFILL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-18 21:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0009_giving_summary'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='stripeevent',
+            name='received_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 6.0.1 on 2026-10-18 22:10
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+USER_COLUMNS = ('email', 'username')
+
+
+def _user_table(apps):
+    User = apps.get_model(settings.AUTH_USER_MODEL)  # noqa: N806
+    return User._meta.db_table  # noqa: SLF001
+
+
+def add_user_trgm_indexes(apps, schema_editor):
+    # The user model belongs to django.contrib.auth, so its admin-search
+    # indexes are created here rather than declared on the model.
+    table = _user_table(apps)
+    for column in USER_COLUMNS:
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {table}_{column}_trgm_idx '
+            f'ON {table} USING gin (UPPER({column}) gin_trgm_ops)'
+        )
+
+
+def drop_user_trgm_indexes(apps, schema_editor):
+    table = _user_table(apps)
+    for column in USER_COLUMNS:
+        schema_editor.execute(
+            f'DROP INDEX CONCURRENTLY IF EXISTS {table}_{column}_trgm_idx'
+        )
+
+
+class Migration(migrations.Migration):
+    # Built concurrently, so payments, events and users stay writable while
+    # the indexes are built; that cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('donations', '0009_fundraising_totals'),
+        ('payments', '0011_refundrequest'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='donationpayment',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('stripe_payment_intent_id'), name='gin_trgm_ops'), name='payment_intent_trgm_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='stripeevent',
+            index=models.Index(fields=['payment_intent_id'], name='stripe_event_pi_idx'),
+        ),
+        migrations.RunPython(add_user_trgm_indexes, drop_user_trgm_indexes),
+    ]
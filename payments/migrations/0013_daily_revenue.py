@@ -0,0 +1,50 @@
+# Generated by Django 6.0.1 on 2026-10-18 22:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+BACKFILL = """
+INSERT INTO payments_dailyrevenue (
+    day, donation_id, status, currency, payment_count, amount, updated_at
+)
+SELECT
+    (created_at AT TIME ZONE %s)::date, donation_id, status, currency,
+    COUNT(*), SUM(amount), now()
+FROM payments_donationpayment
+WHERE status IN ('succeeded', 'failed', 'refunded')
+GROUP BY 1, 2, 3, 4
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0009_fundraising_totals'),
+        ('payments', '0012_admin_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRevenue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('created', 'Created'), ('requires_action', 'Requires Action'), ('processing', 'Processing'), ('succeeded', 'Succeeded'), ('failed', 'Failed'), ('refunded', 'Refunded')], max_length=32)),
+                ('currency', models.CharField(max_length=10)),
+                ('payment_count', models.IntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('donation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_revenue', to='donations.donation')),
+            ],
+            options={
+                'verbose_name': 'Daily revenue',
+                'verbose_name_plural': 'Daily revenue',
+                'indexes': [models.Index(fields=['donation', 'day'], name='daily_revenue_donation_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'donation', 'status', 'currency'), name='daily_revenue_key_uniq')],
+            },
+        ),
+        migrations.RunSQL(
+            [(BACKFILL, [settings.TIME_ZONE])], migrations.RunSQL.noop
+        ),
+    ]
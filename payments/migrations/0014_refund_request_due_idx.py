@@ -0,0 +1,21 @@
+# Generated by Django 6.0.1 on 2026-10-18 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0013_daily_revenue'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='refundrequest',
+            name='refund_request_queued_idx',
+        ),
+        migrations.AddIndex(
+            model_name='refundrequest',
+            index=models.Index(condition=models.Q(('status__in', ['queued', 'submitted'])), fields=['next_attempt_at', 'id'], name='refund_request_due_idx'),
+        ),
+    ]
@@ -1,13 +1,28 @@
 from decimal import Decimal
 
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
 from django.db.models import Q
+from django.db.models.functions import Upper
+from django.utils import timezone
 
 from donations.models import Donation
 
 
 class DonationPayment(models.Model):
+    # Intent id of a row whose Stripe call has not completed yet.
+    PLACEHOLDER_PREFIX = 'pending_'
+
+    STATUS_CHOICES = [
+        ('created', 'Created'),
+        ('requires_action', 'Requires Action'),
+        ('processing', 'Processing'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+        ('refunded', 'Refunded'),
+    ]
+
     donation = models.ForeignKey(
         Donation,
         on_delete=models.PROTECT,
@@ -39,17 +54,13 @@ class DonationPayment(models.Model):
 
     status = models.CharField(
         max_length=32,
-        choices=[
-            ('created', 'Created'),
-            ('requires_action', 'Requires Action'),
-            ('processing', 'Processing'),
-            ('succeeded', 'Succeeded'),
-            ('failed', 'Failed'),
-            ('refunded', 'Refunded'),
-        ],
+        choices=STATUS_CHOICES,
         db_index=True,
     )
 
+    # Idempotency-Key header of the checkout request that created the row.
+    idempotency_key = models.CharField(max_length=200, blank=True, default='')
+
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -62,22 +73,221 @@ class DonationPayment(models.Model):
                 condition=Q(amount__gte=Decimal('0.00')),
                 name='payment_amount_non_negative',
             ),
+            models.UniqueConstraint(
+                fields=['user', 'idempotency_key'],
+                condition=~Q(idempotency_key=''),
+                name='payment_user_idempotency_key_uniq',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['created_at'],
+                condition=Q(stripe_payment_intent_id__startswith='pending_'),
+                name='payment_placeholder_idx',
+            ),
+            # A donor's history, newest first, without visiting the table for
+            # the columns MyDonationSerializer renders.
+            models.Index(
+                fields=['user', '-created_at', '-id'],
+                include=['donation', 'amount', 'currency', 'status'],
+                name='payment_user_history_idx',
+            ),
+            # Open intents a repeated checkout can reuse.
+            models.Index(
+                fields=['user', 'donation', 'status', '-created_at'],
+                name='payment_user_donation_idx',
+            ),
+            # Admin search: icontains and istartswith on the intent id.
+            GinIndex(
+                OpClass(Upper('stripe_payment_intent_id'), name='gin_trgm_ops'),
+                name='payment_intent_trgm_idx',
+            ),
         ]
 
     def __str__(self):
         return f'{self.user or "Anonymous"} - {self.amount} {self.currency}'
 
 
+class GivingSummary(models.Model):
+    """
+    A user's lifetime giving, kept in step with their payments.
+
+    Updated by ``payments.giving`` on every transition into or out of
+    ``succeeded``, so reading it never aggregates the payment history.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='giving_summary',
+    )
+    total_given = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    donation_count = models.IntegerField(default=0)
+    # Distinct donations with at least one succeeded payment.
+    causes_supported = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    total_fields = ('total_given', 'donation_count', 'causes_supported')
+
+    class Meta:
+        verbose_name = 'Giving summary'
+        verbose_name_plural = 'Giving summaries'
+
+    def __str__(self):
+        return f'{self.user}: {self.total_given}'
+
+
+class DailyRevenue(models.Model):
+    """
+    Payments per local day created, donation, status and currency.
+
+    Kept by ``payments.rollups`` on every transition, so analytics never
+    aggregate the payment table. Only ``ROLLUP_STATUSES`` are counted; open
+    payments change too often to be worth reporting.
+    """
+
+    ROLLUP_STATUSES = ('succeeded', 'failed', 'refunded')
+
+    day = models.DateField()
+    donation = models.ForeignKey(
+        Donation, on_delete=models.CASCADE, related_name='daily_revenue'
+    )
+    status = models.CharField(max_length=32, choices=DonationPayment.STATUS_CHOICES)
+    currency = models.CharField(max_length=10)
+    payment_count = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Daily revenue'
+        verbose_name_plural = 'Daily revenue'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'donation', 'status', 'currency'],
+                name='daily_revenue_key_uniq',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['donation', 'day'], name='daily_revenue_donation_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.day} {self.donation_id} {self.status}: {self.amount}'
+
+
 class StripeEvent(models.Model):
+    """
+    A received Stripe event, kept for idempotency.
+
+    In inbox mode the webhook stores the verified payload as ``pending`` and
+    ``process_stripe_events`` applies it later.
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processed', 'Processed'),
+        ('failed', 'Failed'),
+    ]
+
     event_id = models.CharField(max_length=255, unique=True)
     event_type = models.CharField(max_length=255)
     payment_intent_id = models.CharField(max_length=255, blank=True, default='')
-    processed_at = models.DateTimeField(auto_now_add=True)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=16, choices=STATUS_CHOICES, default='processed'
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    received_at = models.DateTimeField(default=timezone.now, db_index=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    processed_at = models.DateTimeField(null=True, blank=True, db_index=True)
 
     class Meta:
         verbose_name = 'Stripe Event'
         verbose_name_plural = 'Stripe Events'
-        ordering = ['-processed_at']
+        ordering = ['-received_at']
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at', 'id'],
+                condition=Q(status='pending'),
+                name='stripe_event_pending_idx',
+            ),
+            models.Index(
+                fields=['payment_intent_id', 'id'],
+                condition=Q(status='pending'),
+                name='stripe_event_pending_pi_idx',
+            ),
+            models.Index(
+                fields=['id'],
+                condition=Q(status='failed'),
+                name='stripe_event_failed_idx',
+            ),
+            # Admin lookups of one intent's events.
+            models.Index(fields=['payment_intent_id'], name='stripe_event_pi_idx'),
+        ]
 
     def __str__(self):
         return self.event_id
+
+
+class RefundRequest(models.Model):
+    """
+    A Stripe refund asked for from the admin, submitted by ``payments.refunds``.
+
+    The row's id is the Stripe idempotency key, so submitting it again
+    after a crash or timeout returns the same refund.
+    """
+
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('submitted', 'Submitted'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+    # A payment may only have one of these at a time.
+    ACTIVE_STATUSES = ('queued', 'submitted', 'succeeded')
+
+    payment = models.ForeignKey(
+        DonationPayment,
+        on_delete=models.PROTECT,
+        related_name='refund_requests',
+    )
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+    )
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default='queued')
+    stripe_refund_id = models.CharField(max_length=255, blank=True, default='')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['payment'],
+                condition=Q(status__in=['queued', 'submitted', 'succeeded']),
+                name='refund_request_active_uniq',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at', 'id'],
+                condition=Q(status__in=['queued', 'submitted']),
+                name='refund_request_due_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'Refund of payment {self.payment_id} ({self.status})'
+
+    @property
+    def idempotency_key(self):
+        return f'refund-request-{self.id}'
@@ -0,0 +1,212 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import stripe
+from django.db import transaction
+from django.utils import timezone
+
+from payments.models import RefundRequest
+from payments.stripe_client import RateLimiter, call_with_backoff, get_client
+from payments.transitions import transition
+
+logger = logging.getLogger(__name__)
+
+CONCURRENCY = 8
+RATE = 20
+MAX_ATTEMPTS = 5
+
+# A claimed request is left alone this long; if its worker died, the next
+# one resubmits it under the same idempotency key.
+LEASE = timedelta(minutes=5)
+
+# Requests a worker picks up: queued ones are sent to Stripe, submitted ones
+# (refunds Stripe reported as pending) are looked up until they settle.
+DUE_STATUSES = ('queued', 'submitted')
+
+# Stripe's answer when the charge was refunded by some other means.
+ALREADY_REFUNDED = 'charge_already_refunded'
+
+
+def _retry_delay(attempts):
+    return timedelta(seconds=min(30 * 2 ** (attempts - 1), 60 * 60))
+
+
+def queue(payments, requested_by=None):
+    """
+    Queue a refund for each succeeded payment in ``payments``.
+
+    Payments that already have a refund under way are skipped. Returns the
+    ids of the queued requests.
+    """
+    payment_ids = list(
+        payments.filter(status='succeeded')
+        .exclude(refund_requests__status__in=RefundRequest.ACTIVE_STATUSES)
+        .values_list('id', flat=True)
+    )
+    RefundRequest.objects.bulk_create(
+        [
+            RefundRequest(payment_id=payment_id, requested_by=requested_by)
+            for payment_id in payment_ids
+        ],
+        ignore_conflicts=True,
+    )
+    return list(
+        RefundRequest.objects.filter(
+            payment_id__in=payment_ids, status='queued'
+        ).values_list('id', flat=True)
+    )
+
+
+def _claim(batch_size, ids=None):
+    """Lease a batch of due requests; other workers skip them until it ends."""
+    now = timezone.now()
+    with transaction.atomic():
+        due = RefundRequest.objects.filter(
+            status__in=DUE_STATUSES, next_attempt_at__lte=now
+        )
+        if ids is not None:
+            due = due.filter(id__in=ids)
+        batch = list(
+            due.select_related('payment')
+            .order_by('next_attempt_at', 'id')
+            .select_for_update(skip_locked=True, of=('self',))[:batch_size]
+        )
+        RefundRequest.objects.filter(id__in=[r.id for r in batch]).update(
+            next_attempt_at=now + LEASE
+        )
+    return batch
+
+
+def _create_refund(refund_request, limiter):
+    client = get_client()
+    params = {
+        'payment_intent': refund_request.payment.stripe_payment_intent_id,
+        'metadata': {
+            'refund_request_id': str(refund_request.id),
+            'payment_id': str(refund_request.payment_id),
+        },
+    }
+    try:
+        return call_with_backoff(
+            lambda: client.v1.refunds.create(
+                params=params,
+                options={'idempotency_key': refund_request.idempotency_key},
+            ),
+            limiter,
+        )
+    except stripe.StripeError as exc:
+        return exc
+
+
+def _retrieve_refund(refund_request, limiter):
+    client = get_client()
+    try:
+        return call_with_backoff(
+            lambda: client.v1.refunds.retrieve(refund_request.stripe_refund_id),
+            limiter,
+        )
+    except stripe.StripeError as exc:
+        return exc
+
+
+def _call(refund_request, limiter):
+    if refund_request.status == 'submitted':
+        return _retrieve_refund(refund_request, limiter)
+    return _create_refund(refund_request, limiter)
+
+
+def _retryable(exc):
+    # Stripe replays any answer it gave under an idempotency key, errors
+    # included; only requests it never answered are worth sending again.
+    return isinstance(exc, stripe.APIConnectionError | stripe.RateLimitError)
+
+
+def _record(refund_request, result, now):
+    """
+    Apply one Stripe answer to its request; return whether it finished.
+
+    Returns None while the refund is pending at Stripe.
+    """
+    refund_request.attempts += 1
+    submitted = refund_request.status == 'submitted'
+    already_refunded = (
+        isinstance(result, stripe.StripeError) and result.code == ALREADY_REFUNDED
+    )
+    if isinstance(result, stripe.StripeError) and not already_refunded:
+        refund_request.last_error = f'{type(result).__name__}: {result}'
+        if submitted:
+            # The refund exists at Stripe. Failing the request would let a
+            # second refund be queued for the payment, so keep looking.
+            refund_request.next_attempt_at = now + _retry_delay(refund_request.attempts)
+            return False
+        if _retryable(result) and refund_request.attempts < MAX_ATTEMPTS:
+            refund_request.next_attempt_at = now + _retry_delay(refund_request.attempts)
+            return False
+        refund_request.status = 'failed'
+        refund_request.completed_at = now
+        return True
+
+    if already_refunded or result.status == 'succeeded':
+        refund_request.status = 'succeeded'
+        refund_request.completed_at = now
+        # Moved now rather than on the charge.refunded webhook, which then
+        # finds the payment refunded and leaves it alone.
+        transition(refund_request.payment.stripe_payment_intent_id, 'refunded')
+    elif result.status in ('failed', 'canceled'):
+        refund_request.status = 'failed'
+        refund_request.completed_at = now
+        refund_request.last_error = f'Refund {result.status}.'
+    else:
+        # Pending: looked up again until Stripe settles it.
+        refund_request.status = 'submitted'
+        refund_request.next_attempt_at = now + _retry_delay(refund_request.attempts)
+        refund_request.stripe_refund_id = result.id
+        return None
+    if not already_refunded:
+        refund_request.stripe_refund_id = result.id
+    return True
+
+
+def submit(ids=None, batch_size=100, concurrency=CONCURRENCY, rate=RATE):
+    """
+    Submit queued refund requests to Stripe until none are due.
+
+    Refunds are created on a pool of ``concurrency`` threads, at most
+    ``rate`` requests per second across them, and pending ones are looked
+    up again once due. Only the Stripe calls run on the threads; results
+    are written here, one transaction per batch. Returns ``(finished,
+    retrying)``; refunds still pending at Stripe count as neither.
+    """
+    limiter = RateLimiter(rate)
+    finished = retrying = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while batch := _claim(batch_size, ids):
+            results = list(pool.map(lambda r: _call(r, limiter), batch))
+            now = timezone.now()
+            with transaction.atomic():
+                for refund_request, result in zip(batch, results, strict=True):
+                    outcome = _record(refund_request, result, now)
+                    if outcome:
+                        finished += 1
+                    elif outcome is False:
+                        retrying += 1
+                        logger.warning(
+                            'Stripe refund failed',
+                            extra={
+                                'refund_request_id': refund_request.id,
+                                'attempts': refund_request.attempts,
+                            },
+                        )
+                RefundRequest.objects.bulk_update(
+                    batch,
+                    [
+                        'status',
+                        'stripe_refund_id',
+                        'attempts',
+                        'last_error',
+                        'next_attempt_at',
+                        'completed_at',
+                    ],
+                )
+    return finished, retrying
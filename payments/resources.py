@@ -10,6 +10,9 @@ class StripeEventResource(resources.ModelResource):
             'event_id',
             'event_type',
             'payment_intent_id',
+            'status',
+            'attempts',
+            'received_at',
             'processed_at',
         )
         export_order = fields
@@ -0,0 +1,83 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from payments.models import DailyRevenue, DonationPayment
+
+TRACKED = DailyRevenue.ROLLUP_STATUSES
+
+# Adds to a day's bucket, creating it on its first payment. Keys are sorted
+# so concurrent transitions lock buckets in the same order.
+_UPSERT_SQL = """
+    INSERT INTO {table} (
+        day, donation_id, status, currency, payment_count, amount, updated_at
+    )
+    VALUES {rows}
+    ON CONFLICT (day, donation_id, status, currency) DO UPDATE
+    SET payment_count = {table}.payment_count + EXCLUDED.payment_count,
+        amount = {table}.amount + EXCLUDED.amount,
+        updated_at = EXCLUDED.updated_at
+"""
+
+# The buckets for payments created in [start, end), from the raw rows. The
+# day is the local date the payment was created, as in apply_transitions.
+AGGREGATE_SQL = """
+    SELECT
+        (created_at AT TIME ZONE %(tz)s)::date AS day,
+        donation_id,
+        status,
+        currency,
+        count(*) AS payment_count,
+        sum(amount) AS amount
+    FROM {payments}
+    WHERE created_at >= %(start)s AND created_at < %(end)s
+        AND status = ANY(%(statuses)s)
+    GROUP BY 1, 2, 3, 4
+"""
+
+
+def aggregate_sql():
+    return AGGREGATE_SQL.format(
+        payments=DonationPayment._meta.db_table  # noqa: SLF001
+    )
+
+
+def aggregate_params(start, end):
+    return {
+        'tz': settings.TIME_ZONE,
+        'start': start,
+        'end': end,
+        'statuses': list(TRACKED),
+    }
+
+
+def apply_transitions(moves):
+    """
+    Apply many ``(payment, old_status, new_status)`` moves in one statement.
+
+    Runs in the transition's transaction. Each payment needs ``donation_id``,
+    ``currency``, ``amount`` and ``created_at``.
+    """
+    deltas = defaultdict(lambda: [0, 0])
+    for payment, old_status, new_status in moves:
+        day = timezone.localdate(payment.created_at)
+        for status, sign in ((old_status, -1), (new_status, 1)):
+            if status in TRACKED:
+                key = (day, payment.donation_id, status, payment.currency)
+                deltas[key][0] += sign
+                deltas[key][1] += sign * payment.amount
+    # A bucket can net to no payments and still change in amount.
+    rows = sorted(key for key, (count, amount) in deltas.items() if count or amount)
+    if not rows:
+        return
+
+    now = timezone.now()
+    params = []
+    for key in rows:
+        params.extend([*key, *deltas[key], now])
+    placeholders = ', '.join(['(%s, %s, %s, %s, %s, %s, %s)'] * len(rows))
+    table = DailyRevenue._meta.db_table  # noqa: SLF001
+    with connection.cursor() as cursor:
+        cursor.execute(_UPSERT_SQL.format(table=table, rows=placeholders), params)
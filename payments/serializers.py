@@ -1,9 +1,12 @@
 from rest_framework import serializers
 
-from payments.models import DonationPayment
+from payments.models import DailyRevenue, DonationPayment, GivingSummary
 
 
 class MyDonationSerializer(serializers.ModelSerializer):
+    # Columns rendered, for .only() alongside select_related('donation').
+    columns = ('id', 'donation__title', 'amount', 'currency', 'status', 'created_at')
+
     donation_title = serializers.CharField(source='donation.title', read_only=True)
 
     class Meta:
@@ -16,3 +19,52 @@ class MyDonationSerializer(serializers.ModelSerializer):
             'status',
             'created_at',
         ]
+
+
+class MyDonationFilterSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(
+        choices=DonationPayment.STATUS_CHOICES, required=False
+    )
+
+
+class GivingSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = GivingSummary
+        fields = ['total_given', 'donation_count', 'causes_supported']
+
+
+class RevenueFilterSerializer(serializers.Serializer):
+    interval = serializers.ChoiceField(choices=['day', 'month'], default='day')
+    group_by = serializers.ChoiceField(
+        choices=['donation', 'category', 'status'], required=False
+    )
+    start = serializers.DateField()
+    end = serializers.DateField()
+    # Revenue means succeeded payments unless a status, or grouping by
+    # status, says otherwise.
+    status = serializers.ChoiceField(
+        choices=DailyRevenue.ROLLUP_STATUSES, required=False
+    )
+    donation = serializers.IntegerField(required=False)
+    category = serializers.IntegerField(required=False)
+    currency = serializers.CharField(max_length=10, required=False)
+
+    def validate(self, attrs):
+        if attrs['start'] > attrs['end']:
+            msg = 'start must not be after end.'
+            raise serializers.ValidationError(msg)
+        return attrs
+
+
+class RevenueSerializer(serializers.Serializer):
+    period = serializers.DateField()
+    donation = serializers.IntegerField(source='donation_id', required=False)
+    donation_title = serializers.CharField(source='donation__title', required=False)
+    category = serializers.IntegerField(source='donation__categories', required=False)
+    category_name = serializers.CharField(
+        source='donation__categories__name', required=False
+    )
+    status = serializers.CharField(required=False)
+    currency = serializers.CharField()
+    payment_count = serializers.IntegerField()
+    amount = serializers.DecimalField(max_digits=14, decimal_places=2)
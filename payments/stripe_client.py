@@ -1,4 +1,82 @@
+import random
+import threading
+import time
+from functools import cache
+
+import requests
 import stripe
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from requests.adapters import HTTPAdapter
 
 stripe.api_key = settings.STRIPE_SECRET_KEY
+
+
+@cache
+def get_client():
+    """
+    A process-wide Stripe client on a pooled keep-alive HTTP session.
+
+    Timeouts are short so a slow Stripe cannot hold request workers for the
+    library's default 80 seconds.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=settings.STRIPE_HTTP_POOL_SIZE)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    options = {}
+    if settings.STRIPE_API_BASE:
+        options['base_addresses'] = {'api': settings.STRIPE_API_BASE}
+    return stripe.StripeClient(
+        settings.STRIPE_SECRET_KEY,
+        http_client=stripe.RequestsClient(
+            timeout=(settings.STRIPE_CONNECT_TIMEOUT, settings.STRIPE_READ_TIMEOUT),
+            session=session,
+        ),
+        max_network_retries=settings.STRIPE_MAX_NETWORK_RETRIES,
+        **options,
+    )
+
+
+@receiver(setting_changed)
+def reset_client(setting, **kwargs):
+    if setting.startswith('STRIPE_'):
+        get_client.cache_clear()
+
+
+class RateLimiter:
+    """Spaces calls at most ``rate`` per second apart, across threads."""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self.interval
+        time.sleep(slot - now)
+
+
+def call_with_backoff(call, limiter=None, retries=5):
+    """
+    Return ``call()``, retrying with jittered backoff while Stripe answers 429.
+
+    The Stripe library does not retry rate-limited requests itself.
+    """
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            limiter.wait()
+        try:
+            return call()
+        except stripe.RateLimitError:
+            if attempt == retries:
+                raise
+            time.sleep(min(0.5 * 2**attempt, 8) * (1 + random.random()))
+    return None
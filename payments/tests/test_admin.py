@@ -0,0 +1,87 @@
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from donations.models import Category, Donation
+from payments.models import DonationPayment, StripeEvent
+
+# Matches bench_admin's default budget: session, user, count and page
+# queries, with no per-row lookups.
+MAX_QUERIES = 8
+
+
+@pytest.fixture
+def changelist_rows(db):
+    health = Category.objects.create(name='Health')
+    domains = ['gmail.com', 'gmail.com', 'example.org', 'example.org', 'mail.in']
+    for i, domain in enumerate(domains):
+        user = get_user_model().objects.create_user(
+            username=f'donor{i}', email=f'donor{i}@{domain}'
+        )
+        donation = Donation.objects.create(
+            title=f'Clean water {i}', amount=Decimal('10.00'), is_active=True
+        )
+        donation.categories.add(health)
+        DonationPayment.objects.create(
+            donation=donation,
+            user=user,
+            amount=donation.amount,
+            currency='inr',
+            stripe_payment_intent_id=f'pi_admin_{i}',
+            status='failed' if i % 2 else 'succeeded',
+        )
+        StripeEvent.objects.create(
+            event_id=f'evt_admin_{i}',
+            event_type='payment_intent.succeeded',
+            payment_intent_id=f'pi_admin_{i}',
+            payload={},
+        )
+    return health
+
+
+@pytest.mark.parametrize(
+    ('model', 'params'),
+    [
+        ('payments_donationpayment', {}),
+        ('payments_donationpayment', {'status__exact': 'failed'}),
+        ('payments_donationpayment', {'q': 'pi_admin_3'}),
+        ('payments_donationpayment', {'q': 'donor1@gmail'}),
+        ('payments_donationpayment', {'q': '@gmail.com'}),
+        ('payments_donationpayment', {'q': 'water 2'}),
+        ('donations_donation', {}),
+        ('donations_donation', {'categories__id__exact': 'health'}),
+        ('donations_donation', {'q': 'water'}),
+        ('payments_stripeevent', {}),
+        ('payments_stripeevent', {'event_type': 'payment_intent.succeeded'}),
+        ('payments_stripeevent', {'q': 'evt_admin_4'}),
+    ],
+)
+def test_changelists_stay_within_query_budget(
+    admin_client, changelist_rows, django_assert_max_num_queries, model, params
+):
+    if params.get('categories__id__exact') == 'health':
+        params = {'categories__id__exact': changelist_rows.id}
+    with django_assert_max_num_queries(MAX_QUERIES):
+        response = admin_client.get(reverse(f'admin:{model}_changelist'), params)
+    assert response.status_code == 200
+    assert response.context['cl'].result_list
+
+
+@pytest.mark.parametrize(
+    ('term', 'intents'),
+    [
+        ('@gmail.com', {'pi_admin_0', 'pi_admin_1'}),
+        ('donor2@example', {'pi_admin_2'}),
+        ('donor2@gmail', set()),
+    ],
+)
+def test_email_search(admin_client, changelist_rows, term, intents):
+    response = admin_client.get(
+        reverse('admin:payments_donationpayment_changelist'), {'q': term}
+    )
+    assert {
+        payment.stripe_payment_intent_id
+        for payment in response.context['cl'].result_list
+    } == intents
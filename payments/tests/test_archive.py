@@ -0,0 +1,68 @@
+import gzip
+import json
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from payments.models import StripeEvent
+
+
+@pytest.fixture
+def events(db):
+    old = timezone.now() - timedelta(days=60)
+    rows = [
+        ('evt_jan', 'processed', datetime(2026, 1, 31, 23, tzinfo=UTC), old),
+        ('evt_feb_0', 'processed', datetime(2026, 2, 1, tzinfo=UTC), old),
+        ('evt_feb_1', 'processed', datetime(2026, 2, 2, tzinfo=UTC), old),
+        ('evt_recent', 'processed', old, timezone.now()),
+        ('evt_failed', 'failed', old, None),
+        ('evt_pending', 'pending', old, None),
+    ]
+    for event_id, status, received_at, processed_at in rows:
+        StripeEvent.objects.create(
+            event_id=event_id,
+            event_type='payment_intent.succeeded',
+            payload={'id': event_id},
+            status=status,
+            received_at=received_at,
+            processed_at=processed_at,
+        )
+
+
+def _archived(path):
+    with gzip.open(path, 'rt') as archive:
+        return [json.loads(line)['event_id'] for line in archive]
+
+
+def test_old_processed_events_move_to_monthly_archives(events, tmp_path):
+    call_command('archive_stripe_events', output_dir=tmp_path, batch_size=1)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        'stripe_events-2026-01.jsonl.gz',
+        'stripe_events-2026-02.jsonl.gz',
+    ]
+    assert _archived(tmp_path / 'stripe_events-2026-01.jsonl.gz') == ['evt_jan']
+    # One gzip member per batch, read back as one stream.
+    assert _archived(tmp_path / 'stripe_events-2026-02.jsonl.gz') == [
+        'evt_feb_0',
+        'evt_feb_1',
+    ]
+    assert set(StripeEvent.objects.values_list('event_id', flat=True)) == {
+        'evt_recent',
+        'evt_failed',
+        'evt_pending',
+    }
+
+
+def test_dry_run_archives_nothing(events, tmp_path):
+    call_command('archive_stripe_events', output_dir=tmp_path, dry_run=True)
+
+    assert not any(tmp_path.iterdir())
+    assert StripeEvent.objects.count() == 6
+
+
+def test_retention_shorter_than_stripe_retries_is_refused(events, tmp_path):
+    with pytest.raises(CommandError):
+        call_command('archive_stripe_events', output_dir=tmp_path, older_than_days=2)
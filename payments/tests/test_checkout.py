@@ -0,0 +1,99 @@
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from donations.models import Donation
+from payments import checkout
+from payments.fake_stripe import start_in_thread
+from payments.models import DonationPayment
+
+
+@pytest.fixture
+def fake_stripe(settings):
+    server = start_in_thread()
+    settings.STRIPE_API_BASE = server.base_url
+    settings.STRIPE_MAX_NETWORK_RETRIES = 0
+    yield server.stripe
+    server.shutdown()
+
+
+@pytest.fixture
+def placeholder(user):
+    donation = Donation.objects.create(
+        title='Clean water', amount=Decimal('250.00'), is_active=True
+    )
+    return DonationPayment.objects.create(
+        donation=donation,
+        user=user,
+        amount=donation.amount,
+        currency='inr',
+        status='created',
+        stripe_payment_intent_id=(
+            f'{DonationPayment.PLACEHOLDER_PREFIX}{uuid.uuid4().hex}'
+        ),
+        idempotency_key='tap-1',
+    )
+
+
+def test_sweep_attaches_the_intent_stripe_created(fake_stripe, placeholder):
+    # The create reached Stripe but its response was lost.
+    lost = checkout.create_intent(placeholder)
+
+    call_command('sweep_pending_payments', older_than=0)
+
+    placeholder.refresh_from_db()
+    assert placeholder.stripe_payment_intent_id == lost.id
+    assert placeholder.status == 'created'
+    assert len(fake_stripe.intents) == 1
+
+
+def test_sweep_fails_payments_stripe_never_saw(fake_stripe, placeholder):
+    call_command('sweep_pending_payments', older_than=0)
+
+    placeholder.refresh_from_db()
+    assert placeholder.stripe_payment_intent_id.startswith(
+        DonationPayment.PLACEHOLDER_PREFIX
+    )
+    assert placeholder.status == 'failed'
+    # The intent the replay made is canceled rather than left open.
+    [intent] = fake_stripe.intents.values()
+    assert intent['status'] == 'canceled'
+
+
+def _retry(api_client, payment):
+    return api_client.post(
+        '/api/v1/payments/stripe/create-payment-intent/',
+        {'donation_id': payment.donation_id},
+        format='json',
+        headers={'Idempotency-Key': payment.idempotency_key},
+    )
+
+
+def test_retry_after_lost_response_attaches_the_intent(
+    api_client, fake_stripe, placeholder
+):
+    lost = checkout.create_intent(placeholder)
+    DonationPayment.objects.filter(id=placeholder.id).update(
+        created_at=timezone.now() - timedelta(minutes=1)
+    )
+
+    response = _retry(api_client, placeholder)
+
+    assert response.status_code == 200
+    assert response.json() == {'clientSecret': lost.client_secret}
+    placeholder.refresh_from_db()
+    assert placeholder.stripe_payment_intent_id == lost.id
+    assert len(fake_stripe.intents) == 1
+
+
+def test_retry_while_the_first_call_may_be_in_flight(
+    api_client, fake_stripe, placeholder
+):
+    response = _retry(api_client, placeholder)
+
+    assert response.status_code == 409
+    assert fake_stripe.requests == 0
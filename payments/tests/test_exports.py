@@ -0,0 +1,101 @@
+import csv
+import gzip
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from donations.models import Donation
+from payments.models import DonationPayment, StripeEvent
+
+
+@pytest.fixture
+def payments(user):
+    donation = Donation.objects.create(title='Clean water, "fresh"', is_active=True)
+    # Date filters are in the local time zone.
+    local = timezone.get_default_timezone()
+    for i, (created_at, status) in enumerate(
+        [
+            (datetime(2025, 12, 31, 23, 59, tzinfo=local), 'succeeded'),
+            (datetime(2026, 1, 1, tzinfo=local), 'succeeded'),
+            (datetime(2026, 6, 30, 12, tzinfo=local), 'failed'),
+            (datetime(2027, 1, 1, tzinfo=local), 'succeeded'),
+        ]
+    ):
+        payment = DonationPayment.objects.create(
+            donation=donation,
+            user=user,
+            amount=Decimal('10.50'),
+            currency='inr',
+            stripe_payment_intent_id=f'pi_{i}',
+            status=status,
+        )
+        DonationPayment.objects.filter(id=payment.id).update(created_at=created_at)
+
+
+def _export(tmp_path, name, *args):
+    path = tmp_path / name
+    call_command('export_payments', '--output', str(path), *args)
+    return path
+
+
+def test_csv_export_within_dates(payments, tmp_path):
+    path = _export(
+        tmp_path, 'payments.csv', '--since', '2026-01-01', '--until', '2027-01-01'
+    )
+
+    with open(path, newline='') as export:
+        header, *rows = csv.reader(export)
+    assert header[:4] == ['id', 'created_at', 'updated_at', 'status']
+    records = [dict(zip(header, row, strict=True)) for row in rows]
+    assert [record['stripe_payment_intent_id'] for record in records] == [
+        'pi_1',
+        'pi_2',
+    ]
+    assert records[0]['donation__title'] == 'Clean water, "fresh"'
+    assert records[0]['user__email'] == 'donor@example.com'
+
+
+def test_gzipped_jsonl_export_by_status(payments, tmp_path):
+    path = _export(
+        tmp_path,
+        'payments.jsonl.gz',
+        '--format',
+        'jsonl',
+        '--gzip',
+        '--status',
+        'succeeded',
+        '--chunk-size',
+        '1',
+    )
+
+    with gzip.open(path, 'rt') as export:
+        records = [json.loads(line) for line in export]
+    assert [record['stripe_payment_intent_id'] for record in records] == [
+        'pi_0',
+        'pi_1',
+        'pi_3',
+    ]
+    assert records[0]['amount'] == '10.50'
+    assert datetime.fromisoformat(records[0]['created_at']) == datetime(
+        2025, 12, 31, 23, 59, tzinfo=timezone.get_default_timezone()
+    )
+
+
+def test_stripe_events_export(db, tmp_path):
+    StripeEvent.objects.create(
+        event_id='evt_0', event_type='payment_intent.succeeded', payload={'x': 1}
+    )
+    path = _export(tmp_path, 'events.jsonl', '--stripe-events', '--format', 'jsonl')
+
+    [record] = [json.loads(line) for line in path.read_text().splitlines()]
+    assert record['event_id'] == 'evt_0'
+    assert 'payload' not in record
+
+
+def test_bad_dates_are_refused(db, tmp_path):
+    with pytest.raises(CommandError):
+        _export(tmp_path, 'payments.csv', '--since', '31/12/2026')
@@ -0,0 +1,100 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+
+from donations.models import Donation
+from payments import inbox
+from payments.models import DonationPayment, StripeEvent
+
+
+@pytest.fixture
+def payments(db):
+    donation = Donation.objects.create(title='Clean water', is_active=True)
+    return [
+        DonationPayment.objects.create(
+            donation=donation,
+            amount=Decimal('10.00'),
+            currency='inr',
+            stripe_payment_intent_id=f'pi_{i}',
+            status='created',
+        )
+        for i in range(3)
+    ]
+
+
+def _event(event_id, intent_id, event_type='payment_intent.succeeded'):
+    return StripeEvent.objects.create(
+        event_id=event_id,
+        event_type=event_type,
+        payment_intent_id=intent_id,
+        payload={},
+        status='pending',
+    )
+
+
+class WorkerDied(BaseException):
+    pass
+
+
+@pytest.mark.django_db(transaction=True)
+def test_each_event_commits_on_its_own(payments, monkeypatch):
+    for i in range(3):
+        _event(f'evt_{i}', f'pi_{i}')
+
+    apply_event = inbox.apply_event
+    calls = []
+
+    def dies_on_second_event(*args):
+        calls.append(args)
+        if len(calls) == 2:
+            raise WorkerDied
+        apply_event(*args)
+
+    monkeypatch.setattr(inbox, 'apply_event', dies_on_second_event)
+    with pytest.raises(WorkerDied):
+        inbox.process_stripe_events()
+
+    # The first event survives the crash; the rest wait out their lease.
+    statuses = dict(StripeEvent.objects.values_list('event_id', 'status'))
+    assert statuses == {'evt_0': 'processed', 'evt_1': 'pending', 'evt_2': 'pending'}
+    assert DonationPayment.objects.get(stripe_payment_intent_id='pi_0').status == (
+        'succeeded'
+    )
+    assert inbox.process_stripe_events() == (0, 0)
+
+
+def test_leased_events_are_skipped_until_the_lease_ends(payments):
+    event = _event('evt_0', 'pi_0')
+    claimed = inbox._claim(10, timedelta(minutes=5))  # noqa: SLF001
+    assert [e.id for e in claimed] == [event.id]
+
+    # Another worker finds nothing while the lease runs.
+    assert inbox._claim(10, timedelta(minutes=5)) == []  # noqa: SLF001
+
+    # The first worker died; once the lease ends the event is applied.
+    StripeEvent.objects.filter(id=event.id).update(
+        next_attempt_at=timezone.now() - timedelta(seconds=1)
+    )
+    assert inbox.process_stripe_events() == (1, 0)
+    # The dead worker's copy lost its lease and applies nothing.
+    assert inbox._process(claimed[0]) is None  # noqa: SLF001
+
+
+def test_failures_are_retried_later(payments, monkeypatch):
+    _event('evt_0', 'pi_0')
+    _event('evt_1', 'pi_0', 'charge.refunded')
+
+    def broken(*args):
+        msg = 'boom'
+        raise RuntimeError(msg)
+
+    monkeypatch.setattr(inbox, 'apply_event', broken)
+    assert inbox.process_stripe_events() == (0, 1)
+
+    failed = StripeEvent.objects.get(event_id='evt_0')
+    assert (failed.status, failed.attempts) == ('pending', 1)
+    assert failed.next_attempt_at > timezone.now()
+    # The refund waits behind the failed event for the same intent.
+    assert inbox.process_stripe_events() == (0, 0)
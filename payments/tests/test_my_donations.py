@@ -0,0 +1,67 @@
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from donations.models import Donation
+from payments.models import DonationPayment
+
+URL = '/api/v1/payments/my-donations/'
+
+
+@pytest.fixture
+def history(user):
+    donation = Donation.objects.create(title='Clean water', is_active=True)
+    other = get_user_model().objects.create_user(username='other')
+    for i, status in enumerate(['succeeded', 'failed', 'succeeded', 'created']):
+        DonationPayment.objects.create(
+            donation=donation,
+            user=user,
+            amount=Decimal(f'{10 + i}.00'),
+            currency='inr',
+            stripe_payment_intent_id=f'pi_{i}',
+            status=status,
+        )
+    DonationPayment.objects.create(
+        donation=donation,
+        user=other,
+        amount=Decimal('99.00'),
+        currency='inr',
+        stripe_payment_intent_id='pi_other',
+        status='succeeded',
+    )
+    # Ties on created_at are broken by id.
+    DonationPayment.objects.update(created_at=timezone.now())
+
+
+def test_pages_list_only_the_donors_payments_newest_first(
+    api_client, history, django_assert_num_queries
+):
+    with django_assert_num_queries(1):
+        response = api_client.get(URL, {'page_size': 3})
+
+    assert set(response.data) == {'next', 'results'}
+    first = response.data['results']
+    assert set(first[0]) == {
+        'id',
+        'donation_title',
+        'amount',
+        'currency',
+        'status',
+        'created_at',
+    }
+    assert first[0]['donation_title'] == 'Clean water'
+
+    response = api_client.get(response.data['next'])
+    assert response.data['next'] is None
+    amounts = [row['amount'] for row in first + response.data['results']]
+    assert amounts == ['13.00', '12.00', '11.00', '10.00']
+
+
+def test_status_filter(api_client, history):
+    response = api_client.get(URL, {'status': 'succeeded'})
+    assert [row['amount'] for row in response.data['results']] == ['12.00', '10.00']
+
+    response = api_client.get(URL, {'status': 'paid'})
+    assert response.status_code == 400
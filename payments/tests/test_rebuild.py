@@ -0,0 +1,75 @@
+from decimal import Decimal
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import transaction
+
+from donations.models import Donation
+from payments.models import DailyRevenue, DonationPayment, GivingSummary
+from payments.transitions import transition
+
+
+@pytest.fixture
+def succeeded(user):
+    water, school = (
+        Donation.objects.create(title=title, is_active=True)
+        for title in ('Clean water', 'School books')
+    )
+    for i, (donation, amount) in enumerate(
+        [(water, '10.00'), (water, '15.00'), (school, '40.00')]
+    ):
+        DonationPayment.objects.create(
+            donation=donation,
+            user=user,
+            amount=Decimal(amount),
+            currency='inr',
+            stripe_payment_intent_id=f'pi_{i}',
+            status='created',
+        )
+        with transaction.atomic():
+            transition(f'pi_{i}', 'succeeded')
+
+
+def test_giving_summaries_are_corrected(user, succeeded):
+    GivingSummary.objects.filter(user=user).update(
+        total_given=Decimal('1.00'), donation_count=7, causes_supported=0
+    )
+    with pytest.raises(CommandError):
+        call_command('rebuild_giving_summaries', verify=True)
+
+    call_command('rebuild_giving_summaries')
+
+    summary = GivingSummary.objects.get(user=user)
+    assert (
+        summary.total_given,
+        summary.donation_count,
+        summary.causes_supported,
+    ) == (Decimal('65.00'), 3, 2)
+    call_command('rebuild_giving_summaries', verify=True)
+
+
+def test_missing_giving_summaries_are_created(user, succeeded):
+    GivingSummary.objects.all().delete()
+
+    call_command('rebuild_giving_summaries')
+
+    summary = GivingSummary.objects.get(user=user)
+    assert (summary.total_given, summary.causes_supported) == (Decimal('65.00'), 2)
+
+
+def test_revenue_rollups_are_corrected(succeeded):
+    DailyRevenue.objects.filter(amount=Decimal('25.00')).update(
+        payment_count=5, amount=Decimal('3.00')
+    )
+    DailyRevenue.objects.filter(amount=Decimal('40.00')).delete()
+    expected = {('succeeded', 2, Decimal('25.00')), ('succeeded', 1, Decimal('40.00'))}
+    with pytest.raises(CommandError):
+        call_command('rebuild_revenue_rollups', verify=True)
+
+    call_command('rebuild_revenue_rollups')
+
+    assert (
+        set(DailyRevenue.objects.values_list('status', 'payment_count', 'amount'))
+        == expected
+    )
+    call_command('rebuild_revenue_rollups', verify=True)
@@ -0,0 +1,79 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+import stripe
+from django.db import transaction
+from django.utils import timezone
+
+from donations.models import Donation
+from payments import refunds
+from payments.models import DonationPayment, RefundRequest
+from payments.transitions import transition
+
+
+@pytest.fixture
+def payment(user):
+    donation = Donation.objects.create(title='Clean water', is_active=True)
+    payment = DonationPayment.objects.create(
+        donation=donation,
+        user=user,
+        amount=Decimal('10.00'),
+        currency='inr',
+        stripe_payment_intent_id='pi_0',
+        status='created',
+    )
+    with transaction.atomic():
+        transition('pi_0', 'succeeded')
+    return payment
+
+
+@pytest.fixture
+def stripe_refunds(monkeypatch):
+    """Stripe's answers, by the status the request had when it was sent."""
+    answers = {}
+
+    def call(refund_request, limiter):
+        status = answers[refund_request.status]
+        return stripe.Refund.construct_from({'id': 're_0', 'status': status}, 'sk')
+
+    monkeypatch.setattr(refunds, '_call', call)
+    return answers
+
+
+def _run_due():
+    RefundRequest.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+    return refunds.submit(concurrency=1)
+
+
+@pytest.mark.parametrize(
+    ('outcome', 'request_status', 'payment_status'),
+    [('succeeded', 'succeeded', 'refunded'), ('failed', 'failed', 'succeeded')],
+)
+def test_pending_refunds_are_polled_until_they_settle(
+    payment, stripe_refunds, outcome, request_status, payment_status
+):
+    [request_id] = refunds.queue(DonationPayment.objects.all())
+    stripe_refunds.update(queued='pending', submitted='pending')
+
+    assert refunds.submit(concurrency=1) == (0, 0)
+    refund_request = RefundRequest.objects.get(id=request_id)
+    assert (refund_request.status, refund_request.stripe_refund_id) == (
+        'submitted',
+        're_0',
+    )
+    assert refund_request.next_attempt_at > timezone.now()
+
+    # Not due yet, then still pending, then settled.
+    assert refunds.submit(concurrency=1) == (0, 0)
+    assert _run_due() == (0, 0)
+    stripe_refunds['submitted'] = outcome
+    assert _run_due() == (1, 0)
+
+    refund_request.refresh_from_db()
+    payment.refresh_from_db()
+    assert (refund_request.status, payment.status) == (request_status, payment_status)
+    # A failed refund frees the payment for another one.
+    assert len(refunds.queue(DonationPayment.objects.all())) == (
+        1 if outcome == 'failed' else 0
+    )
@@ -0,0 +1,129 @@
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from donations import totals
+from donations.models import Category, Donation
+from payments.models import DailyRevenue, DonationPayment, GivingSummary
+from payments.transitions import bulk_set_status, set_status, transition
+
+# (user, donation, amount, status before, status after)
+MOVES = [
+    (0, 0, '10.00', 'created', 'succeeded'),
+    # Two gifts to the same cause moving together count it once.
+    (0, 1, '20.00', 'created', 'succeeded'),
+    (0, 1, '25.00', 'processing', 'succeeded'),
+    (0, 0, '30.00', 'succeeded', 'refunded'),
+    (1, 0, '40.00', 'succeeded', 'failed'),
+    (1, 1, '50.00', 'requires_action', 'failed'),
+    (1, 1, '60.00', 'succeeded', 'succeeded'),
+]
+
+
+@pytest.fixture
+def moves(user):
+    users = [user, get_user_model().objects.create_user(username='other')]
+    health = Category.objects.create(name='Health')
+    donations = [
+        Donation.objects.create(title=title, is_active=True)
+        for title in ('Clinic', 'Ambulance')
+    ]
+    for donation in donations:
+        donation.categories.add(health)
+
+    payment_ids = []
+    for i, (user_index, donation_index, amount, before, _) in enumerate(MOVES):
+        payment = DonationPayment.objects.create(
+            donation=donations[donation_index],
+            user=users[user_index],
+            amount=Decimal(amount),
+            currency='inr',
+            stripe_payment_intent_id=f'pi_{i}',
+            status='created',
+        )
+        if before != 'created':
+            with transaction.atomic():
+                transition(payment.stripe_payment_intent_id, 'succeeded')
+                if before != 'succeeded':
+                    set_status(
+                        DonationPayment.objects.select_for_update().get(id=payment.id),
+                        before,
+                    )
+        payment_ids.append(payment.id)
+    return [
+        (payment_id, after)
+        for payment_id, (*_, after) in zip(payment_ids, MOVES, strict=True)
+    ]
+
+
+def _state():
+    return {
+        'donations': set(Donation.objects.values_list('id', *totals.TOTAL_FIELDS)),
+        'categories': set(Category.objects.values_list('id', *totals.TOTAL_FIELDS)),
+        'summaries': set(
+            GivingSummary.objects.values_list('user', *GivingSummary.total_fields)
+        ),
+        'rollups': set(
+            DailyRevenue.objects.exclude(payment_count=0).values_list(
+                'day', 'donation', 'status', 'currency', 'payment_count', 'amount'
+            )
+        ),
+    }
+
+
+def _locked(payment_ids):
+    payments = DonationPayment.objects.select_for_update().in_bulk(payment_ids)
+    return [payments[payment_id] for payment_id in payment_ids]
+
+
+def test_bulk_set_status_matches_a_loop_of_set_status(moves):
+    payment_ids = [payment_id for payment_id, _ in moves]
+    statuses = [new_status for _, new_status in moves]
+
+    with transaction.atomic():
+        for payment, new_status in zip(_locked(payment_ids), statuses, strict=True):
+            set_status(payment, new_status)
+        one_by_one = _state()
+        transaction.set_rollback(True)
+
+    with transaction.atomic():
+        moved = bulk_set_status(zip(_locked(payment_ids), statuses, strict=True))
+        batched = _state()
+
+    assert moved == len(MOVES) - 1
+    assert batched == one_by_one
+
+
+def test_rollups_keep_amounts_when_counts_cancel_out(user):
+    donation = Donation.objects.create(title='Clinic', is_active=True)
+    payments = [
+        DonationPayment.objects.create(
+            donation=donation,
+            user=user,
+            amount=Decimal(amount),
+            currency='inr',
+            stripe_payment_intent_id=f'pi_{i}',
+            status='created',
+        )
+        for i, amount in enumerate(['10.00', '30.00'])
+    ]
+    with transaction.atomic():
+        transition('pi_0', 'succeeded')
+
+    # One payment leaves the succeeded bucket as another joins it.
+    with transaction.atomic():
+        bulk_set_status(
+            zip(
+                _locked([payment.id for payment in payments]),
+                ['refunded', 'succeeded'],
+                strict=True,
+            )
+        )
+
+    assert set(
+        DailyRevenue.objects.exclude(payment_count=0).values_list(
+            'status', 'payment_count', 'amount'
+        )
+    ) == {('succeeded', 1, Decimal('30.00')), ('refunded', 1, Decimal('10.00'))}
@@ -0,0 +1,267 @@
+import json
+from collections import defaultdict
+from functools import partial
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from donations import totals
+from payments import checkout, giving, rollups
+from payments.models import DonationPayment, StripeEvent
+
+EVENT_STATUSES = {
+    'payment_intent.succeeded': 'succeeded',
+    'payment_intent.payment_failed': 'failed',
+    'payment_intent.processing': 'processing',
+    'charge.refunded': 'refunded',
+}
+
+# PaymentIntent.status -> DonationPayment.status
+INTENT_STATUSES = {
+    'requires_payment_method': 'created',
+    'requires_confirmation': 'created',
+    'requires_action': 'requires_action',
+    'processing': 'processing',
+    'requires_capture': 'processing',
+    'succeeded': 'succeeded',
+    'canceled': 'failed',
+}
+
+# Statuses a payment may move to from each status. Anything else is a stale
+# or out-of-order event (say, `processing` delivered after `succeeded`) and
+# is ignored. A failed intent can still be retried by the customer.
+ALLOWED_TRANSITIONS = {
+    'created': {'requires_action', 'processing', 'succeeded', 'failed'},
+    'requires_action': {'processing', 'succeeded', 'failed'},
+    'processing': {'requires_action', 'succeeded', 'failed'},
+    'failed': {'requires_action', 'processing', 'succeeded'},
+    'succeeded': {'refunded'},
+    'refunded': set(),
+}
+
+# Columns handed to after_transition for a moved payment.
+_RETURNED = ('id', 'donation_id', 'user_id', 'amount', 'currency', 'created_at')
+
+_RECORD_EVENT = """
+    recorded AS (
+        INSERT INTO {events} (
+            event_id, event_type, payment_intent_id, payload, status,
+            attempts, last_error, received_at, next_attempt_at, processed_at
+        )
+        VALUES (
+            %(event_id)s, %(event_type)s, %(payment_intent_id)s,
+            %(payload)s::jsonb, 'processed', 0, '', %(now)s, %(now)s, %(now)s
+        )
+        ON CONFLICT (event_id) DO NOTHING
+        RETURNING id
+    ),
+"""
+
+_TRANSITION = """
+    WITH {record}
+    locked AS (
+        SELECT id, status
+        FROM {payments}
+        WHERE stripe_payment_intent_id = %(payment_intent_id)s {guard}
+        FOR UPDATE
+    ),
+    moved AS (
+        UPDATE {payments} AS payment
+        SET status = %(status)s, updated_at = %(now)s
+        FROM locked
+        WHERE payment.id = locked.id AND locked.status = ANY(%(sources)s)
+        RETURNING locked.status AS old_status, {returned}
+    )
+    SELECT {recorded}, moved.*
+    FROM (SELECT 1) AS one
+    LEFT JOIN moved ON true
+"""
+
+
+def _transition_sql(record_event):
+    payments = DonationPayment._meta.db_table  # noqa: SLF001
+    events = StripeEvent._meta.db_table  # noqa: SLF001
+    return _TRANSITION.format(
+        record=_RECORD_EVENT.format(events=events) if record_event else '',
+        guard='AND EXISTS (SELECT 1 FROM recorded)' if record_event else '',
+        recorded='EXISTS (SELECT 1 FROM recorded)' if record_event else 'true',
+        payments=payments,
+        returned=', '.join(f'payment.{column}' for column in _RETURNED),
+    )
+
+
+TRANSITION_SQL = _transition_sql(record_event=False)
+RECORD_AND_TRANSITION_SQL = _transition_sql(record_event=True)
+
+
+def sources(new_status):
+    """Statuses a payment may be in to move to ``new_status``."""
+    return sorted(
+        status
+        for status, targets in ALLOWED_TRANSITIONS.items()
+        if new_status in targets
+    )
+
+
+def intent_status(intent):
+    """The payment status matching a PaymentIntent, or None if unknown."""
+    if intent.status == 'requires_payment_method' and intent.last_payment_error:
+        # A declined attempt; Stripe lets the customer try another card.
+        return 'failed'
+    return INTENT_STATUSES.get(intent.status)
+
+
+def attach_intent(payment, intent):
+    """
+    Swap ``payment``'s placeholder intent id for ``intent`` and move the
+    payment to the intent's status.
+
+    Returns False if the placeholder was already replaced. Must run inside
+    a transaction.
+    """
+    attached = DonationPayment.objects.filter(
+        id=payment.id, stripe_payment_intent_id=payment.stripe_payment_intent_id
+    ).update(stripe_payment_intent_id=intent.id, updated_at=timezone.now())
+    if not attached:
+        return False
+    payment.stripe_payment_intent_id = intent.id
+    new_status = intent_status(intent)
+    if new_status and new_status != payment.status:
+        transition(intent.id, new_status)
+    return True
+
+
+def totals_delta(amount, old_status, new_status):
+    """Change in fundraising totals when a payment moves between statuses."""
+    delta = dict.fromkeys(totals.TOTAL_FIELDS, 0)
+    for status, sign in ((old_status, -1), (new_status, 1)):
+        if status == 'succeeded':
+            delta['raised_amount'] += sign * amount
+            delta['succeeded_count'] += sign
+        elif status == 'refunded':
+            delta['refunded_amount'] += sign * amount
+    return delta
+
+
+def after_transition(payment, old_status, new_status):
+    """Side effects of a status change, run in the transition's transaction."""
+    after_transitions([(payment, old_status, new_status)])
+
+
+def after_transitions(moves):
+    """
+    Side effects of many ``(payment, old_status, new_status)`` moves.
+
+    Runs in the moves' transaction, after their new statuses are written.
+    Totals deltas are summed per donation, giving summaries per user and
+    revenue rollups per day before they are applied.
+    """
+    deltas = defaultdict(lambda: dict.fromkeys(totals.TOTAL_FIELDS, 0))
+    for payment, old_status, new_status in moves:
+        delta = totals_delta(payment.amount, old_status, new_status)
+        for name, value in delta.items():
+            deltas[payment.donation_id][name] += value
+    for donation_id in sorted(deltas):
+        totals.apply_delta(donation_id, deltas[donation_id])
+    giving.apply_transitions(moves)
+    rollups.apply_transitions(moves)
+    for payment, _, new_status in moves:
+        _forget_if_closed(payment, new_status)
+
+
+def _forget_if_closed(payment, new_status):
+    if new_status not in checkout.OPEN_STATUSES:
+        # Repeated checkouts must not hand out an intent that is done with.
+        transaction.on_commit(partial(checkout.forget, payment))
+
+
+def _execute(sql, params, new_status):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        recorded, old_status, *values = cursor.fetchone()
+    if old_status is None:
+        return recorded, False
+    payment = DonationPayment(
+        status=new_status, **dict(zip(_RETURNED, values, strict=True))
+    )
+    after_transition(payment, old_status, new_status)
+    return recorded, True
+
+
+def transition(payment_intent_id, new_status):
+    """
+    Move the intent's payment to ``new_status`` in one statement.
+
+    Returns whether it moved; disallowed transitions leave the row as is.
+    Must run inside a transaction, which the side effects share.
+    """
+    params = {
+        'payment_intent_id': payment_intent_id,
+        'status': new_status,
+        'sources': sources(new_status),
+        'now': timezone.now(),
+    }
+    return _execute(TRANSITION_SQL, params, new_status)[1]
+
+
+def record_and_transition(event_id, event_type, payment_intent_id, payload, new_status):
+    """
+    Record a Stripe event and apply its transition in one statement.
+
+    Returns ``(recorded, moved)``. A duplicate event is not recorded and
+    moves nothing. Must run inside a transaction, which the side effects
+    share.
+    """
+    params = {
+        'event_id': event_id,
+        'event_type': event_type,
+        'payment_intent_id': payment_intent_id,
+        'payload': json.dumps(payload),
+        'status': new_status,
+        'sources': sources(new_status),
+        'now': timezone.now(),
+    }
+    return _execute(RECORD_AND_TRANSITION_SQL, params, new_status)
+
+
+def set_status(payment, new_status):
+    """
+    Move a payment to ``new_status`` and apply the side effects.
+
+    Used for manual overrides, so ``ALLOWED_TRANSITIONS`` is not enforced.
+    The caller must hold the payment's row lock inside a transaction, so
+    ``payment.status`` is the status the totals were last computed from.
+    """
+    old_status = payment.status
+    if old_status == new_status:
+        return False
+
+    payment.status = new_status
+    payment.save(update_fields=['status', 'updated_at'])
+    after_transition(payment, old_status, new_status)
+    return True
+
+
+def bulk_set_status(changes):
+    """
+    Apply many ``(payment, new_status)`` moves with batched UPDATEs.
+
+    Like ``set_status`` for reconciliation-sized batches, with the same side
+    effects applied once for the whole batch. The caller must hold the
+    payments' row locks inside a transaction. Returns how many moved.
+    """
+    now = timezone.now()
+    moves = []
+    for payment, new_status in changes:
+        old_status = payment.status
+        if old_status == new_status:
+            continue
+        payment.status = new_status
+        payment.updated_at = now
+        moves.append((payment, old_status, new_status))
+
+    DonationPayment.objects.bulk_update(
+        [payment for payment, _, _ in moves], ['status', 'updated_at'], batch_size=500
+    )
+    after_transitions(moves)
+    return len(moves)
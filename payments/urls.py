@@ -6,7 +6,10 @@ from payments.webhooks import stripe_webhook
 app_name = 'payments'
 urlpatterns = [
     path('my-donations/', view=views.my_donations),
+    path('my-impact/', view=views.my_impact),
     path('stripe/publishable-key/', view=views.get_stripe_publishable_key),
     path('stripe/create-payment-intent/', view=views.create_payment_intent),
     path('stripe/webhook/', stripe_webhook),
+    path('stripe/inbox-stats/', view=views.stripe_inbox_stats),
+    path('analytics/revenue/', view=views.revenue_analytics),
 ]
@@ -1,15 +1,41 @@
+import logging
+import uuid
+from datetime import timedelta
+
+import stripe
 from django.conf import settings
-from django.db import transaction
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
+from config.pagination import KeysetPagination
 from donations.models import Donation
-from payments.models import DonationPayment
-from payments.serializers import MyDonationSerializer
-from payments.stripe_client import stripe
+from payments import checkout, inbox
+from payments.models import DailyRevenue, DonationPayment, GivingSummary
+from payments.serializers import (
+    GivingSummarySerializer,
+    MyDonationFilterSerializer,
+    MyDonationSerializer,
+    RevenueFilterSerializer,
+    RevenueSerializer,
+)
+from payments.transitions import attach_intent, transition
+
+logger = logging.getLogger(__name__)
+
+# A placeholder row younger than this may still have its Stripe call in
+# flight; a retry past it replays the create itself.
+PLACEHOLDER_GRACE = timedelta(seconds=5)
+
+IDEMPOTENCY_KEY_MAX_LENGTH = DonationPayment._meta.get_field(  # noqa: SLF001
+    'idempotency_key'
+).max_length
 
 
 @api_view(['GET'])
@@ -31,31 +57,78 @@ def create_payment_intent(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
+    idempotency_key = request.headers.get('Idempotency-Key', '').strip()
+    if len(idempotency_key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        return Response(
+            {
+                'error': (
+                    f'Idempotency-Key must be at most '
+                    f'{IDEMPOTENCY_KEY_MAX_LENGTH} characters.'
+                )
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
     donation = get_object_or_404(Donation, id=donation_id, is_active=True)
 
-    with transaction.atomic():
+    if idempotency_key:
+        previous = DonationPayment.objects.filter(
+            user=request.user, idempotency_key=idempotency_key
+        ).first()
+        if previous is not None:
+            return _replay(previous, donation)
+
+    secret = checkout.open_intent(request.user, donation)
+    if secret is not None:
+        return Response({'clientSecret': secret}, status=status.HTTP_200_OK)
+
+    # Commit the row before calling Stripe, and give the connection back, so
+    # neither a transaction nor a connection is held across the network
+    # call. Rows left with a placeholder intent id are recovered by
+    # replaying the create, here on a retry or by sweep_pending_payments.
+    try:
         payment = DonationPayment.objects.create(
             donation=donation,
             user=request.user,
             amount=donation.amount,
             currency='inr',
             status='created',
-            stripe_payment_intent_id='pending',
+            stripe_payment_intent_id=(
+                f'{DonationPayment.PLACEHOLDER_PREFIX}{uuid.uuid4().hex}'
+            ),
+            idempotency_key=idempotency_key,
+        )
+    except IntegrityError:
+        # A concurrent request with the same key created the row first.
+        return Response(
+            {'error': 'A request with this Idempotency-Key is in progress.'},
+            status=status.HTTP_409_CONFLICT,
         )
 
-        intent = stripe.PaymentIntent.create(
-            amount=int(payment.amount * 100),
-            currency=payment.currency,
-            metadata={
-                'payment_id': payment.id,
-                'donation_id': donation_id,
-                'user_id': request.user.id,
-            },
-            automatic_payment_methods={'enabled': True},
+    _release_connection()
+    try:
+        intent = checkout.create_intent(payment)
+    except stripe.APIConnectionError:
+        # Stripe may or may not have created the intent; replaying the
+        # create with the same idempotency key finds out.
+        logger.warning('Stripe unreachable', extra={'payment_id': payment.id})
+        return Response(
+            {'error': 'Payment provider unavailable. Please try again.'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    except stripe.StripeError:
+        logger.exception('Stripe rejected payment intent')
+        # Through transitions, so the failure is counted in the rollups.
+        with transaction.atomic():
+            transition(payment.stripe_payment_intent_id, 'failed')
+        return Response(
+            {'error': 'Could not start the payment.'},
+            status=status.HTTP_502_BAD_GATEWAY,
         )
 
-        payment.stripe_payment_intent_id = intent.id
-        payment.save(update_fields=['stripe_payment_intent_id'])
+    with transaction.atomic():
+        attach_intent(payment, intent)
+    checkout.remember(payment, intent.client_secret)
 
     return Response(
         {'clientSecret': intent.client_secret},
@@ -63,14 +136,163 @@ def create_payment_intent(request):
     )
 
 
+def _release_connection():
+    # The next query opens a new connection. Persistent connections are
+    # kept, as is one inside a transaction (ATOMIC_REQUESTS, tests).
+    if not connection.in_atomic_block and connection.settings_dict['CONN_MAX_AGE'] == 0:
+        connection.close()
+
+
+def _recover(payment):
+    """
+    Finish a checkout whose Stripe call failed and left a placeholder row.
+
+    The create is replayed with the row's idempotency key, so Stripe answers
+    with the intent the first call made, or makes it now.
+    """
+    _release_connection()
+    try:
+        intent = checkout.create_intent(payment)
+    except stripe.StripeError:
+        logger.warning(
+            'Could not replay payment intent', extra={'payment_id': payment.id}
+        )
+        return Response(
+            {'error': 'Payment provider unavailable. Please try again.'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+    with transaction.atomic():
+        attach_intent(payment, intent)
+    if intent.status not in checkout.CONFIRMABLE_INTENT_STATUSES:
+        return Response(
+            {'error': 'This Idempotency-Key belongs to a finished payment.'},
+            status=status.HTTP_409_CONFLICT,
+        )
+    checkout.remember(payment, intent.client_secret)
+    return Response({'clientSecret': intent.client_secret}, status=status.HTTP_200_OK)
+
+
+def _replay(payment, donation):
+    """Answer a checkout retried with an Idempotency-Key seen before."""
+    if payment.donation_id != donation.id:
+        return Response(
+            {'error': 'Idempotency-Key was already used for another donation.'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    if payment.stripe_payment_intent_id.startswith(DonationPayment.PLACEHOLDER_PREFIX):
+        if payment.status != 'created':
+            secret = None
+        elif timezone.now() - payment.created_at < PLACEHOLDER_GRACE:
+            return Response(
+                {'error': 'A request with this Idempotency-Key is in progress.'},
+                status=status.HTTP_409_CONFLICT,
+            )
+        else:
+            return _recover(payment)
+    else:
+        try:
+            secret = checkout.client_secret(payment)
+        except stripe.StripeError:
+            logger.exception('Could not read back payment intent')
+            return Response(
+                {'error': 'Payment provider unavailable. Please try again.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+    if secret is None:
+        return Response(
+            {'error': 'This Idempotency-Key belongs to a finished payment.'},
+            status=status.HTTP_409_CONFLICT,
+        )
+    return Response({'clientSecret': secret}, status=status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def my_donations(request):
-    donation_payments = (
+    filters = MyDonationFilterSerializer(data=request.query_params.dict())
+    filters.is_valid(raise_exception=True)
+
+    # Pages walk payment_user_history_idx on (user, -created_at, -id).
+    queryset = (
         DonationPayment.objects.filter(user=request.user)
         .select_related('donation')
-        .order_by('-created_at')
+        .only(*MyDonationSerializer.columns)
+    )
+    if 'status' in filters.validated_data:
+        queryset = queryset.filter(status=filters.validated_data['status'])
+
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(queryset, request)
+    serializer = MyDonationSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def my_impact(request):
+    # A primary-key read of the summary kept by payments.giving.
+    summary = GivingSummary.objects.filter(user=request.user).first()
+    if summary is None:
+        summary = GivingSummary(user=request.user)
+    return Response(GivingSummarySerializer(summary).data, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def stripe_inbox_stats(request):
+    return Response(inbox.stats(), status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def revenue_analytics(request):
+    filters = RevenueFilterSerializer(data=request.query_params.dict())
+    filters.is_valid(raise_exception=True)
+    params = filters.validated_data
+    group_by = params.get('group_by')
+
+    # Summed from the daily rollups kept by payments.rollups, never from
+    # the payments themselves.
+    queryset = DailyRevenue.objects.filter(
+        day__gte=params['start'], day__lte=params['end']
     )
+    if 'status' in params:
+        queryset = queryset.filter(status=params['status'])
+    elif group_by != 'status':
+        queryset = queryset.filter(status='succeeded')
+    if 'donation' in params:
+        queryset = queryset.filter(donation_id=params['donation'])
+    if 'category' in params:
+        queryset = queryset.filter(donation__categories=params['category'])
+    elif group_by == 'category':
+        queryset = queryset.filter(donation__categories__isnull=False)
+    if 'currency' in params:
+        queryset = queryset.filter(currency=params['currency'].lower())
 
-    serializer = MyDonationSerializer(donation_payments, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    keys = ['period', 'currency']
+    if group_by == 'donation':
+        keys += ['donation_id', 'donation__title']
+    elif group_by == 'category':
+        # A donation in several categories counts towards each of them.
+        keys += ['donation__categories', 'donation__categories__name']
+    elif group_by == 'status':
+        keys.append('status')
+    period = TruncMonth('day') if params['interval'] == 'month' else F('day')
+    rows = (
+        queryset.annotate(period=period)
+        .values(*keys)
+        .annotate(payment_count=Sum('payment_count'), amount=Sum('amount'))
+        .filter(payment_count__gt=0)
+        .order_by(*keys)
+    )
+    return Response(
+        {
+            'interval': params['interval'],
+            'start': params['start'],
+            'end': params['end'],
+            'results': RevenueSerializer(rows, many=True).data,
+        },
+        status=status.HTTP_200_OK,
+    )
@@ -1,12 +1,15 @@
+import json
 import logging
 
 import stripe
 from django.conf import settings
 from django.db import IntegrityError, transaction
 from django.http import HttpResponse
+from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 
-from payments.models import DonationPayment, StripeEvent
+from payments.models import StripeEvent
+from payments.transitions import EVENT_STATUSES, record_and_transition, transition
 
 logger = logging.getLogger(__name__)
 
@@ -22,21 +25,31 @@ def _extract_payment_intent_id(obj):
 
 def _update_donation_payment_status(payment_intent_id, event_type):
     """Update DonationPayment status based on event type."""
-    qs = DonationPayment.objects.filter(stripe_payment_intent_id=payment_intent_id)
-
-    if event_type == 'payment_intent.succeeded':
-        qs.exclude(status='succeeded').update(status='succeeded')
-    elif event_type == 'payment_intent.payment_failed':
-        qs.exclude(status='failed').update(status='failed')
-    elif event_type == 'payment_intent.processing':
-        qs.exclude(status='processing').update(status='processing')
-    elif event_type == 'charge.refunded':
-        qs.exclude(status='refunded').update(status='refunded')
-    else:
+    new_status = EVENT_STATUSES.get(event_type)
+    if new_status is None:
         return False
+
+    transition(payment_intent_id, new_status)
     return True
 
 
+def apply_event(event_id, event_type, payment_intent_id):
+    """Apply the state transition for a recorded event."""
+    if not payment_intent_id:
+        logger.warning(
+            'Stripe event without payment_intent',
+            extra={'event_id': event_id, 'event_type': event_type},
+        )
+        return
+
+    with transaction.atomic():
+        if not _update_donation_payment_status(payment_intent_id, event_type):
+            logger.info(
+                'Unhandled Stripe event',
+                extra={'event_id': event_id, 'event_type': event_type},
+            )
+
+
 @csrf_exempt
 def stripe_webhook(request):
     payload = request.body
@@ -61,6 +74,28 @@ def stripe_webhook(request):
     # Resolve PaymentIntent ID safely
     payment_intent_id = _extract_payment_intent_id(obj)
 
+    # In inbox mode the event is only recorded here; process_stripe_events
+    # applies it, so retry storms never hold a worker for the transition.
+    inbox = settings.STRIPE_WEBHOOK_MODE == 'inbox'
+    new_status = EVENT_STATUSES.get(event_type)
+
+    if not inbox and payment_intent_id and new_status:
+        # Idempotency insert and transition in one statement.
+        with transaction.atomic():
+            recorded, moved = record_and_transition(
+                event_id,
+                event_type,
+                payment_intent_id,
+                json.loads(payload),
+                new_status,
+            )
+        if recorded and not moved:
+            logger.info(
+                'Stripe event did not change payment status',
+                extra={'event_id': event_id, 'event_type': event_type},
+            )
+        return HttpResponse(status=200)
+
     # -------------------------
     # Idempotency guard
     # -------------------------
@@ -69,27 +104,21 @@ def stripe_webhook(request):
             StripeEvent.objects.create(
                 event_id=event_id,
                 event_type=event_type,
-                payment_intent_id=payment_intent_id,
+                payment_intent_id=payment_intent_id or '',
+                payload=json.loads(payload),
+                status='pending' if inbox else 'processed',
+                processed_at=None if inbox else timezone.now(),
             )
     except IntegrityError:
         # Event already processed → idempotent success
         return HttpResponse(status=200)
 
+    if inbox:
+        return HttpResponse(status=200)
+
     # -------------------------
     # Apply state transition
     # -------------------------
-    if not payment_intent_id:
-        logger.warning(
-            'Stripe event without payment_intent',
-            extra={'event_id': event_id, 'event_type': event_type},
-        )
-        return HttpResponse(status=200)
-
-    with transaction.atomic():
-        if not _update_donation_payment_status(payment_intent_id, event_type):
-            logger.info(
-                'Unhandled Stripe event',
-                extra={'event_id': event_id, 'event_type': event_type},
-            )
+    apply_event(event_id, event_type, payment_intent_id)
 
     return HttpResponse(status=200)